@@ -1,15 +1,30 @@
 import asyncio
 import logging
+import time
+from datetime import datetime, timedelta
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
 import config
 from database import Base, engine, get_db, AsyncSessionLocal
-from routes import logs, statistics, anomalies, hdfs, test_reports
+from routes import logs, statistics, anomalies, hdfs, test_reports, stream, metrics, dashboard, changes, export, alerts
 from services.kafka_consumer import KafkaConsumerService
 from services.mock_data import MockDataGenerator
 from services.db_service import DBService
+from services.fanout import create_fanout_backend
+from services.leader import IngestionLeader
+from services.stats_aggregator import RollingStatsAggregator, WINDOWS
+from services.query_cache import query_cache
+from services.dashboard_snapshot import dashboard_snapshot
+from services.conditional import ConditionalRequestMiddleware, high_water_marks
+from services.compression import CompressionMiddleware
+from services.block_stats import block_stats_writer
+from services.labels import log_levels, hdfs_components, apply_label_event
+from services.block_sessions import block_sessions
+from services.scoring import batch_scorer
+from services.spike_detector import spike_detector
+from services.templates import template_miner
 
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
@@ -31,6 +46,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Answer unchanged polls with 304 and compress large responses
+if config.HTTP_CONDITIONAL_ENABLED:
+    app.add_middleware(ConditionalRequestMiddleware)
+if config.HTTP_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # Add CORS middleware with enhanced configuration
 app.add_middleware(
     CORSMiddleware,
@@ -38,7 +59,7 @@ app.add_middleware(
     allow_credentials=config.CORS_ALLOW_CREDENTIALS,
     allow_methods=config.CORS_ALLOW_METHODS,
     allow_headers=config.CORS_ALLOW_HEADERS,
-    expose_headers=["Content-Type", "Content-Length", "Cache-Control", "Last-Event-ID"],
+    expose_headers=["Content-Type", "Content-Length", "Cache-Control", "Last-Event-ID", "ETag", "Last-Modified"],
     max_age=1800,  # 30 minutes cache for preflight requests
 )
 
@@ -51,6 +72,12 @@ app.include_router(statistics.router, prefix=config.API_PREFIX)
 app.include_router(anomalies.router, prefix=config.API_PREFIX)
 app.include_router(hdfs.router, prefix=config.API_PREFIX)
 app.include_router(test_reports.router, prefix=config.API_PREFIX)
+app.include_router(stream.router, prefix=config.API_PREFIX)
+app.include_router(metrics.router, prefix=config.API_PREFIX)
+app.include_router(dashboard.router, prefix=config.API_PREFIX)
+app.include_router(changes.router, prefix=config.API_PREFIX)
+app.include_router(export.router, prefix=config.API_PREFIX)
+app.include_router(alerts.router, prefix=config.API_PREFIX)
 
 # Mount the reports directory to serve HTML files
 ROOT_DIR = Path(__file__).parent.parent
@@ -68,6 +95,130 @@ async def root():
 # Create services
 kafka_service = KafkaConsumerService()
 mock_generator = MockDataGenerator()
+fanout = create_fanout_backend()
+
+# Local broadcast function for each fan-out channel
+BROADCASTERS = {
+    "logs": logs.broadcast_log,
+    "statistics": statistics.broadcast_statistics,
+    "anomalies": anomalies.broadcast_anomaly,
+    "alerts": alerts.broadcast_alert,
+    "spike_detector": alerts.update_detector_state,
+    "labels": apply_label_event,
+}
+
+# Table whose cached query results each fan-out channel makes stale
+CHANNEL_TABLES = {
+    "logs": "log_entries",
+    "statistics": "classifications",
+    "anomalies": "anomaly_params",
+    "alerts": "spike_alerts",
+    "block_stats": "block_stats",
+}
+
+async def publish_statistics_snapshot(snapshot):
+    await fanout.publish("statistics", snapshot)
+
+stats_aggregator = RollingStatsAggregator(publish=publish_statistics_snapshot)
+
+async def publish_block_stats_flush(rows: int):
+    # /hdfs/blocks reads block_stats, which lags log_entries by up to a flush
+    await fanout.publish("block_stats", {"rows": rows})
+
+block_stats_writer.flush_listeners.append(publish_block_stats_flush)
+
+async def publish_new_labels(table: str, labels):
+    # Other workers decode log_entries through their own label caches
+    await fanout.publish("labels", {"table": table, "labels": labels})
+
+log_levels.registration_listeners.append(publish_new_labels)
+hdfs_components.registration_listeners.append(publish_new_labels)
+
+detector_state_published_at = 0.0
+
+async def publish_detector_state(force: bool = False):
+    """Share the spike detector state with every worker, at most every SPIKE_STATE_PUBLISH_SECONDS"""
+    global detector_state_published_at
+    now = time.monotonic()
+    if not force and now - detector_state_published_at < config.SPIKE_STATE_PUBLISH_SECONDS:
+        return
+    detector_state_published_at = now
+    await fanout.publish("spike_detector", spike_detector.state())
+
+async def seed_stats_aggregator():
+    """Load the longest rolling window from the database so a new owner starts warm"""
+    # A worker that regains ownership still holds its old buckets
+    stats_aggregator.reset()
+    start_time = datetime.now() - timedelta(seconds=max(WINDOWS.values()))
+    async_session = AsyncSessionLocal()
+    try:
+        rows = await DBService.get_classification_totals_by_second(async_session, start_time)
+        for second, normal_count, anomaly_count, unidentified_count in rows:
+            stats_aggregator.add(normal_count, anomaly_count, unidentified_count, at=second.timestamp())
+    except Exception as e:
+        logger.error(f"Error seeding statistics windows: {str(e)}")
+    finally:
+        await async_session.close()
+
+async def reload_template_miner():
+    """Start from the templates in the database, which another owner may have changed"""
+    async_session = AsyncSessionLocal()
+    try:
+        await template_miner.reload(async_session)
+    except Exception as e:
+        logger.error(f"Error reloading log templates: {str(e)}")
+    finally:
+        await async_session.close()
+
+async def start_ingestion():
+    """Start Kafka consumer or mock data generator"""
+    await reload_template_miner()
+    await seed_stats_aggregator()
+    await stats_aggregator.start()
+    await block_stats_writer.start()
+    if config.SCORING_ENABLED:
+        await batch_scorer.start()
+
+    if config.MOCK_DATA_ENABLED:
+        logger.info("Starting mock data generator")
+        await mock_generator.start()
+    else:
+        logger.info("Starting Kafka consumer")
+        await kafka_service.start()
+
+async def stop_ingestion():
+    if config.MOCK_DATA_ENABLED:
+        logger.info("Stopping mock data generator")
+        await mock_generator.stop()
+    else:
+        logger.info("Stopping Kafka consumer")
+        await kafka_service.stop()
+    await batch_scorer.stop()
+    await stats_aggregator.stop()
+    stats_aggregator.reset()
+    await block_stats_writer.stop()
+
+# With several workers only the one holding the ingestion lock ingests
+ingestion_leader = (
+    IngestionLeader(on_acquire=start_ingestion, on_release=stop_ingestion)
+    if config.INGESTION_LEADER_ELECTION else None
+)
+
+async def dispatch_event(channel, payload):
+    """Deliver an event received from the fan-out backend to this process's clients"""
+    table = CHANNEL_TABLES.get(channel)
+    if table:
+        # At most once a second per table, so cached aggregates get hits during ingest
+        query_cache.note_write(table)
+        high_water_marks.invalidate()
+
+    # Every worker folds log events into its own block sessions
+    if channel == "logs":
+        block_sessions.add(payload)
+
+    broadcaster = BROADCASTERS.get(channel)
+    if broadcaster:
+        await broadcaster(payload)
 
 @app.on_event("startup")
 async def startup_event():
@@ -83,6 +234,23 @@ async def startup_event():
     # Initialize database
     await init_db()
 
+    # Level/component ids that log entries are encoded and decoded with
+    async_session = AsyncSessionLocal()
+    try:
+        await log_levels.load(async_session)
+        await hdfs_components.load(async_session)
+    finally:
+        await async_session.close()
+
+    # Start receiving events for this process's stream clients
+    await fanout.start(dispatch_event)
+
+    # Every worker serves the dashboard snapshot and block sessions from its own memory
+    await dashboard_snapshot.start()
+    await block_sessions.start()
+    # Completed sessions are scored on the ingesting worker only (the scorer ignores them elsewhere)
+    block_sessions.eviction_listeners.append(batch_scorer.submit)
+
     # Register callbacks for Kafka messages
     async def process_log(log_entry):
         try:
@@ -91,8 +259,10 @@ async def startup_event():
             try:
                 # Save to database
                 log = await DBService.save_log_entry(async_session, log_entry)
-                # Broadcast to connected clients
-                await logs.broadcast_log(log)
+                # Folded into block_stats and upserted in batches
+                await block_stats_writer.add(log)
+                # Broadcast to connected clients of every worker
+                await fanout.publish("logs", logs.log_event_payload(log))
             finally:
                 await async_session.close()
         except Exception as e:
@@ -105,8 +275,15 @@ async def startup_event():
             try:
                 # Save to database
                 stats = await DBService.save_classification(async_session, classification)
-                # Broadcast to connected clients
-                await statistics.broadcast_statistics(stats)
+                # Clients get the rolling windows on the aggregator's schedule, not per row
+                stats_aggregator.add(stats.normal_count, stats.anomaly_count, stats.unidentified_count)
+                # Flag anomaly-rate bursts as they arrive
+                if config.SPIKE_DETECTOR_ENABLED:
+                    spike_alerts = spike_detector.update(stats)
+                    for alert in spike_alerts:
+                        saved = await DBService.save_spike_alert(async_session, alert)
+                        await fanout.publish("alerts", alerts.alert_event_payload(saved))
+                    await publish_detector_state(force=bool(spike_alerts))
             finally:
                 await async_session.close()
         except Exception as e:
@@ -120,8 +297,8 @@ async def startup_event():
             try:
                 # Save to database
                 param = await DBService.save_anomaly_param(async_session, anomaly_param)
-                # Broadcast to connected clients
-                await anomalies.broadcast_anomaly(param)
+                # Broadcast to connected clients of every worker
+                await fanout.publish("anomalies", anomalies.anomaly_event_payload(param))
             finally:
                 await async_session.close()
         except Exception as e:
@@ -133,29 +310,34 @@ async def startup_event():
     mock_generator.register_log_consumer(process_log)
     mock_generator.register_classification_consumer(process_classification)
     mock_generator.register_anomaly_param_consumer(process_anomaly_param)
+    batch_scorer.register_classification_consumer(process_classification)
+    batch_scorer.register_anomaly_param_consumer(process_anomaly_param)
 
-    # Start Kafka consumer or mock data generator
-    if config.MOCK_DATA_ENABLED:
-        logger.info("Starting mock data generator")
-        await mock_generator.start()
+    # Start ingestion here, or only once this worker wins the ingestion lock
+    if ingestion_leader:
+        logger.info("Waiting for ingestion lock")
+        await ingestion_leader.start()
     else:
-        logger.info("Starting Kafka consumer")
-        await kafka_service.start()
+        await start_ingestion()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     # Stop services
-    if config.MOCK_DATA_ENABLED:
-        logger.info("Stopping mock data generator")
-        await mock_generator.stop()
+    if ingestion_leader:
+        await ingestion_leader.stop()
     else:
-        logger.info("Stopping Kafka consumer")
-        await kafka_service.stop()
+        await stop_ingestion()
+    await dashboard_snapshot.stop()
+    await block_sessions.stop()
+    await fanout.stop()
 
 # Health check endpoint
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "ingestion_owner": ingestion_leader.is_leader if ingestion_leader else True
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -18,6 +18,124 @@ KAFKA_TOPIC_LOGS = os.getenv("KAFKA_TOPIC_LOGS", "logs")
 KAFKA_TOPIC_CLASSIFICATIONS = os.getenv("KAFKA_TOPIC_CLASSIFICATIONS", "classifications")
 KAFKA_CONSUMER_GROUP = os.getenv("KAFKA_CONSUMER_GROUP", "dashboard-backend")
 
+# Event fan-out between worker processes
+# "memory" keeps events in this process (single worker), "postgres" relays them with LISTEN/NOTIFY
+FANOUT_BACKEND = os.getenv("FANOUT_BACKEND", "memory").lower()
+FANOUT_PG_CHANNEL = os.getenv("FANOUT_PG_CHANNEL", "dashboard_events")
+
+# Ingestion ownership
+# When enabled, workers compete for a Postgres advisory lock and only the holder
+# runs the Kafka consumer or mock data generator
+INGESTION_LEADER_ELECTION = os.getenv("INGESTION_LEADER_ELECTION", "True").lower() in ("true", "1", "t")
+INGESTION_LOCK_KEY = int(os.getenv("INGESTION_LOCK_KEY", "724011"))
+INGESTION_LOCK_RETRY_SECONDS = float(os.getenv("INGESTION_LOCK_RETRY_SECONDS", "5"))
+
+# Statistics stream
+# Seconds between rolling-window snapshots pushed on /api/statistics/stream
+STATS_STREAM_INTERVAL_SECONDS = float(os.getenv("STATS_STREAM_INTERVAL_SECONDS", "2"))
+
+# Query result cache
+# Endpoints listed here cache their results until TTL expiry or until new rows are ingested
+QUERY_CACHE_ENDPOINTS = [
+    endpoint.strip() for endpoint in os.getenv(
+        "QUERY_CACHE_ENDPOINTS",
+        "statistics.summary,statistics.time_series,hdfs.blocks,hdfs.components,logs.volume,logs.templates"
+    ).split(",") if endpoint.strip()
+]
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "30"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+# Least seconds between invalidations of one table's entries while rows keep arriving
+QUERY_CACHE_INVALIDATE_INTERVAL_SECONDS = float(os.getenv("QUERY_CACHE_INVALIDATE_INTERVAL_SECONDS", "1"))
+
+# Time series bucket cache
+# Closed buckets are kept this long (the time-series endpoint allows up to 168 hours)
+TIME_SERIES_CACHE_RETENTION_HOURS = int(os.getenv("TIME_SERIES_CACHE_RETENTION_HOURS", "169"))
+# Seconds after a bucket ends before it is treated as closed and cached
+TIME_SERIES_CACHE_CLOSE_GRACE_SECONDS = float(os.getenv("TIME_SERIES_CACHE_CLOSE_GRACE_SECONDS", "5"))
+
+# Single-flight query coalescing
+# Concurrent identical DBService/HDFSLogService queries share one database round trip
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "True").lower() in ("true", "1", "t")
+# Datetime arguments are rounded to this many seconds when matching calls
+SINGLE_FLIGHT_TIME_RESOLUTION_SECONDS = float(os.getenv("SINGLE_FLIGHT_TIME_RESOLUTION_SECONDS", "1"))
+
+# Dashboard snapshot served by /api/dashboard/snapshot
+DASHBOARD_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("DASHBOARD_SNAPSHOT_INTERVAL_SECONDS", "5"))
+DASHBOARD_SNAPSHOT_HOURS = int(os.getenv("DASHBOARD_SNAPSHOT_HOURS", "24"))
+DASHBOARD_SNAPSHOT_INTERVAL_MINUTES = int(os.getenv("DASHBOARD_SNAPSHOT_INTERVAL_MINUTES", "5"))
+DASHBOARD_SNAPSHOT_LOG_LIMIT = int(os.getenv("DASHBOARD_SNAPSHOT_LOG_LIMIT", "100"))
+DASHBOARD_SNAPSHOT_PARAM_LIMIT = int(os.getenv("DASHBOARD_SNAPSHOT_PARAM_LIMIT", "20"))
+
+# Delta sync cursor of /api/changes: only rows older than this are handed out
+CHANGES_SETTLE_SECONDS = float(os.getenv("CHANGES_SETTLE_SECONDS", "2"))
+
+# HTTP conditional requests and compression
+HTTP_CONDITIONAL_ENABLED = os.getenv("HTTP_CONDITIONAL_ENABLED", "True").lower() in ("true", "1", "t")
+HTTP_VALIDATOR_MARKS_TTL_SECONDS = float(os.getenv("HTTP_VALIDATOR_MARKS_TTL_SECONDS", "1"))
+HTTP_VALIDATOR_WINDOW_SECONDS = int(os.getenv("HTTP_VALIDATOR_WINDOW_SECONDS", "60"))
+HTTP_COMPRESSION_ENABLED = os.getenv("HTTP_COMPRESSION_ENABLED", "True").lower() in ("true", "1", "t")
+HTTP_COMPRESSION_MIN_BYTES = int(os.getenv("HTTP_COMPRESSION_MIN_BYTES", "1024"))
+HTTP_COMPRESSION_GZIP_LEVEL = int(os.getenv("HTTP_COMPRESSION_GZIP_LEVEL", "6"))
+HTTP_COMPRESSION_BROTLI_QUALITY = int(os.getenv("HTTP_COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Log export: rows fetched from the server-side cursor per streamed chunk
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+# Rows per Arrow record batch / Parquet row group
+ARROW_EXPORT_BATCH_ROWS = int(os.getenv("ARROW_EXPORT_BATCH_ROWS", "50000"))
+
+# Block stats rollup written by the ingesting process
+BLOCK_STATS_FLUSH_SECONDS = float(os.getenv("BLOCK_STATS_FLUSH_SECONDS", "1"))
+# Upsert early once this many blocks are pending (6 parameters per block, asyncpg allows 32767)
+BLOCK_STATS_MAX_PENDING = int(os.getenv("BLOCK_STATS_MAX_PENDING", "5000"))
+# Block lookups also scan this many recent seconds for rows not yet flushed to block_stats
+BLOCK_LOOKUP_TAIL_SECONDS = float(os.getenv("BLOCK_LOOKUP_TAIL_SECONDS", "10"))
+
+# Drain log template miner run at ingestion
+# Prefix tree depth, counting the token-count level and the leaves
+TEMPLATE_MINER_DEPTH = int(os.getenv("TEMPLATE_MINER_DEPTH", "4"))
+# Share of a template's tokens a message must match to join it
+TEMPLATE_MINER_SIMILARITY = float(os.getenv("TEMPLATE_MINER_SIMILARITY", "0.4"))
+TEMPLATE_MINER_MAX_CHILDREN = int(os.getenv("TEMPLATE_MINER_MAX_CHILDREN", "100"))
+
+# In-memory per-block template count sessions kept by every worker
+# A block's session is dropped once it has had no logs for this long
+BLOCK_SESSION_TTL_SECONDS = float(os.getenv("BLOCK_SESSION_TTL_SECONDS", "600"))
+BLOCK_SESSION_MAX_BLOCKS = int(os.getenv("BLOCK_SESSION_MAX_BLOCKS", "100000"))
+# Latest template ids kept per block
+BLOCK_SESSION_MAX_SEQUENCE = int(os.getenv("BLOCK_SESSION_MAX_SEQUENCE", "100"))
+BLOCK_SESSION_SWEEP_SECONDS = float(os.getenv("BLOCK_SESSION_SWEEP_SECONDS", "10"))
+
+# Batch anomaly scoring of completed (evicted) block sessions, on the ingesting process
+SCORING_ENABLED = os.getenv("SCORING_ENABLED", "False").lower() in ("true", "1", "t")
+# "pca" for the built-in baseline, or "package.module:attribute" for a function / object with predict()
+SCORING_MODEL = os.getenv("SCORING_MODEL", "pca")
+# Score once this many blocks are waiting, or every SCORING_BATCH_SECONDS
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "1000"))
+SCORING_BATCH_SECONDS = float(os.getenv("SCORING_BATCH_SECONDS", "30"))
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "1"))
+# Anomaly params emitted per batch at most (one per anomalous or unidentified block)
+SCORING_MAX_PARAMS_PER_BATCH = int(os.getenv("SCORING_MAX_PARAMS_PER_BATCH", "100"))
+SCORING_PCA_MIN_BLOCKS = int(os.getenv("SCORING_PCA_MIN_BLOCKS", "10"))
+# Share of variance kept in the principal subspace, and the normal quantile of the Q-statistic threshold
+SCORING_PCA_VARIANCE = float(os.getenv("SCORING_PCA_VARIANCE", "0.95"))
+SCORING_PCA_THRESHOLD_Z = float(os.getenv("SCORING_PCA_THRESHOLD_Z", "3.09"))
+
+# Streaming spike detector over the anomaly / unidentified rates of classifications
+SPIKE_DETECTOR_ENABLED = os.getenv("SPIKE_DETECTOR_ENABLED", "True").lower() in ("true", "1", "t")
+# EWMA weight of the newest classification
+SPIKE_EWMA_ALPHA = float(os.getenv("SPIKE_EWMA_ALPHA", "0.05"))
+SPIKE_Z_THRESHOLD = float(os.getenv("SPIKE_Z_THRESHOLD", "4"))
+# Classifications a baseline needs before it can raise alerts
+SPIKE_WARMUP_SAMPLES = int(os.getenv("SPIKE_WARMUP_SAMPLES", "30"))
+# Classifications with fewer events are not scored
+SPIKE_MIN_EVENTS = int(os.getenv("SPIKE_MIN_EVENTS", "20"))
+# Floor of the baseline standard deviation, so a flat baseline doesn't alert on tiny moves
+SPIKE_MIN_STD = float(os.getenv("SPIKE_MIN_STD", "0.01"))
+# Time-of-day baselines per day (24 = hourly); 0 uses the overall baseline only
+SPIKE_SEASON_SLOTS = int(os.getenv("SPIKE_SEASON_SLOTS", "24"))
+# Least seconds between detector state updates sent to the other workers
+SPIKE_STATE_PUBLISH_SECONDS = float(os.getenv("SPIKE_STATE_PUBLISH_SECONDS", "1"))
+
 # API configuration
 API_PREFIX = "/api"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -31,4 +149,6 @@ CORS_ALLOW_HEADERS = ["*"]
 
 # Mock data generation
 MOCK_DATA_ENABLED = os.getenv("MOCK_DATA_ENABLED", "True").lower() in ("true", "1", "t")
-MOCK_DATA_INTERVAL_SECONDS = int(os.getenv("MOCK_DATA_INTERVAL_SECONDS", "5"))
\ No newline at end of file
+MOCK_DATA_INTERVAL_SECONDS = float(os.getenv("MOCK_DATA_INTERVAL_SECONDS", "5"))
+# Log entries generated per interval; 0 picks a random count between 1 and 3
+MOCK_LOGS_PER_INTERVAL = int(os.getenv("MOCK_LOGS_PER_INTERVAL", "0"))
\ No newline at end of file
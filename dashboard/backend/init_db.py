@@ -9,6 +9,113 @@ from database import Base
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def migrate_compact_log_columns(cur):
+    """
+    Convert a log_entries table from the text layout (block_id, log_level and
+    hdfs_component as strings) to the compact one: block_id as BIGINT and the
+    level and component as SMALLINT ids into the lookup tables
+    """
+    cur.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'log_entries' AND column_name = 'block_id';
+    """)
+    row = cur.fetchone()
+    if not row or row[0] == "bigint":
+        return
+    
+    logger.info("Migrating log_entries to compact block/level/component columns...")
+    # One statement string runs as one transaction. The text columns are
+    # dropped before block_id's type change, whose table rewrite then
+    # reclaims their space.
+    cur.execute("""
+        DROP MATERIALIZED VIEW IF EXISTS log_volume_1m;
+        DROP VIEW IF EXISTS hdfs_block_stats;
+        
+        INSERT INTO log_levels (name)
+        SELECT DISTINCT log_level FROM log_entries WHERE log_level IS NOT NULL
+        ON CONFLICT (name) DO NOTHING;
+        INSERT INTO hdfs_components (name)
+        SELECT DISTINCT hdfs_component FROM log_entries WHERE hdfs_component IS NOT NULL
+        ON CONFLICT (name) DO NOTHING;
+        
+        ALTER TABLE log_entries
+            ADD COLUMN IF NOT EXISTS log_level_id SMALLINT REFERENCES log_levels (id),
+            ADD COLUMN IF NOT EXISTS hdfs_component_id SMALLINT REFERENCES hdfs_components (id);
+        UPDATE log_entries e SET log_level_id = l.id FROM log_levels l WHERE l.name = e.log_level;
+        UPDATE log_entries e SET hdfs_component_id = c.id FROM hdfs_components c WHERE c.name = e.hdfs_component;
+        ALTER TABLE log_entries DROP COLUMN log_level, DROP COLUMN hdfs_component;
+        
+        -- IDs outside BIGINT range (never produced by HDFS) become NULL
+        ALTER TABLE log_entries ALTER COLUMN block_id TYPE BIGINT USING (
+            CASE
+                WHEN block_id !~ '^blk_-?[0-9]{1,19}$' THEN NULL
+                WHEN substring(block_id FROM 5)::numeric BETWEEN -9223372036854775808 AND 9223372036854775807
+                    THEN substring(block_id FROM 5)::bigint
+            END
+        );
+        CREATE INDEX IF NOT EXISTS ix_log_entries_log_level_id ON log_entries (log_level_id, timestamp DESC);
+        CREATE INDEX IF NOT EXISTS ix_log_entries_hdfs_component_id ON log_entries (hdfs_component_id, timestamp DESC);
+        
+        -- Rebuilt from log_entries by the backfill below
+        TRUNCATE block_stats;
+        ALTER TABLE block_stats
+            ALTER COLUMN block_id TYPE BIGINT USING block_id::bigint,
+            ALTER COLUMN first_seen TYPE TIMESTAMPTZ USING first_seen AT TIME ZONE 'UTC',
+            ALTER COLUMN last_seen TYPE TIMESTAMPTZ USING last_seen AT TIME ZONE 'UTC';
+    """)
+    logger.info("Migrated log_entries to compact columns")
+
+def migrate_block_stats_timestamps(cur):
+    """
+    Convert block_stats.first_seen/last_seen from TIMESTAMP to TIMESTAMPTZ;
+    the writer binds log_entries timestamps, which are tz-aware
+    """
+    cur.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'block_stats' AND column_name = 'first_seen';
+    """)
+    row = cur.fetchone()
+    if not row or row[0] != "timestamp without time zone":
+        return
+    
+    logger.info("Converting block_stats timestamps to TIMESTAMPTZ...")
+    cur.execute("""
+        ALTER TABLE block_stats
+            ALTER COLUMN first_seen TYPE TIMESTAMPTZ USING first_seen AT TIME ZONE 'UTC',
+            ALTER COLUMN last_seen TYPE TIMESTAMPTZ USING last_seen AT TIME ZONE 'UTC';
+    """)
+    logger.info("Converted block_stats timestamps to TIMESTAMPTZ")
+
+def migrate_event_time(cur):
+    """Add event_time to a log_entries table created before it existed, parsed from hdfs_date/hdfs_time"""
+    cur.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'log_entries' AND column_name = 'event_time';
+    """)
+    if cur.fetchone():
+        return
+    
+    logger.info("Adding event_time to log_entries...")
+    # Existing chunks can't be repartitioned, so only the index is added here
+    cur.execute("""
+        ALTER TABLE log_entries ADD COLUMN event_time TIMESTAMPTZ;
+        UPDATE log_entries SET event_time = COALESCE(parse_hdfs_event_time(hdfs_date, hdfs_time), timestamp);
+        ALTER TABLE log_entries ALTER COLUMN event_time SET NOT NULL;
+        CREATE INDEX IF NOT EXISTS ix_log_entries_event_time ON log_entries (event_time DESC);
+    """)
+    logger.info("Added event_time to log_entries")
+
+def migrate_log_templates(cur):
+    """Add the template columns to a log_entries table created before template mining"""
+    # Rows ingested before then keep NULL templates
+    cur.execute("""
+        ALTER TABLE log_entries
+            ADD COLUMN IF NOT EXISTS template_id INTEGER REFERENCES log_templates (id),
+            ADD COLUMN IF NOT EXISTS template_params TEXT[];
+        CREATE INDEX IF NOT EXISTS ix_log_entries_template_id ON log_entries (template_id, timestamp DESC);
+    """)
+    logger.info("log_entries has template columns")
+
 def init_db():
     """Initialize database tables and TimescaleDB hypertables"""
     logger.info("Initializing database...")
@@ -34,6 +141,28 @@ def init_db():
         cur.execute("CREATE EXTENSION IF NOT EXISTS timescaledb CASCADE;")
         logger.info("TimescaleDB extension enabled")
         
+        # Parse HDFS "YYMMDD" + "HHMMSS" fields into a UTC timestamp, NULL if invalid
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION parse_hdfs_event_time(hdfs_date TEXT, hdfs_time TEXT)
+            RETURNS TIMESTAMPTZ AS $$
+            BEGIN
+                IF hdfs_date !~ '^[0-9]{6}$' OR hdfs_time !~ '^[0-9]{6}$' THEN
+                    RETURN NULL;
+                END IF;
+                RETURN to_timestamp(hdfs_date || hdfs_time, 'YYMMDDHH24MISS')::timestamp AT TIME ZONE 'UTC';
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql STABLE;
+        """)
+        logger.info("Created parse_hdfs_event_time function")
+        
+        # Move existing installs to the BIGINT/SMALLINT log columns and add event_time and templates
+        migrate_compact_log_columns(cur)
+        migrate_block_stats_timestamps(cur)
+        migrate_event_time(cur)
+        migrate_log_templates(cur)
+        
         # Convert classifications table to hypertable
         cur.execute("""
             SELECT create_hypertable('classifications', 'timestamp', 
@@ -56,6 +185,17 @@ def init_db():
         """)
         logger.info("Converted anomaly_params to hypertable")
         
+        # Convert spike_alerts table to hypertable
+        cur.execute("""
+            SELECT create_hypertable('spike_alerts', 'timestamp', 
+                                    if_not_exists => TRUE,
+                                    migrate_data => TRUE);
+        """)
+        cur.execute("""
+            SELECT add_retention_policy('spike_alerts', INTERVAL '30 days', if_not_exists => TRUE);
+        """)
+        logger.info("Converted spike_alerts to hypertable")
+        
         # Convert log_entries table to hypertable
         cur.execute("""
             SELECT create_hypertable('log_entries', 'timestamp', 
@@ -64,6 +204,20 @@ def init_db():
         """)
         logger.info("Converted log_entries to hypertable")
         
+        # Partition on event time too; only possible while the table is empty
+        cur.execute("SELECT EXISTS (SELECT 1 FROM log_entries);")
+        if not cur.fetchone()[0]:
+            try:
+                cur.execute("""
+                    SELECT add_dimension('log_entries', 'event_time',
+                                         chunk_time_interval => INTERVAL '7 days',
+                                         if_not_exists => TRUE);
+                """)
+                logger.info("Added event_time dimension to log_entries")
+            except psycopg2.Error as e:
+                # e.g. a primary key without event_time; the index still serves event-time ranges
+                logger.warning(f"Could not partition log_entries on event_time: {str(e)}")
+        
         # Create time_bucket view for easier time-series queries
         cur.execute("""
             CREATE OR REPLACE VIEW time_bucketed_stats AS
@@ -78,23 +232,69 @@ def init_db():
         """)
         logger.info("Created time_bucketed_stats view")
         
+        # Create a continuous aggregate of log counts per minute, level and component
+        cur.execute("""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS log_volume_1m
+            WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+            SELECT 
+                time_bucket('1 minute', timestamp) AS bucket,
+                log_level_id,
+                hdfs_component_id,
+                COUNT(*) AS log_count
+            FROM log_entries
+            GROUP BY bucket, log_level_id, hdfs_component_id
+            WITH NO DATA;
+        """)
+        cur.execute("""
+            SELECT add_continuous_aggregate_policy('log_volume_1m',
+                start_offset => INTERVAL '1 hour',
+                end_offset => INTERVAL '1 minute',
+                schedule_interval => INTERVAL '1 minute',
+                if_not_exists => TRUE);
+        """)
+        # Materialize existing history once; the policy only covers the last hour
+        cur.execute("CALL refresh_continuous_aggregate('log_volume_1m', NULL, LOCALTIMESTAMP - INTERVAL '1 minute');")
+        logger.info("Created log_volume_1m continuous aggregate")
+        
         # Create a view for HDFS block analysis
         cur.execute("""
             CREATE OR REPLACE VIEW hdfs_block_stats AS
             SELECT 
-                block_id,
+                'blk_' || e.block_id as block_id,
                 COUNT(*) as log_count,
-                MIN(timestamp) as first_seen,
-                MAX(timestamp) as last_seen,
-                array_agg(DISTINCT hdfs_component) as components,
-                array_agg(DISTINCT log_level) as log_levels
-            FROM log_entries
-            WHERE block_id IS NOT NULL
-            GROUP BY block_id
+                MIN(e.timestamp) as first_seen,
+                MAX(e.timestamp) as last_seen,
+                array_agg(DISTINCT c.name) as components,
+                array_agg(DISTINCT l.name) as log_levels
+            FROM log_entries e
+            LEFT JOIN hdfs_components c ON c.id = e.hdfs_component_id
+            LEFT JOIN log_levels l ON l.id = e.log_level_id
+            WHERE e.block_id IS NOT NULL
+            GROUP BY e.block_id
             ORDER BY log_count DESC;
         """)
         logger.info("Created hdfs_block_stats view")
         
+        # Backfill the block_stats rollup from existing logs on first run;
+        # after that the ingesting process keeps it up to date
+        cur.execute("SELECT EXISTS (SELECT 1 FROM block_stats);")
+        if not cur.fetchone()[0]:
+            cur.execute("""
+                INSERT INTO block_stats (block_id, log_count, first_seen, last_seen, level_bits, component_bits)
+                SELECT 
+                    block_id,
+                    COUNT(*),
+                    MIN(timestamp),
+                    MAX(timestamp),
+                    COALESCE(bit_or(CASE WHEN log_level_id <= 64 THEN 1::bigint << (log_level_id - 1) END), 0),
+                    COALESCE(bit_or(CASE WHEN hdfs_component_id <= 64 THEN 1::bigint << (hdfs_component_id - 1) END), 0)
+                FROM log_entries
+                WHERE block_id IS NOT NULL
+                GROUP BY block_id
+                ON CONFLICT (block_id) DO NOTHING;
+            """)
+            logger.info(f"Backfilled block_stats with {cur.rowcount} blocks")
+        
         # Create a function to extract block IDs from messages
         cur.execute("""
             CREATE OR REPLACE FUNCTION extract_block_id(message TEXT)
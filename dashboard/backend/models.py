@@ -1,11 +1,65 @@
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import Column, String, Integer, DateTime, Float, ForeignKey, Text
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Column, String, Integer, BigInteger, SmallInteger, DateTime, Float, ForeignKey, Text, ARRAY
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from pydantic import BaseModel, Field
 
 from database import Base
 
+# Column types
+BLOCK_ID_PREFIX = "blk_"
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def encode_block_id(block_id: Optional[str]) -> Optional[int]:
+    """blk_-123 -> -123; None for anything that isn't a block ID within BIGINT range"""
+    if not block_id or not block_id.startswith(BLOCK_ID_PREFIX):
+        return None
+    try:
+        value = int(block_id[len(BLOCK_ID_PREFIX):])
+    except ValueError:
+        return None
+    return value if INT64_MIN <= value <= INT64_MAX else None
+
+def decode_block_id(value: Optional[int]) -> Optional[str]:
+    return None if value is None else f"{BLOCK_ID_PREFIX}{value}"
+
+class BlockId(TypeDecorator):
+    """HDFS block ID stored as BIGINT, read and written as its blk_ string"""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return value if isinstance(value, int) else encode_block_id(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_block_id(value)
+
+# Lookup table name -> LabelRegistry, filled in by services/labels.py
+LABEL_REGISTRIES: Dict[str, Any] = {}
+
+class LabelId(TypeDecorator):
+    """
+    Name stored as the SMALLINT id of its row in a lookup table, encoded and
+    decoded through the in-process cache of that table's LabelRegistry
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, lookup_table: str):
+        super().__init__()
+        self.lookup_table = lookup_table
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        return LABEL_REGISTRIES[self.lookup_table].encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return LABEL_REGISTRIES[self.lookup_table].decode(value)
+
 # SQLAlchemy Models
 class LogEntry(Base):
     __tablename__ = "log_entries"
@@ -13,14 +67,20 @@ class LogEntry(Base):
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     message = Column(String(1024), nullable=False)
-    log_level = Column(String(20), default="INFO", index=True)
+    log_level = Column("log_level_id", LabelId("log_levels"), ForeignKey("log_levels.id"), index=True)
     
     # HDFS specific fields
     hdfs_date = Column(String(6), nullable=True)         # YYMMDD format
     hdfs_time = Column(String(6), nullable=True)         # HHMMSS format
     thread_id = Column(Integer, nullable=True)           # Thread ID from HDFS log
-    hdfs_component = Column(String(255), nullable=True)  # HDFS component name
-    block_id = Column(String(255), nullable=True)        # HDFS block ID (if present)
+    hdfs_component = Column("hdfs_component_id", LabelId("hdfs_components"), ForeignKey("hdfs_components.id"), nullable=True)  # HDFS component name
+    block_id = Column(BlockId, nullable=True)            # HDFS block ID (if present)
+    # HDFS event time from hdfs_date/hdfs_time (ingest time if the message has none);
+    # `timestamp` is when the entry was ingested
+    event_time = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Mined log template of the message and the message's values at its wildcards
+    template_id = Column(Integer, ForeignKey("log_templates.id"), nullable=True)
+    template_params = Column(ARRAY(Text), nullable=True)
 
 class Classification(Base):
     __tablename__ = "classifications"
@@ -47,6 +107,48 @@ class AnomalyParam(Base):
     param_value = Column(String(1024), nullable=False)
     classification_type = Column(String(20), default="anomaly", index=True)  # "anomaly" or "unidentified"
 
+class SpikeAlert(Base):
+    __tablename__ = "spike_alerts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    series = Column(String(32), nullable=False, index=True)  # "anomaly_rate" or "unidentified_rate"
+    value = Column(Float, nullable=False)
+    expected = Column(Float, nullable=False)  # Baseline the value was compared with
+    z_score = Column(Float, nullable=False)
+    event_count = Column(Integer, nullable=False)  # Events in the classification that raised it
+
+class LogLevel(Base):
+    __tablename__ = "log_levels"
+    
+    id = Column(SmallInteger, primary_key=True)
+    name = Column(String(20), nullable=False, unique=True)
+
+class HdfsComponent(Base):
+    __tablename__ = "hdfs_components"
+    
+    id = Column(SmallInteger, primary_key=True)
+    name = Column(String(255), nullable=False, unique=True)
+
+class LogTemplate(Base):
+    __tablename__ = "log_templates"
+    
+    id = Column(Integer, primary_key=True)
+    template = Column(Text, nullable=False)  # Tokens joined by spaces, <*> for parameters
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class BlockStats(Base):
+    __tablename__ = "block_stats"
+    
+    block_id = Column(BlockId, primary_key=True, autoincrement=False)
+    log_count = Column(BigInteger, nullable=False, default=0, index=True)
+    first_seen = Column(DateTime(timezone=True), nullable=False)
+    last_seen = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Bit (id - 1) is set for every log level / HDFS component seen on the block
+    level_bits = Column(BigInteger, nullable=False, default=0)
+    component_bits = Column(BigInteger, nullable=False, default=0)
+
 # Pydantic Models for API
 
 # Log Entries
@@ -65,11 +167,13 @@ class LogEntryCreate(LogEntryBase):
 class LogEntryResponse(LogEntryBase):
     id: int
     timestamp: datetime
+    event_time: Optional[datetime] = None
     hdfs_date: Optional[str] = None
     hdfs_time: Optional[str] = None
     thread_id: Optional[int] = None
     hdfs_component: Optional[str] = None
     block_id: Optional[str] = None
+    template_id: Optional[int] = None
     
     class Config:
         orm_mode = True
@@ -105,9 +209,70 @@ class AnomalyParamResponse(AnomalyParamBase):
     class Config:
         orm_mode = True
 
+# Spike Alerts
+class SpikeAlertBase(BaseModel):
+    series: str
+    value: float
+    expected: float
+    z_score: float
+    event_count: int
+
+class SpikeAlertCreate(SpikeAlertBase):
+    pass
+
+class SpikeAlertResponse(SpikeAlertBase):
+    id: int
+    timestamp: datetime
+    
+    class Config:
+        orm_mode = True
+
 # Time Series Data
 class TimeSeriesData(BaseModel):
     timestamp: datetime
     normal_count: int = 0
     anomaly_count: int = 0
-    unidentified_count: int = 0
\ No newline at end of file
+    unidentified_count: int = 0
+
+class TimeSeriesColumns(BaseModel):
+    timestamps: List[int] = []  # Epoch milliseconds
+    normal_count: List[int] = []
+    anomaly_count: List[int] = []
+    unidentified_count: List[int] = []
+
+class LogVolumeData(BaseModel):
+    timestamp: datetime
+    log_level: Optional[str] = None  # Set when grouped by level
+    hdfs_component: Optional[str] = None  # Set when grouped by component
+    log_count: int = 0
+
+class LogTemplateCount(BaseModel):
+    template_id: int
+    template: str
+    log_count: int = 0
+    last_seen: Optional[datetime] = None
+
+class BlockFeatures(BaseModel):
+    block_id: str
+    first_seen: datetime
+    last_seen: datetime
+    log_count: int = 0
+    template_counts: Dict[int, int] = {}  # Template id -> logs of the block with it
+    sequence: List[int] = []  # Latest template ids, oldest first
+
+# Dashboard Snapshot
+class DashboardSnapshot(BaseModel):
+    generated_at: datetime
+    recent_logs: List[LogEntryResponse] = []
+    summary: Dict[str, Any] = {}
+    recent_anomalies: List[AnomalyParamResponse] = []
+    recent_unidentified: List[AnomalyParamResponse] = []
+    time_series: List[TimeSeriesData] = []
+
+# Delta Sync
+class ChangesResponse(BaseModel):
+    cursor: str
+    logs: List[LogEntryResponse] = []
+    classifications: List[ClassificationResponse] = []
+    anomalies: List[AnomalyParamResponse] = []
+    has_more: bool = False
@@ -1,2 +1,2 @@
 # Import all routes to be included in the application
-from routes import logs, statistics, anomalies, hdfs
\ No newline at end of file
+from routes import logs, statistics, anomalies, hdfs, stream, metrics, dashboard, changes, export
\ No newline at end of file
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sse_starlette.sse import EventSourceResponse
+
+from database import get_db
+from models import SpikeAlertResponse
+from services.db_service import DBService
+from services.serialization import dump_rows, SPIKE_ALERT_FIELDS
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# In-memory store of connected SSE clients for real-time updates
+alert_clients = []
+
+# Latest spike detector state published by the ingesting worker
+detector_state: Dict[str, Any] = {}
+
+@router.get("/", response_model=List[SpikeAlertResponse])
+async def get_spike_alerts(
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    series: Optional[str] = Query(None, pattern="^(anomaly_rate|unidentified_rate)$"),
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get spike alerts, newest first, with optional filtering
+    """
+    rows = await DBService.get_spike_alert_rows(
+        db,
+        skip=skip,
+        limit=limit,
+        series=series,
+        start_time=start_time,
+        end_time=end_time
+    )
+    return Response(content=dump_rows(rows, SPIKE_ALERT_FIELDS), media_type="application/json")
+
+@router.get("/detector", response_model=Dict[str, Any])
+async def get_detector_state():
+    """
+    Get the spike detector's baselines and latest scores
+    """
+    return detector_state or {"updated_at": None, "series": {}}
+
+@router.get("/stream")
+async def stream_alerts(request: Request):
+    """
+    Stream spike alerts in real-time using SSE
+    """
+    async def event_generator():
+        # Create a new queue for this client
+        queue = asyncio.Queue()
+        client_id = id(queue)  # Generate unique ID for this client
+        alert_clients.append(queue)
+        logger.info(f"Client connected to alerts stream: {client_id}")
+
+        # Initial keepalive to establish connection
+        yield {
+            "event": "ping",
+            "id": "0",
+            "data": json.dumps({"status": "connected"})
+        }
+
+        try:
+            while True:
+                # Check if client is still connected
+                if await request.is_disconnected():
+                    logger.info(f"Client {client_id} disconnected")
+                    break
+
+                # Wait for new alerts with timeout
+                try:
+                    alert_dict = await asyncio.wait_for(queue.get(), timeout=30.0)
+
+                    yield {
+                        "event": "alert",
+                        "id": str(alert_dict["id"]),
+                        "data": json.dumps(alert_dict)
+                    }
+                except asyncio.TimeoutError:
+                    # Send keepalive ping every 30 seconds to maintain connection
+                    yield {
+                        "event": "ping",
+                        "id": "keepalive",
+                        "data": json.dumps({"timestamp": datetime.now().isoformat()})
+                    }
+        except asyncio.CancelledError:
+            # Client disconnected
+            logger.info(f"Client {client_id} connection cancelled")
+        except Exception as e:
+            logger.error(f"Error in alerts stream for client {client_id}: {str(e)}")
+        finally:
+            # Remove client queue when connection ends
+            if queue in alert_clients:
+                alert_clients.remove(queue)
+            logger.info(f"Client {client_id} removed from alerts stream")
+
+    return EventSourceResponse(event_generator())
+
+def alert_event_payload(alert) -> dict:
+    """Convert a saved spike alert to the dict sent to stream clients"""
+    return {
+        "id": alert.id,
+        "timestamp": alert.timestamp.isoformat(),
+        "series": alert.series,
+        "value": alert.value,
+        "expected": alert.expected,
+        "z_score": alert.z_score,
+        "event_count": alert.event_count
+    }
+
+# Function to broadcast new spike alerts to all connected clients
+async def broadcast_alert(alert_dict: dict):
+    disconnected_clients = []
+
+    for i, queue in enumerate(alert_clients):
+        try:
+            await queue.put(alert_dict)
+        except Exception as e:
+            logger.error(f"Error broadcasting alert to client {i}: {str(e)}")
+            disconnected_clients.append(queue)
+
+    # Clean up disconnected clients
+    for queue in disconnected_clients:
+        if queue in alert_clients:
+            alert_clients.remove(queue)
+
+async def update_detector_state(state: dict):
+    """Keep the detector state the ingesting worker published, for /alerts/detector"""
+    detector_state.clear()
+    detector_state.update(state)
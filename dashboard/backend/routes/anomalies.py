@@ -3,7 +3,7 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 
@@ -11,6 +11,7 @@ import config
 from database import get_db
 from models import AnomalyParamResponse, AnomalyParamCreate
 from services.db_service import DBService
+from services.serialization import dump_rows, ANOMALY_PARAM_FIELDS
 
 router = APIRouter(prefix="/anomalies", tags=["anomalies"])
 # router = APIRouter(tags=["anomalies"])
@@ -33,7 +34,8 @@ async def get_anomaly_params(
     """
     Get anomaly parameters with optional filtering
     """
-    anomaly_params = await DBService.get_anomaly_params(
+    # Plain rows straight to JSON; the response model only documents the schema
+    rows = await DBService.get_anomaly_param_rows(
         db, 
         skip=skip, 
         limit=limit,
@@ -41,7 +43,7 @@ async def get_anomaly_params(
         start_time=start_time,
         end_time=end_time
     )
-    return anomaly_params
+    return Response(content=dump_rows(rows, ANOMALY_PARAM_FIELDS), media_type="application/json")
 
 @router.get("/recent", response_model=List[AnomalyParamResponse])
 async def get_recent_anomalies(
@@ -55,7 +57,7 @@ async def get_recent_anomalies(
     end_time = datetime.now()
     start_time = end_time - timedelta(hours=hours)
     
-    anomaly_params = await DBService.get_anomaly_params(
+    rows = await DBService.get_anomaly_param_rows(
         db,
         classification_type="anomaly",
         start_time=start_time,
@@ -63,7 +65,7 @@ async def get_recent_anomalies(
         limit=limit
     )
     
-    return anomaly_params
+    return Response(content=dump_rows(rows, ANOMALY_PARAM_FIELDS), media_type="application/json")
 
 @router.get("/unidentified", response_model=List[AnomalyParamResponse])
 async def get_unidentified(
@@ -77,7 +79,7 @@ async def get_unidentified(
     end_time = datetime.now()
     start_time = end_time - timedelta(hours=hours)
     
-    unidentified_params = await DBService.get_anomaly_params(
+    rows = await DBService.get_anomaly_param_rows(
         db,
         classification_type="unidentified",
         start_time=start_time,
@@ -85,7 +87,7 @@ async def get_unidentified(
         limit=limit
     )
     
-    return unidentified_params
+    return Response(content=dump_rows(rows, ANOMALY_PARAM_FIELDS), media_type="application/json")
 
 @router.get("/stream")
 async def stream_anomalies(request: Request):
@@ -115,20 +117,12 @@ async def stream_anomalies(request: Request):
                     
                 # Wait for new anomaly parameters with timeout
                 try:
-                    anomaly = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    
-                    # Convert to dict for sending over SSE
-                    anomaly_dict = {
-                        "id": anomaly.id,
-                        "timestamp": anomaly.timestamp.isoformat(),
-                        "param_value": anomaly.param_value,
-                        "classification_type": anomaly.classification_type
-                    }
+                    anomaly_dict = await asyncio.wait_for(queue.get(), timeout=30.0)
                     
                     # Send the anomaly as an event with proper JSON serialization
                     yield {
                         "event": "anomaly",
-                        "id": str(anomaly.id),
+                        "id": str(anomaly_dict["id"]),
                         "data": json.dumps(anomaly_dict)
                     }
                 except asyncio.TimeoutError:
@@ -151,13 +145,22 @@ async def stream_anomalies(request: Request):
     
     return EventSourceResponse(event_generator())
 
+def anomaly_event_payload(anomaly) -> dict:
+    """Convert a saved anomaly parameter to the dict sent to stream clients"""
+    return {
+        "id": anomaly.id,
+        "timestamp": anomaly.timestamp.isoformat(),
+        "param_value": anomaly.param_value,
+        "classification_type": anomaly.classification_type
+    }
+
 # Function to broadcast new anomaly parameters to all connected clients
-async def broadcast_anomaly(anomaly):
+async def broadcast_anomaly(anomaly_dict: dict):
     disconnected_clients = []
     
     for i, queue in enumerate(anomaly_clients):
         try:
-            await queue.put(anomaly)
+            await queue.put(anomaly_dict)
         except Exception as e:
             logger.error(f"Error broadcasting anomaly to client {i}: {str(e)}")
             disconnected_clients.append(queue)
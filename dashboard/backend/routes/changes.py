@@ -0,0 +1,67 @@
+import logging
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from models import LogEntry, Classification, AnomalyParam, ChangesResponse
+from services.db_service import DBService
+from services.serialization import dumps, LOG_ENTRY_FIELDS, CLASSIFICATION_FIELDS, ANOMALY_PARAM_FIELDS
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Tables covered by the cursor, in cursor order. Rows are handed out only once
+# settled (see DBService.settled_before), so a late commit is never skipped
+CHANGE_TABLES = {
+    "logs": (LogEntry, LOG_ENTRY_FIELDS),
+    "classifications": (Classification, CLASSIFICATION_FIELDS),
+    "anomalies": (AnomalyParam, ANOMALY_PARAM_FIELDS),
+}
+
+def encode_cursor(high_water_marks: Dict[str, int]) -> str:
+    return ".".join(str(high_water_marks[table]) for table in CHANGE_TABLES)
+
+def decode_cursor(cursor: str) -> Dict[str, int]:
+    parts = cursor.split(".")
+    if len(parts) != len(CHANGE_TABLES) or not all(part.isdigit() for part in parts):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return {table: int(part) for table, part in zip(CHANGE_TABLES, parts)}
+
+@router.get("/", response_model=ChangesResponse)
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get log entries, classifications and anomaly params inserted after the cursor,
+    plus the cursor to pass next time. Without `since`, returns the current cursor only
+    """
+    if since is None:
+        return ChangesResponse(cursor=encode_cursor(await DBService.get_latest_ids(db)))
+
+    try:
+        high_water_marks = decode_cursor(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    changes = {}
+    has_more = False
+    for table, (model, fields) in CHANGE_TABLES.items():
+        # One extra row tells whether the client should call again right away
+        rows = await DBService.get_rows_after_id(db, model, fields, high_water_marks[table], limit + 1)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            has_more = True
+        if rows:
+            high_water_marks[table] = rows[-1][fields.index("id")]
+        changes[table] = [dict(zip(fields, row)) for row in rows]
+
+    # Plain rows like the other read paths: a label this worker can't decode yet stays null
+    return Response(
+        content=dumps({"cursor": encode_cursor(high_water_marks), **changes, "has_more": has_more}),
+        media_type="application/json"
+    )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from models import DashboardSnapshot
+from services.dashboard_snapshot import dashboard_snapshot
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+@router.get("/snapshot", response_model=DashboardSnapshot)
+async def get_dashboard_snapshot():
+    """
+    Get everything the dashboard needs on load (recent logs, summary counts,
+    latest anomaly and unidentified params, time series) from the in-memory
+    snapshot refreshed every DASHBOARD_SNAPSHOT_INTERVAL_SECONDS
+    """
+    # Already serialized when the snapshot was refreshed
+    return Response(content=await dashboard_snapshot.get_json(), media_type="application/json")
@@ -0,0 +1,70 @@
+import logging
+from datetime import datetime
+from functools import partial
+from typing import Optional
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+import config
+from services.arrow_export import pa, BatchWriter, export_columns, export_schema
+from services.export import stream_log_rows, stream_anomaly_param_rows
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+@router.get("/{table}")
+async def export_table(
+    request: Request,
+    table: str,
+    format: str = Query("arrow", pattern="^(arrow|parquet)$"),
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    time_basis: str = Query("ingest", pattern="^(ingest|event)$")
+):
+    """
+    Export log_entries or anomaly_params for a time range as an Arrow IPC
+    stream or a Parquet file, built batch by batch from a database cursor
+    (time_basis=event ranges log_entries by HDFS event time)
+    """
+    if table not in ("log_entries", "anomaly_params"):
+        raise HTTPException(status_code=404, detail=f"Unknown export table {table}")
+    if pa is None:
+        raise HTTPException(status_code=501, detail="Arrow export requires pyarrow")
+
+    columns = export_columns(table)
+    if table == "log_entries":
+        stream_rows = partial(stream_log_rows, by_event_time=time_basis == "event")
+    else:
+        stream_rows = stream_anomaly_param_rows
+
+    async def generate():
+        writer = BatchWriter(format, export_schema(table))
+        exported = 0
+        rows_iterator = stream_rows(
+            columns=columns,
+            start_time=start_time,
+            end_time=end_time,
+            chunk_rows=config.ARROW_EXPORT_BATCH_ROWS
+        )
+        try:
+            async for rows in rows_iterator:
+                # Stop reading from the cursor as soon as the client goes away
+                if await request.is_disconnected():
+                    logger.info(f"{table} export cancelled by client after {exported} rows")
+                    return
+                yield writer.write_rows(rows)
+                exported += len(rows)
+        finally:
+            await rows_iterator.aclose()
+        # End of stream marker / Parquet footer
+        yield writer.close()
+        logger.info(f"{table} export finished: {exported} rows")
+
+    filename = f"{table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type=BatchWriter.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
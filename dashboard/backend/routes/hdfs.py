@@ -1,16 +1,23 @@
+import io
+import re
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, Query, HTTPException
+import numpy as np
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
-from models import LogEntryResponse
+from models import LogEntryResponse, BlockFeatures
 from services.hdfs_service import HDFSLogService
-from services.db_service import DBService
+from services.query_cache import query_cache
+from services.serialization import dumps, dump_rows, LOG_ENTRY_FIELDS
+from services.block_sessions import block_sessions
 
 # Create a new router for HDFS-specific endpoints
 router = APIRouter(prefix="/hdfs", tags=["hdfs"])
 
+BLOCK_ID_PATTERN = re.compile(r"^blk_-?\d+$")
+
 @router.get("/blocks", response_model=List[Dict[str, Any]])
 async def get_hdfs_blocks(
     hours: Optional[int] = Query(24, description="Number of hours to look back"),
@@ -21,122 +28,106 @@ async def get_hdfs_blocks(
     """
     Get statistics about HDFS blocks from logs
     """
-    end_time = datetime.now()
-    start_time = end_time - timedelta(hours=hours)
+    async def compute():
+        end_time = datetime.now()
+        start_time = end_time - timedelta(hours=hours)
+        
+        return await HDFSLogService.get_hdfs_block_stats(
+            db, 
+            limit=limit,
+            min_logs=min_logs,
+            start_time=start_time,
+            end_time=end_time
+        )
     
-    blocks = await HDFSLogService.get_hdfs_block_stats(
-        db, 
-        limit=limit,
-        min_logs=min_logs,
-        start_time=start_time,
-        end_time=end_time
+    return await query_cache.get_or_compute(
+        "hdfs.blocks",
+        {"hours": hours, "min_logs": min_logs, "limit": limit},
+        compute,
+        tags=("block_stats",)
     )
-    
-    return blocks
 
-@router.get("/components", response_model=Dict[str, int])
-async def get_component_activity(
-    hours: Optional[int] = Query(24, description="Number of hours to look back"),
-    components: Optional[List[str]] = Query(None, description="Filter by specific components"),
-    db: AsyncSession = Depends(get_db)
+@router.get("/blocks/features")
+async def get_block_feature_matrix(
+    format: str = Query("json", pattern="^(json|npz)$"),
+    block_ids: Optional[List[str]] = Query(None, description="Only these blocks (default: every block with a session)")
 ):
     """
-    Get activity counts by HDFS component over the specified time period
+    Get the template count matrix of the blocks with an in-memory session:
+    one row per block, one column per template id
     """
-    activity = await HDFSLogService.get_component_activity(
-        db,
-        hours=hours,
-        components=components
-    )
+    matrix = block_sessions.matrix(block_ids)
+    if format == "npz":
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            block_ids=np.array(matrix["block_ids"], dtype=str),
+            template_ids=np.array(matrix["template_ids"], dtype=np.int64),
+            counts=matrix["counts"],
+            log_counts=matrix["log_counts"],
+            first_seen=matrix["first_seen"],
+            last_seen=matrix["last_seen"]
+        )
+        filename = f"block_features_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz"
+        return Response(
+            content=buffer.getvalue(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
     
-    return activity
+    content = {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in matrix.items()}
+    return Response(content=dumps(content), media_type="application/json")
 
-@router.get("/logs/{block_id}", response_model=List[LogEntryResponse])
-async def get_logs_by_block_id(
-    block_id: str,
-    limit: Optional[int] = Query(100, description="Maximum number of logs to return"),
-    db: AsyncSession = Depends(get_db)
-):
+@router.get("/blocks/{block_id}/features", response_model=BlockFeatures)
+async def get_block_features(block_id: str):
     """
-    Get logs for a specific HDFS block ID
+    Get the template counts and recent template sequence of an HDFS block
+    from its in-memory session
     """
-    if not block_id.startswith("blk_"):
+    if not BLOCK_ID_PATTERN.match(block_id):
         raise HTTPException(status_code=400, detail="Invalid block ID format")
-        
-    # Get logs with the specified block ID
-    query = f"block_id = '{block_id}'"
-    logs = await DBService.get_log_entries(
-        db,
-        filter_query=query,
-        limit=limit
-    )
     
-    return logs
-
-@router.get("/blocks", response_model=List[Dict[str, Any]])
-async def get_hdfs_blocks(
-    limit: int = 100,
-    min_logs: int = 1,
-    hours: Optional[int] = 24,
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Get statistics about HDFS blocks from logs
-    """
-    # Calculate time range based on hours
-    end_time = datetime.now()
-    start_time = end_time - timedelta(hours=hours) if hours else None
-    
-    blocks = await HDFSLogService.get_hdfs_block_stats(
-        db=db, 
-        limit=limit, 
-        min_logs=min_logs,
-        start_time=start_time,
-        end_time=end_time
-    )
-    
-    return blocks
+    features = block_sessions.features(block_id)
+    if features is None:
+        raise HTTPException(status_code=404, detail="No active session for this block")
+    return features
 
 @router.get("/components", response_model=Dict[str, int])
 async def get_component_activity(
-    hours: int = 24,
-    components: List[str] = Query(None),
+    hours: Optional[int] = Query(24, description="Number of hours to look back"),
+    components: Optional[List[str]] = Query(None, description="Filter by specific components"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get activity counts by HDFS component
+    Get activity counts by HDFS component over the specified time period
     """
-    activity = await HDFSLogService.get_component_activity(
-        db=db,
-        hours=hours,
-        components=components
-    )
+    async def compute():
+        return await HDFSLogService.get_component_activity(
+            db,
+            hours=hours,
+            components=components
+        )
     
-    return activity
+    return await query_cache.get_or_compute(
+        "hdfs.components",
+        {"hours": hours, "components": components or []},
+        compute,
+        tags=("log_entries",)
+    )
 
 @router.get("/logs/{block_id}", response_model=List[LogEntryResponse])
-async def get_logs_by_block(
+async def get_logs_by_block_id(
     block_id: str,
-    limit: int = 100,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of logs to return"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all logs related to a specific HDFS block
+    Get the lifecycle of an HDFS block: all of its logs, oldest first
     """
-    from sqlalchemy import select, desc
-    from models import LogEntry
-    
-    query = (
-        select(LogEntry)
-        .where(LogEntry.block_id == block_id)
-        .order_by(desc(LogEntry.timestamp))
-        .limit(limit)
-    )
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
+    if not BLOCK_ID_PATTERN.match(block_id):
+        raise HTTPException(status_code=400, detail="Invalid block ID format")
     
-    if not logs:
+    rows = await HDFSLogService.get_block_lifecycle(db, block_id, limit=limit)
+    if not rows:
         raise HTTPException(status_code=404, detail=f"No logs found for block ID {block_id}")
-    
-    return logs
+    return Response(content=dump_rows(rows, LOG_ENTRY_FIELDS), media_type="application/json")
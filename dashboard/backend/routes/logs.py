@@ -3,14 +3,18 @@ import json
 import logging
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 
 import config
 from database import get_db
-from models import LogEntryResponse, LogEntryCreate
+from models import LogEntryResponse, LogEntryCreate, LogVolumeData, LogTemplateCount
 from services.db_service import DBService
+from services.query_cache import query_cache
+from services.serialization import dump_rows, LOG_ENTRY_FIELDS
+from services.export import stream_log_rows, ndjson_chunk, csv_chunk
 
 # router = APIRouter(prefix=f"{config.API_PREFIX}/logs", tags=["logs"])
 router = APIRouter(prefix="/logs", tags=["logs"])
@@ -29,20 +33,132 @@ async def get_logs(
     log_level: Optional[str] = None,
     start_time: Optional[datetime] = None,
     end_time: Optional[datetime] = None,
+    time_basis: str = Query("ingest", pattern="^(ingest|event)$"),
+    template_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get log entries with optional filtering
+    With time_basis=event, the time range and order use HDFS event time instead of ingest time
     """
-    logs = await DBService.get_log_entries(
+    # Plain rows straight to JSON; the response model only documents the schema
+    rows = await DBService.get_log_entry_rows(
         db, 
         skip=skip, 
         limit=limit,
         log_level=log_level,
         start_time=start_time,
-        end_time=end_time
+        end_time=end_time,
+        by_event_time=time_basis == "event",
+        template_id=template_id
+    )
+    return Response(content=dump_rows(rows, LOG_ENTRY_FIELDS), media_type="application/json")
+
+@router.get("/export")
+async def export_logs(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    log_level: Optional[str] = None,
+    hdfs_component: Optional[str] = None,
+    block_id: Optional[str] = None,
+    time_basis: str = Query("ingest", pattern="^(ingest|event)$"),
+    template_id: Optional[int] = None
+):
+    """
+    Stream every matching log entry, oldest first, as NDJSON or CSV
+    """
+    async def generate():
+        if format == "csv":
+            yield csv_chunk([LOG_ENTRY_FIELDS])
+        exported = 0
+        rows_iterator = stream_log_rows(
+            start_time=start_time,
+            end_time=end_time,
+            log_level=log_level,
+            hdfs_component=hdfs_component,
+            block_id=block_id,
+            by_event_time=time_basis == "event",
+            template_id=template_id
+        )
+        try:
+            async for rows in rows_iterator:
+                # Stop reading from the cursor as soon as the client goes away
+                if await request.is_disconnected():
+                    logger.info(f"Log export cancelled by client after {exported} rows")
+                    break
+                yield csv_chunk(rows) if format == "csv" else ndjson_chunk(rows, LOG_ENTRY_FIELDS)
+                exported += len(rows)
+        finally:
+            await rows_iterator.aclose()
+        logger.info(f"Log export finished: {exported} rows")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/volume", response_model=List[LogVolumeData])
+async def get_log_volume(
+    interval_minutes: int = Query(5, ge=1, le=1440),
+    hours: int = Query(24, ge=1, le=720),
+    group_by: str = Query("log_level", pattern="^(log_level|hdfs_component|both)$"),
+    log_level: Optional[str] = None,
+    hdfs_component: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get log counts per interval split by level, HDFS component or both
+    Default: the past 24 hours in 5-minute intervals, by level
+    """
+    columns = ("log_level", "hdfs_component") if group_by == "both" else (group_by,)
+    
+    async def compute():
+        return await DBService.get_log_volume(
+            db,
+            interval_minutes=interval_minutes,
+            hours=hours,
+            group_by=columns,
+            log_level=log_level,
+            hdfs_component=hdfs_component
+        )
+    
+    return await query_cache.get_or_compute(
+        "logs.volume",
+        {
+            "interval_minutes": interval_minutes,
+            "hours": hours,
+            "group_by": group_by,
+            "log_level": log_level,
+            "hdfs_component": hdfs_component
+        },
+        compute,
+        tags=("log_entries",)
+    )
+
+@router.get("/templates", response_model=List[LogTemplateCount])
+async def get_log_templates(
+    hours: int = Query(24, ge=1, le=720),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the log templates mined at ingestion with their log counts, most frequent first
+    Default: the past 24 hours
+    """
+    async def compute():
+        return await DBService.get_log_template_counts(db, hours=hours, limit=limit)
+    
+    return await query_cache.get_or_compute(
+        "logs.templates",
+        {"hours": hours, "limit": limit},
+        compute,
+        tags=("log_entries",)
     )
-    return logs
 
 @router.get("/stream")
 async def stream_logs(request: Request):
@@ -72,20 +188,12 @@ async def stream_logs(request: Request):
                     
                 # Wait for new logs with timeout
                 try:
-                    log = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    
-                    # Convert to dict for sending over SSE
-                    log_dict = {
-                        "id": log.id,
-                        "timestamp": log.timestamp.isoformat(),
-                        "message": log.message,
-                        "log_level": log.log_level
-                    }
+                    log_dict = await asyncio.wait_for(queue.get(), timeout=30.0)
                     
                     # Send the log as an event with proper JSON serialization
                     yield {
                         "event": "log",
-                        "id": str(log.id),
+                        "id": str(log_dict["id"]),
                         "data": json.dumps(log_dict)
                     }
                 except asyncio.TimeoutError:
@@ -108,13 +216,24 @@ async def stream_logs(request: Request):
     
     return EventSourceResponse(event_generator())
 
+def log_event_payload(log) -> dict:
+    """Convert a saved log entry to the dict sent to stream clients"""
+    return {
+        "id": log.id,
+        "timestamp": log.timestamp.isoformat(),
+        "message": log.message,
+        "log_level": log.log_level,
+        "block_id": log.block_id,
+        "template_id": log.template_id
+    }
+
 # Function to broadcast new logs to all connected clients
-async def broadcast_log(log):
+async def broadcast_log(log_dict: dict):
     disconnected_clients = []
     
     for i, queue in enumerate(log_clients):
         try:
-            await queue.put(log)
+            await queue.put(log_dict)
         except Exception as e:
             logger.error(f"Error broadcasting log to client {i}: {str(e)}")
             disconnected_clients.append(queue)
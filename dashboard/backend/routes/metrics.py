@@ -0,0 +1,27 @@
+from typing import Any, Dict
+from fastapi import APIRouter
+
+from services.query_cache import query_cache
+from services.timeseries_cache import time_series_cache
+from services.singleflight import single_flight
+from services.block_stats import block_stats_writer
+from services.templates import template_miner
+from services.block_sessions import block_sessions
+from services.scoring import batch_scorer
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/", response_model=Dict[str, Any])
+async def get_metrics():
+    """
+    Get in-process performance metrics for this worker
+    """
+    return {
+        "query_cache": query_cache.stats(),
+        "time_series_cache": time_series_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "block_stats": block_stats_writer.stats(),
+        "template_miner": template_miner.stats(),
+        "block_sessions": block_sessions.stats(),
+        "scoring": batch_scorer.stats()
+    }
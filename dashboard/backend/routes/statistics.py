@@ -2,15 +2,19 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 
 import config
 from database import get_db
-from models import ClassificationResponse, ClassificationCreate, TimeSeriesData
+from models import ClassificationResponse, ClassificationCreate, TimeSeriesData, TimeSeriesColumns
 from services.db_service import DBService
+from services.query_cache import query_cache
+from services.timeseries_cache import time_series_cache
+from services.downsampling import downsample_indices
+from services.serialization import dumps, dump_rows, time_series_columns, CLASSIFICATION_FIELDS
 
 router = APIRouter(prefix=f"{config.API_PREFIX}/statistics", tags=["statistics"])
 router = APIRouter(prefix="/statistics", tags=["statistics"])
@@ -33,31 +37,74 @@ async def get_classifications(
     """
     Get classification data with optional filtering
     """
-    classifications = await DBService.get_classifications(
+    # Plain rows straight to JSON; the response model only documents the schema
+    rows = await DBService.get_classification_rows(
         db, 
         skip=skip, 
         limit=limit,
         start_time=start_time,
         end_time=end_time
     )
-    return classifications
+    return Response(content=dump_rows(rows, CLASSIFICATION_FIELDS), media_type="application/json")
 
-@router.get("/time-series", response_model=List[TimeSeriesData])
+@router.get("/time-series", response_model=Union[List[TimeSeriesData], TimeSeriesColumns])
 async def get_time_series_data(
     interval_minutes: int = Query(5, ge=1, le=60),
     hours: int = Query(24, ge=1, le=168),  # Max 7 days (168 hours)
+    format: str = Query("rows", pattern="^(rows|columnar)$"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get time series data aggregated by intervals
     Default: data for the past 24 hours in 5-minute intervals
+    With format=columnar: parallel arrays with epoch-millisecond timestamps
+    With max_points: empty intervals filled with zeros, then downsampled with LTTB
     """
-    time_series = await DBService.get_time_series_data(
-        db,
-        interval_minutes=interval_minutes,
-        hours=hours
+    fill_gaps = max_points is not None
+    
+    async def compute():
+        try:
+            # Only the missing and still-open buckets are read from the database
+            return await time_series_cache.get_time_series(
+                db,
+                interval_minutes=interval_minutes,
+                hours=hours,
+                fill_gaps=fill_gaps
+            )
+        except Exception as e:
+            logger.warning(f"Time series bucket cache failed, querying all buckets: {str(e)}")
+            await db.rollback()
+            return await DBService.get_time_series_data(
+                db,
+                interval_minutes=interval_minutes,
+                hours=hours,
+                fill_gaps=fill_gaps
+            )
+    
+    points = await query_cache.get_or_compute(
+        "statistics.time_series",
+        {"interval_minutes": interval_minutes, "hours": hours, "fill_gaps": fill_gaps},
+        compute,
+        tags=("classifications",)
     )
-    return time_series
+    
+    if max_points is not None and len(points) > max_points:
+        # Shape-preserving, so short spikes survive the reduction
+        indices = downsample_indices(
+            [point.timestamp.timestamp() for point in points],
+            [
+                [point.normal_count for point in points],
+                [point.anomaly_count for point in points],
+                [point.unidentified_count for point in points],
+            ],
+            max_points
+        )
+        points = [points[index] for index in indices]
+    
+    if format == "columnar":
+        return Response(content=dumps(time_series_columns(points)), media_type="application/json")
+    return points
 
 @router.get("/summary")
 async def get_summary(
@@ -67,50 +114,22 @@ async def get_summary(
     """
     Get summary statistics for the specified time period
     """
-    end_time = datetime.now()
-    start_time = end_time - timedelta(hours=hours)
+    async def compute():
+        # Sum in the database rather than loading every classification row
+        return await DBService.get_classification_summary(db, hours=hours)
     
-    # Get classifications for the time period
-    classifications = await DBService.get_classifications(
-        db,
-        start_time=start_time,
-        end_time=end_time,
-        limit=10000  # High limit to get all data
+    return await query_cache.get_or_compute(
+        "statistics.summary",
+        {"hours": hours},
+        compute,
+        tags=("classifications",)
     )
-    
-    # Calculate summary statistics
-    total_events = 0
-    normal_count = 0
-    anomaly_count = 0
-    unidentified_count = 0
-    
-    for cls in classifications:
-        normal_count += cls.normal_count
-        anomaly_count += cls.anomaly_count
-        unidentified_count += cls.unidentified_count
-        
-    total_events = normal_count + anomaly_count + unidentified_count
-    
-    # Calculate percentages
-    normal_percent = (normal_count / total_events * 100) if total_events > 0 else 0
-    anomaly_percent = (anomaly_count / total_events * 100) if total_events > 0 else 0
-    unidentified_percent = (unidentified_count / total_events * 100) if total_events > 0 else 0
-    
-    return {
-        "total_events": total_events,
-        "normal_count": normal_count,
-        "anomaly_count": anomaly_count,
-        "unidentified_count": unidentified_count,
-        "normal_percent": round(normal_percent, 2),
-        "anomaly_percent": round(anomaly_percent, 2),
-        "unidentified_percent": round(unidentified_percent, 2),
-        "time_period_hours": hours
-    }
 
 @router.get("/stream")
 async def stream_statistics(request: Request):
     """
-    Stream statistics in real-time using SSE
+    Stream rolling-window statistics snapshots using SSE
+    (one event per STATS_STREAM_INTERVAL_SECONDS while the counts change)
     """
     async def event_generator():
         # Create a new queue for this client
@@ -135,21 +154,12 @@ async def stream_statistics(request: Request):
                 
                 # Wait for new statistics with timeout
                 try:
-                    stat = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    
-                    # Convert to dict for sending over SSE
-                    stat_dict = {
-                        "id": stat.id,
-                        "timestamp": stat.timestamp.isoformat(),
-                        "normal_count": stat.normal_count,
-                        "anomaly_count": stat.anomaly_count,
-                        "unidentified_count": stat.unidentified_count
-                    }
+                    stat_dict = await asyncio.wait_for(queue.get(), timeout=30.0)
                     
                     # Send the statistics as an event with proper JSON serialization
                     yield {
                         "event": "statistics",
-                        "id": str(stat.id),
+                        "id": str(stat_dict["id"]),
                         "data": json.dumps(stat_dict)
                     }
                 except asyncio.TimeoutError:
@@ -173,12 +183,12 @@ async def stream_statistics(request: Request):
     return EventSourceResponse(event_generator())
 
 # Function to broadcast new statistics to all connected clients
-async def broadcast_statistics(stat):
+async def broadcast_statistics(stat_dict: dict):
     disconnected_clients = []
     
     for i, queue in enumerate(stats_clients):
         try:
-            await queue.put(stat)
+            await queue.put(stat_dict)
         except Exception as e:
             logger.error(f"Error broadcasting statistics to client {i}: {str(e)}")
             disconnected_clients.append(queue)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+import msgpack
+
+from routes import logs, statistics, anomalies, alerts
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Channels available on the multiplexed socket, mapped to the same in-memory
+# client lists the SSE endpoints register with
+CHANNELS: Dict[str, list] = {
+    "logs": logs.log_clients,
+    "statistics": statistics.stats_clients,
+    "anomalies": anomalies.anomaly_clients,
+    "alerts": alerts.alert_clients,
+}
+
+
+class ChannelQueue:
+    """
+    Stand-in for an SSE client queue that tags every item with its channel
+    and forwards it to the shared outbox of one WebSocket connection
+    """
+
+    def __init__(self, channel: str, outbox: asyncio.Queue):
+        self.channel = channel
+        self.outbox = outbox
+
+    async def put(self, item):
+        await self.outbox.put((self.channel, item))
+
+
+def encode_frame(channel: str, data) -> bytes:
+    """Encode a server frame as a MessagePack array: [channel, data]"""
+    return msgpack.packb([channel, data], use_bin_type=True)
+
+
+def decode_control(message: dict) -> Optional[dict]:
+    """Decode a client control message sent either as JSON text or MessagePack bytes"""
+    if message.get("bytes") is not None:
+        return msgpack.unpackb(message["bytes"], raw=False)
+    if message.get("text") is not None:
+        return json.loads(message["text"])
+    return None
+
+
+def parse_channels(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [channel.strip() for channel in value if channel and channel.strip()]
+
+
+@router.websocket("/ws")
+async def stream_websocket(
+    websocket: WebSocket,
+    channels: Optional[str] = Query(None, description="Comma-separated channels to subscribe to on connect")
+):
+    """
+    Stream logs, statistics, anomalies and spike alerts over a single WebSocket connection
+
+    Server frames are MessagePack arrays of [channel, data]. Clients manage
+    their subscriptions by sending {"action": "subscribe" | "unsubscribe",
+    "channels": [...]} as JSON text or MessagePack bytes.
+    """
+    await websocket.accept()
+
+    outbox = asyncio.Queue()
+    client_id = id(outbox)
+    subscriptions: Dict[str, ChannelQueue] = {}
+    logger.info(f"Client connected to WebSocket stream: {client_id}")
+
+    def subscribe(names: List[str]) -> Set[str]:
+        unknown = set()
+        for name in names:
+            if name not in CHANNELS:
+                unknown.add(name)
+                continue
+            if name not in subscriptions:
+                channel_queue = ChannelQueue(name, outbox)
+                subscriptions[name] = channel_queue
+                CHANNELS[name].append(channel_queue)
+        return unknown
+
+    def unsubscribe(names: List[str]):
+        for name in names:
+            channel_queue = subscriptions.pop(name, None)
+            if channel_queue is not None and channel_queue in CHANNELS[name]:
+                CHANNELS[name].remove(channel_queue)
+
+    async def send_ack(unknown: Set[str] = frozenset()):
+        ack = {"subscribed": sorted(subscriptions)}
+        if unknown:
+            ack["unknown"] = sorted(unknown)
+        await outbox.put(("ack", ack))
+
+    async def receive_control():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            try:
+                control = decode_control(message)
+            except Exception as e:
+                await outbox.put(("error", {"detail": f"Invalid control message: {str(e)}"}))
+                continue
+            if not isinstance(control, dict):
+                await outbox.put(("error", {"detail": "Control message must be an object"}))
+                continue
+
+            action = control.get("action")
+            names = parse_channels(control.get("channels"))
+            if action == "subscribe":
+                await send_ack(subscribe(names))
+            elif action == "unsubscribe":
+                unsubscribe(names)
+                await send_ack()
+            else:
+                await outbox.put(("error", {"detail": f"Unknown action: {action}"}))
+
+    async def send_frames():
+        while True:
+            try:
+                channel, data = await asyncio.wait_for(outbox.get(), timeout=30.0)
+            except asyncio.TimeoutError:
+                # Send keepalive ping every 30 seconds to maintain connection
+                channel, data = "ping", {"timestamp": datetime.now().isoformat()}
+            await websocket.send_bytes(encode_frame(channel, data))
+
+    await send_ack(subscribe(parse_channels(channels)))
+
+    tasks = [asyncio.create_task(receive_control()), asyncio.create_task(send_frames())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, WebSocketDisconnect):
+                logger.error(f"Error in WebSocket stream for client {client_id}: {str(exc)}")
+    except asyncio.CancelledError:
+        logger.info(f"Client {client_id} connection cancelled")
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Remove channel queues when connection ends
+        unsubscribe(list(subscriptions))
+        logger.info(f"Client {client_id} removed from WebSocket stream")
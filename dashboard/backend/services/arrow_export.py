@@ -0,0 +1,118 @@
+import logging
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+if pa is None:
+    logger.info("pyarrow not installed, Arrow/Parquet export is disabled")
+
+# Arrow type of each exported column; level, component and classification
+# type repeat a handful of values, so they are dictionary-encoded
+EXPORT_COLUMNS: Dict[str, List[Tuple[str, Callable[[], Any]]]] = {
+    "log_entries": [
+        ("id", lambda: pa.int64()),
+        ("timestamp", lambda: pa.timestamp("us", tz="UTC")),
+        ("event_time", lambda: pa.timestamp("us", tz="UTC")),
+        ("log_level", lambda: pa.dictionary(pa.int32(), pa.string())),
+        ("hdfs_component", lambda: pa.dictionary(pa.int32(), pa.string())),
+        ("hdfs_date", lambda: pa.string()),
+        ("hdfs_time", lambda: pa.string()),
+        ("thread_id", lambda: pa.int32()),
+        ("block_id", lambda: pa.string()),
+        ("message", lambda: pa.string()),
+        ("template_id", lambda: pa.int32()),
+        ("template_params", lambda: pa.list_(pa.string())),
+    ],
+    "anomaly_params": [
+        ("id", lambda: pa.int64()),
+        ("timestamp", lambda: pa.timestamp("us", tz="UTC")),
+        ("classification_type", lambda: pa.dictionary(pa.int32(), pa.string())),
+        ("param_value", lambda: pa.string()),
+    ],
+}
+
+
+def export_columns(table: str) -> List[str]:
+    return [name for name, _ in EXPORT_COLUMNS[table]]
+
+
+def export_schema(table: str):
+    return pa.schema([(name, arrow_type()) for name, arrow_type in EXPORT_COLUMNS[table]])
+
+
+def rows_to_batch(rows: Sequence[Tuple], schema):
+    """Build a typed record batch from row tuples in schema column order"""
+    arrays = []
+    for values, field in zip(zip(*rows), schema):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=field.type.value_type).dictionary_encode())
+        else:
+            # Naive timestamps are stored in UTC, which is how Arrow reads them
+            arrays.append(pa.array(values, type=field.type))
+    return pa.record_batch(arrays, schema=schema)
+
+
+class DrainableSink:
+    """
+    Write-only file object that hands out what was written so far, so the
+    Arrow and Parquet writers can be streamed without holding the whole file
+
+    tell() keeps counting drained bytes, which Parquet needs for its footer.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class BatchWriter:
+    """Encode record batches as an Arrow IPC stream or a Parquet file, chunk by chunk"""
+
+    MEDIA_TYPES = {
+        "arrow": "application/vnd.apache.arrow.stream",
+        "parquet": "application/vnd.apache.parquet",
+    }
+
+    def __init__(self, format: str, schema):
+        self.schema = schema
+        self.sink = DrainableSink()
+        output = pa.PythonFile(self.sink, mode="w")
+        if format == "parquet":
+            self.writer = pq.ParquetWriter(output, schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_stream(output, schema)
+
+    def write_rows(self, rows: Sequence[Tuple]) -> bytes:
+        self.writer.write_batch(rows_to_batch(rows, self.schema))
+        return self.sink.drain()
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Starting size of the count matrix; it doubles along either axis as needed
+INITIAL_ROWS = 1024
+INITIAL_COLUMNS = 64
+
+
+def epoch_seconds(timestamp: str) -> float:
+    # Naive timestamps are UTC
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class BlockSessionStore:
+    """
+    Per-block log template counts of the blocks seen recently, for anomaly
+    models that score blocks on their event-count vectors
+
+    One matrix row per block and one column per template id; rows of blocks
+    idle for BLOCK_SESSION_TTL_SECONDS are evicted and reused. Each worker
+    keeps its own store, fed from the fan-out log events, so it starts empty
+    and never reads log_entries.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = config.BLOCK_SESSION_TTL_SECONDS,
+        max_blocks: int = config.BLOCK_SESSION_MAX_BLOCKS,
+        max_sequence: int = config.BLOCK_SESSION_MAX_SEQUENCE,
+        sweep_seconds: float = config.BLOCK_SESSION_SWEEP_SECONDS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_blocks = max_blocks
+        self.max_sequence = max_sequence
+        self.sweep_seconds = sweep_seconds
+        self.counts = np.zeros((INITIAL_ROWS, INITIAL_COLUMNS), dtype=np.uint32)
+        # Logs of the block in each row, including those without a template
+        self.log_counts = np.zeros(INITIAL_ROWS, dtype=np.uint32)
+        # Epoch seconds of the first and latest log of the block in each row
+        self.first_seen = np.zeros(INITIAL_ROWS)
+        self.last_seen = np.zeros(INITIAL_ROWS)
+        self.rows: Dict[str, int] = {}
+        self.free_rows: List[int] = list(range(INITIAL_ROWS - 1, -1, -1))
+        self.columns: Dict[int, int] = {}
+        self.template_ids: List[int] = []
+        # Latest template ids of each block, oldest first
+        self.sequences: Dict[str, Deque[int]] = {}
+        # Called with the matrix() of the sessions being evicted
+        self.eviction_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.running = False
+        self.task = None
+        self.events = 0
+        self.sessions_opened = 0
+        self.sessions_evicted = 0
+
+    def _grow_rows(self):
+        size = self.counts.shape[0]
+        self.counts = np.vstack([self.counts, np.zeros_like(self.counts)])
+        self.log_counts = np.concatenate([self.log_counts, np.zeros_like(self.log_counts)])
+        self.first_seen = np.concatenate([self.first_seen, np.zeros(size)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros(size)])
+        self.free_rows.extend(range(2 * size - 1, size - 1, -1))
+
+    def _column(self, template_id: int) -> int:
+        column = self.columns.get(template_id)
+        if column is None:
+            column = self.columns[template_id] = len(self.template_ids)
+            self.template_ids.append(template_id)
+            if column >= self.counts.shape[1]:
+                self.counts = np.hstack([self.counts, np.zeros_like(self.counts)])
+        return column
+
+    def _open(self, block_id: str, seen: float) -> int:
+        if len(self.rows) >= self.max_blocks:
+            # Make room by dropping the least recently seen 1%
+            active = np.fromiter(self.rows.values(), dtype=np.int64)
+            oldest = max(1, len(active) // 100)
+            cutoff = np.partition(self.last_seen[active], oldest - 1)[oldest - 1]
+            self.evict(self.last_seen[active] <= cutoff, active)
+        if not self.free_rows:
+            self._grow_rows()
+
+        row = self.rows[block_id] = self.free_rows.pop()
+        self.first_seen[row] = seen
+        self.sequences[block_id] = deque(maxlen=self.max_sequence)
+        self.sessions_opened += 1
+        return row
+
+    def add(self, event: Dict[str, Any]):
+        """Count a log event (the fan-out "logs" payload) towards its block"""
+        block_id = event.get("block_id")
+        if not block_id:
+            return
+
+        seen = epoch_seconds(event["timestamp"])
+        row = self.rows.get(block_id)
+        if row is None:
+            row = self._open(block_id, seen)
+        self.last_seen[row] = max(self.last_seen[row], seen)
+        self.log_counts[row] += 1
+        self.events += 1
+
+        template_id = event.get("template_id")
+        if template_id is not None:
+            # Look the column up first, it may grow the matrix
+            column = self._column(template_id)
+            self.counts[row, column] += 1
+            self.sequences[block_id].append(template_id)
+
+    def evict(self, mask: np.ndarray, active: np.ndarray):
+        """Drop the sessions of the `active` rows selected by `mask`"""
+        evicted_rows = set(active[mask].tolist())
+        if not evicted_rows:
+            return
+        block_ids = [block_id for block_id, row in self.rows.items() if row in evicted_rows]
+        if self.eviction_listeners:
+            completed = self.matrix(block_ids)
+            # Rows are zeroed below
+            completed["counts"] = completed["counts"].copy()
+            for listener in self.eviction_listeners:
+                listener(completed)
+        rows = [self.rows.pop(block_id) for block_id in block_ids]
+        for block_id in block_ids:
+            del self.sequences[block_id]
+        self.counts[rows] = 0
+        self.log_counts[rows] = 0
+        self.first_seen[rows] = 0
+        self.last_seen[rows] = 0
+        self.free_rows.extend(rows)
+        self.sessions_evicted += len(rows)
+
+    def evict_idle(self, now: Optional[float] = None):
+        if not self.rows:
+            return
+        now = time.time() if now is None else now
+        active = np.fromiter(self.rows.values(), dtype=np.int64)
+        self.evict(self.last_seen[active] < now - self.ttl_seconds, active)
+
+    def features(self, block_id: str) -> Optional[Dict[str, Any]]:
+        """Template counts and recent template sequence of one block, None if it has no session"""
+        row = self.rows.get(block_id)
+        if row is None:
+            return None
+        counts = self.counts[row, :len(self.template_ids)]
+        nonzero = np.flatnonzero(counts)
+        return {
+            "block_id": block_id,
+            "first_seen": datetime.utcfromtimestamp(self.first_seen[row]),
+            "last_seen": datetime.utcfromtimestamp(self.last_seen[row]),
+            "log_count": int(self.log_counts[row]),
+            "template_counts": {self.template_ids[column]: int(counts[column]) for column in nonzero},
+            "sequence": list(self.sequences[block_id]),
+        }
+
+    def matrix(self, block_ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Count matrix of the given blocks (default: every block with a session),
+        rows in `block_ids` order and columns in `template_ids` order
+        """
+        if block_ids is None:
+            block_ids = list(self.rows)
+        else:
+            block_ids = [block_id for block_id in block_ids if block_id in self.rows]
+        rows = np.fromiter((self.rows[block_id] for block_id in block_ids), dtype=np.int64, count=len(block_ids))
+        return {
+            "block_ids": block_ids,
+            "template_ids": list(self.template_ids),
+            "counts": self.counts[rows, :len(self.template_ids)],
+            "log_counts": self.log_counts[rows],
+            "first_seen": self.first_seen[rows],
+            "last_seen": self.last_seen[rows],
+        }
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "blocks": len(self.rows),
+            "templates": len(self.template_ids),
+            "matrix_shape": list(self.counts.shape),
+            "matrix_bytes": int(self.counts.nbytes),
+            "events": self.events,
+            "sessions_opened": self.sessions_opened,
+            "sessions_evicted": self.sessions_evicted
+        }
+
+    async def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._sweep_periodically())
+
+    async def _sweep_periodically(self):
+        while self.running:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error(f"Error evicting idle block sessions: {str(e)}")
+
+    async def stop(self):
+        self.running = False
+
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+
+
+# Shared store, fed by every worker's fan-out dispatch
+block_sessions = BlockSessionStore()
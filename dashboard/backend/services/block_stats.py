@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+import config
+from database import AsyncSessionLocal
+from models import BlockStats, LogEntry
+from services.labels import LabelRegistry, log_levels, hdfs_components
+
+logger = logging.getLogger(__name__)
+
+
+class PendingBlock:
+    __slots__ = ("log_count", "first_seen", "last_seen", "levels", "components")
+
+    def __init__(self, timestamp: datetime):
+        self.log_count = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.levels = set()
+        self.components = set()
+
+    def merge(self, other: "PendingBlock"):
+        self.log_count += other.log_count
+        self.first_seen = min(self.first_seen, other.first_seen)
+        self.last_seen = max(self.last_seen, other.last_seen)
+        self.levels |= other.levels
+        self.components |= other.components
+
+
+class BlockStatsWriter:
+    """
+    Fold ingested log entries into per-block totals and upsert them into
+    block_stats in one statement every BLOCK_STATS_FLUSH_SECONDS
+
+    Runs on the ingesting process only, alongside the Kafka consumer / mock
+    generator.
+    """
+
+    def __init__(
+        self,
+        flush_seconds: float = config.BLOCK_STATS_FLUSH_SECONDS,
+        max_pending: int = config.BLOCK_STATS_MAX_PENDING,
+    ):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.pending: Dict[str, PendingBlock] = {}
+        self.flush_lock = asyncio.Lock()
+        # Awaited with the number of upserted rows after each flush
+        self.flush_listeners: List[Callable[[int], Awaitable[None]]] = []
+        self.running = False
+        self.task = None
+        self.rows_upserted = 0
+
+    async def add(self, log: LogEntry):
+        if not log.block_id:
+            return
+
+        block = self.pending.get(log.block_id)
+        if block is None:
+            block = self.pending[log.block_id] = PendingBlock(log.timestamp)
+        block.log_count += 1
+        block.first_seen = min(block.first_seen, log.timestamp)
+        block.last_seen = max(block.last_seen, log.timestamp)
+        if log.log_level:
+            block.levels.add(log.log_level)
+        if log.hdfs_component:
+            block.components.add(log.hdfs_component)
+
+        if len(self.pending) >= self.max_pending:
+            await self.flush()
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.pending:
+                return
+            pending, self.pending = self.pending, {}
+
+            async_session = AsyncSessionLocal()
+            upserted = False
+            try:
+                level_ids = await log_levels.get_ids(
+                    async_session, {level for block in pending.values() for level in block.levels}
+                )
+                component_ids = await hdfs_components.get_ids(
+                    async_session, {component for block in pending.values() for component in block.components}
+                )
+
+                rows: List[dict] = []
+                for block_id, block in pending.items():
+                    level_bits = 0
+                    for level in block.levels:
+                        level_bits |= LabelRegistry.bit(level_ids[level])
+                    component_bits = 0
+                    for component in block.components:
+                        component_bits |= LabelRegistry.bit(component_ids[component])
+                    rows.append({
+                        "block_id": block_id,
+                        "log_count": block.log_count,
+                        "first_seen": block.first_seen,
+                        "last_seen": block.last_seen,
+                        "level_bits": level_bits,
+                        "component_bits": component_bits,
+                    })
+
+                statement = insert(BlockStats).values(rows)
+                excluded = statement.excluded
+                statement = statement.on_conflict_do_update(
+                    index_elements=[BlockStats.block_id],
+                    set_={
+                        "log_count": BlockStats.log_count + excluded.log_count,
+                        "first_seen": func.least(BlockStats.first_seen, excluded.first_seen),
+                        "last_seen": func.greatest(BlockStats.last_seen, excluded.last_seen),
+                        "level_bits": BlockStats.level_bits.op("|")(excluded.level_bits),
+                        "component_bits": BlockStats.component_bits.op("|")(excluded.component_bits),
+                    }
+                )
+                await async_session.execute(statement)
+                await async_session.commit()
+                upserted = True
+                self.rows_upserted += len(rows)
+                for listener in self.flush_listeners:
+                    await listener(len(rows))
+            except Exception as e:
+                logger.error(f"Error upserting block stats for {len(pending)} blocks: {str(e)}")
+                if not upserted:
+                    self._requeue(pending)
+            finally:
+                await async_session.close()
+
+    def _requeue(self, pending: Dict[str, PendingBlock]):
+        """Put the totals of a failed flush back, merged with what was added since, for the next flush"""
+        for block_id, block in pending.items():
+            newer = self.pending.get(block_id)
+            if newer is not None:
+                block.merge(newer)
+            self.pending[block_id] = block
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "pending_blocks": len(self.pending),
+            "rows_upserted": self.rows_upserted
+        }
+
+    async def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while self.running:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def stop(self):
+        self.running = False
+
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+        # Don't lose what was folded since the last flush
+        await self.flush()
+
+
+# Shared writer driven by the ingestion callbacks
+block_stats_writer = BlockStatsWriter()
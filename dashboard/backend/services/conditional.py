@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+import config
+from database import AsyncSessionLocal
+from services.db_service import DBService
+
+logger = logging.getLogger(__name__)
+
+# Tables each GET endpoint reads, by path under API_PREFIX ("*" matches any suffix)
+CONDITIONAL_ENDPOINTS = {
+    "/logs/": ("log_entries",),
+    "/logs/volume": ("log_entries",),
+    "/logs/templates": ("log_entries",),
+    "/statistics/classifications": ("classifications",),
+    "/statistics/time-series": ("classifications",),
+    "/statistics/summary": ("classifications",),
+    "/anomalies/": ("anomaly_params",),
+    "/anomalies/recent": ("anomaly_params",),
+    "/anomalies/unidentified": ("anomaly_params",),
+    "/hdfs/blocks": ("block_stats",),
+    "/hdfs/components": ("log_entries",),
+    "/hdfs/logs/*": ("log_entries",),
+}
+
+
+def tables_for_path(path: str) -> Optional[Tuple[str, ...]]:
+    if not path.startswith(config.API_PREFIX):
+        return None
+    path = path[len(config.API_PREFIX):]
+    tables = CONDITIONAL_ENDPOINTS.get(path)
+    if tables:
+        return tables
+    for pattern, tables in CONDITIONAL_ENDPOINTS.items():
+        if pattern.endswith("*") and path.startswith(pattern[:-1]):
+            return tables
+    return None
+
+
+class HighWaterMarks:
+    """
+    Highest id and latest timestamp of each table, re-read from the database
+    at most every HTTP_VALIDATOR_MARKS_TTL_SECONDS and dropped as soon as the
+    fan-out reports new rows
+    """
+
+    def __init__(self, ttl_seconds: float = config.HTTP_VALIDATOR_MARKS_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.marks: Optional[Dict[str, Any]] = None
+        self.fetched_at = 0.0
+        self.generation = 0
+
+    def invalidate(self):
+        self.marks = None
+        self.generation += 1
+
+    async def get(self) -> Dict[str, Any]:
+        if self.marks is not None and time.monotonic() - self.fetched_at < self.ttl_seconds:
+            return self.marks
+
+        generation = self.generation
+        async_session = AsyncSessionLocal()
+        try:
+            marks = await DBService.get_table_high_water_marks(async_session)
+        finally:
+            await async_session.close()
+
+        # Don't keep marks that were read before an invalidation arrived
+        if generation == self.generation:
+            self.marks = marks
+            self.fetched_at = time.monotonic()
+        return marks
+
+
+def make_validators(scope, tables: Tuple[str, ...], marks: Dict[str, Any]) -> Tuple[str, datetime]:
+    """
+    Build the ETag and Last-Modified of a response from the high-water marks
+    of the tables it reads
+
+    Endpoints that cover "the last N hours" also change as rows age out of the
+    window, so both validators roll over every HTTP_VALIDATOR_WINDOW_SECONDS.
+    """
+    window = config.HTTP_VALIDATOR_WINDOW_SECONDS
+    now = time.time()
+    window_start = now - now % window if window > 0 else 0
+
+    last_modified = datetime.fromtimestamp(window_start, timezone.utc)
+    for table in tables:
+        latest = marks[table][1]
+        if latest is not None:
+            # Naive timestamps are stored in UTC
+            latest = latest if latest.tzinfo else latest.replace(tzinfo=timezone.utc)
+            last_modified = max(last_modified, latest)
+
+    key = "|".join([
+        scope["path"],
+        scope.get("query_string", b"").decode("latin-1"),
+        ",".join(str(marks[table][0]) for table in tables),
+        str(window_start),
+    ])
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+    # Weak, because the same data may be sent with different content encodings
+    return f'W/"{digest}"', last_modified.replace(microsecond=0)
+
+
+def is_not_modified(headers: Headers, etag: str, last_modified: datetime) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        opaque = etag[2:]
+        return "*" in candidates or any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ConditionalRequestMiddleware:
+    """
+    Add ETag/Last-Modified to the list and aggregate endpoints and answer
+    304 Not Modified when the tables they read have no new rows
+    """
+
+    def __init__(self, app, marks: Optional[HighWaterMarks] = None):
+        self.app = app
+        self.marks = marks or high_water_marks
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        tables = tables_for_path(scope["path"])
+        if not tables:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            # Read before the response is built, so an ETag never claims newer data than it carries
+            marks = await self.marks.get()
+        except Exception as e:
+            logger.warning(f"Could not read table high-water marks, skipping validators: {str(e)}")
+            await self.app(scope, receive, send)
+            return
+
+        etag, last_modified = make_validators(scope, tables, marks)
+        validator_headers = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(last_modified, usegmt=True),
+            # Let browsers keep the body but revalidate on every poll
+            "Cache-Control": "no-cache",
+        }
+
+        if is_not_modified(Headers(scope=scope), etag, last_modified):
+            response = Response(status_code=304, headers=validator_headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for name, value in validator_headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+
+# Shared marks, invalidated by the fan-out dispatcher
+high_water_marks = HighWaterMarks()
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+
+import config
+from database import AsyncSessionLocal
+from models import DashboardSnapshot, LogEntryResponse, AnomalyParamResponse
+from services.db_service import DBService
+from services.timeseries_cache import time_series_cache
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardSnapshotService:
+    """
+    Keep a pre-serialized snapshot of everything the dashboard shows on load,
+    refreshed on a schedule so page loads are a memory read
+    """
+
+    def __init__(self, interval_seconds: float = config.DASHBOARD_SNAPSHOT_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.snapshot_json: Optional[bytes] = None
+        self.generated_at: Optional[datetime] = None
+        self.refresh_lock = asyncio.Lock()
+        self.running = False
+        self.task = None
+
+    async def build(self) -> DashboardSnapshot:
+        hours = config.DASHBOARD_SNAPSHOT_HOURS
+        end_time = datetime.now()
+        start_time = end_time - timedelta(hours=hours)
+
+        async_session = AsyncSessionLocal()
+        try:
+            recent_logs = await DBService.get_log_entries(
+                async_session,
+                limit=config.DASHBOARD_SNAPSHOT_LOG_LIMIT
+            )
+            summary = await DBService.get_classification_summary(async_session, hours=hours)
+            recent_anomalies = await DBService.get_anomaly_params(
+                async_session,
+                classification_type="anomaly",
+                start_time=start_time,
+                end_time=end_time,
+                limit=config.DASHBOARD_SNAPSHOT_PARAM_LIMIT
+            )
+            recent_unidentified = await DBService.get_anomaly_params(
+                async_session,
+                classification_type="unidentified",
+                start_time=start_time,
+                end_time=end_time,
+                limit=config.DASHBOARD_SNAPSHOT_PARAM_LIMIT
+            )
+            try:
+                time_series = await time_series_cache.get_time_series(
+                    async_session,
+                    interval_minutes=config.DASHBOARD_SNAPSHOT_INTERVAL_MINUTES,
+                    hours=hours
+                )
+            except Exception as e:
+                logger.warning(f"Time series bucket cache failed, querying all buckets: {str(e)}")
+                await async_session.rollback()
+                time_series = await DBService.get_time_series_data(
+                    async_session,
+                    interval_minutes=config.DASHBOARD_SNAPSHOT_INTERVAL_MINUTES,
+                    hours=hours
+                )
+        finally:
+            await async_session.close()
+
+        return DashboardSnapshot(
+            generated_at=datetime.now(),
+            recent_logs=[LogEntryResponse.from_orm(log) for log in recent_logs],
+            summary=summary,
+            recent_anomalies=[AnomalyParamResponse.from_orm(param) for param in recent_anomalies],
+            recent_unidentified=[AnomalyParamResponse.from_orm(param) for param in recent_unidentified],
+            time_series=time_series
+        )
+
+    async def refresh(self):
+        """
+        Rebuild the snapshot and serialize it once for all readers; on failure
+        the previous snapshot stays in place
+        """
+        async with self.refresh_lock:
+            snapshot = await self.build()
+            self.snapshot_json = json.dumps(jsonable_encoder(snapshot)).encode("utf-8")
+            self.generated_at = snapshot.generated_at
+
+    async def get_json(self) -> bytes:
+        """The latest snapshot; only built here if none was built yet"""
+        if self.snapshot_json is None:
+            try:
+                await self.refresh()
+            except Exception as e:
+                # The periodic refresh may have built one meanwhile
+                if self.snapshot_json is None:
+                    raise
+                logger.warning(f"Serving the previous dashboard snapshot: {str(e)}")
+        return self.snapshot_json
+
+    async def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self):
+        while self.running:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing dashboard snapshot: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def stop(self):
+        self.running = False
+
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+
+
+# Shared snapshot served by the dashboard route
+dashboard_snapshot = DashboardSnapshotService()
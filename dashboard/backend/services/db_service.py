@@ -1,20 +1,33 @@
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
-from sqlalchemy import select, func, desc, and_, text
+from sqlalchemy import select, func, desc, and_, text, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import config
 
 from models import (
     LogEntry, LogEntryCreate, LogEntryResponse,
     Classification, ClassificationCreate, ClassificationResponse,
     AnomalyParam, AnomalyParamCreate, AnomalyParamResponse,
-    TimeSeriesData
+    TimeSeriesData, LogVolumeData, LogTemplate, LogTemplateCount,
+    SpikeAlert, SpikeAlertCreate, BlockStats, encode_block_id
 )
+from services.labels import log_levels, hdfs_components
+from services.templates import template_miner
+from services.singleflight import single_flight
+from services.serialization import LOG_ENTRY_FIELDS, CLASSIFICATION_FIELDS, ANOMALY_PARAM_FIELDS, SPIKE_ALERT_FIELDS
 
 logger = logging.getLogger(__name__)
 
+# Continuous aggregate of log counts per minute, level and HDFS component
+LOG_VOLUME_VIEW = "log_volume_1m"
+# Database columns holding the lookup table ids of the level and component
+LABEL_ID_COLUMNS = {"log_level": "log_level_id", "hdfs_component": "hdfs_component_id"}
+# Default origin of TimescaleDB's time_bucket, so filled buckets line up with time_bucket_gapfill's
+GAPFILL_ORIGIN = datetime(2000, 1, 3)
+
 class DBService:
     @staticmethod
     async def save_log_entry(db: AsyncSession, log_entry: LogEntryCreate) -> LogEntry:
@@ -25,6 +38,8 @@ class DBService:
         thread_id = None
         hdfs_component = None
         block_id = None
+        # Part of the message the template is mined from
+        content = log_entry.message
         
         # Try to parse HDFS log format: "YYMMDD HHMMSS [Thread ID] INFO [HDFS Component]: [Detailed message]"
         try:
@@ -35,6 +50,7 @@ class DBService:
                 # Extract components from HDFS format
                 hdfs_date = hdfs_parts[0]  # YYMMDD
                 hdfs_time = hdfs_parts[1]  # HHMMSS
+                content = hdfs_parts[5]
                 
                 # Extract thread ID from [Thread ID]
                 thread_part = hdfs_parts[2]
@@ -53,23 +69,53 @@ class DBService:
                 block_matches = re.findall(r'blk_[-]?\d{10,19}', message)
                 if block_matches:
                     block_id = block_matches[0]
+                    # Stored as BIGINT, which holds every real HDFS block ID
+                    if encode_block_id(block_id) is None:
+                        logger.warning(f"Block ID {block_id} is out of BIGINT range, not stored")
+                        block_id = None
         except Exception as e:
             logger.warning(f"Failed to parse HDFS log format: {str(e)}")
         
+        # Level and component are stored as lookup table ids; register new ones first
+        await log_levels.get_ids(db, [log_entry.log_level])
+        await hdfs_components.get_ids(db, [hdfs_component])
+        
+        try:
+            template_id, template_params = await template_miner.mine(db, content)
+        except Exception as e:
+            logger.warning(f"Template mining failed, storing the log without a template: {str(e)}")
+            await db.rollback()
+            template_id, template_params = None, None
+        
+        ingested_at = datetime.utcnow()
         db_log_entry = LogEntry(
+            timestamp=ingested_at,
+            event_time=DBService.parse_event_time(hdfs_date, hdfs_time) or ingested_at,
             message=log_entry.message,
             log_level=log_entry.log_level,
             hdfs_date=hdfs_date,
             hdfs_time=hdfs_time,
             thread_id=thread_id,
             hdfs_component=hdfs_component,
-            block_id=block_id
+            block_id=block_id,
+            template_id=template_id,
+            template_params=template_params
         )
         db.add(db_log_entry)
         await db.commit()
         await db.refresh(db_log_entry)
         return db_log_entry
         
+    @staticmethod
+    def parse_event_time(hdfs_date: Optional[str], hdfs_time: Optional[str]) -> Optional[datetime]:
+        """Combine HDFS "YYMMDD" and "HHMMSS" fields into a (UTC) datetime, None if they aren't valid"""
+        if not hdfs_date or not hdfs_time:
+            return None
+        try:
+            return datetime.strptime(hdfs_date + hdfs_time, "%y%m%d%H%M%S")
+        except ValueError:
+            return None
+        
     @staticmethod
     async def save_classification(db: AsyncSession, classification: ClassificationCreate) -> Classification:
         """Save a classification to the database"""
@@ -95,6 +141,21 @@ class DBService:
         await db.refresh(db_anomaly_param)
         return db_anomaly_param
         
+    @staticmethod
+    async def save_spike_alert(db: AsyncSession, alert: SpikeAlertCreate) -> SpikeAlert:
+        """Save a spike alert to the database"""
+        db_alert = SpikeAlert(
+            series=alert.series,
+            value=alert.value,
+            expected=alert.expected,
+            z_score=alert.z_score,
+            event_count=alert.event_count
+        )
+        db.add(db_alert)
+        await db.commit()
+        await db.refresh(db_alert)
+        return db_alert
+        
     @staticmethod
     async def get_log_entries(
         db: AsyncSession, 
@@ -102,29 +163,82 @@ class DBService:
         limit: int = 100,
         log_level: Optional[str] = None,
         start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None,
-        filter_query: Optional[str] = None
+        end_time: Optional[datetime] = None
     ) -> List[LogEntry]:
         """Get log entries with optional filtering"""
-        query = select(LogEntry).order_by(desc(LogEntry.timestamp))
+        query = DBService.log_entries_query(
+            (LogEntry,),
+            log_level=log_level,
+            start_time=start_time,
+            end_time=end_time
+        ).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+        
+    @staticmethod
+    def log_entries_query(
+        entities: Tuple,
+        log_level: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        hdfs_component: Optional[str] = None,
+        block_id: Optional[str] = None,
+        newest_first: bool = True,
+        by_event_time: bool = False,
+        template_id: Optional[int] = None
+    ):
+        """
+        Build the filtered log entries query for ORM objects or plain columns
+        The time range and order use ingest time, or HDFS event time with by_event_time
+        """
+        time_column = LogEntry.event_time if by_event_time else LogEntry.timestamp
+        order = desc(time_column) if newest_first else time_column
+        query = select(*entities).order_by(order)
         
         # Apply filters if provided
         if log_level:
             query = query.where(LogEntry.log_level == log_level)
             
         if start_time:
-            query = query.where(LogEntry.timestamp >= start_time)
+            query = query.where(time_column >= start_time)
             
         if end_time:
-            query = query.where(LogEntry.timestamp <= end_time)
+            query = query.where(time_column <= end_time)
+            
+        if hdfs_component:
+            query = query.where(LogEntry.hdfs_component == hdfs_component)
             
-        # Apply custom filter query if provided
-        if filter_query:
-            query = query.where(text(filter_query))
+        if block_id:
+            query = query.where(LogEntry.block_id == block_id)
             
-        query = query.offset(skip).limit(limit)
+        if template_id is not None:
+            query = query.where(LogEntry.template_id == template_id)
+            
+        return query
+        
+    @staticmethod
+    @single_flight.coalesce
+    async def get_log_entry_rows(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        log_level: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        by_event_time: bool = False,
+        template_id: Optional[int] = None
+    ) -> List[Tuple]:
+        """Get log entries as plain row tuples in LOG_ENTRY_FIELDS order, skipping the ORM"""
+        query = DBService.log_entries_query(
+            tuple(getattr(LogEntry, field) for field in LOG_ENTRY_FIELDS),
+            log_level=log_level,
+            start_time=start_time,
+            end_time=end_time,
+            by_event_time=by_event_time,
+            template_id=template_id
+        ).offset(skip).limit(limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        return result.all()
         
     @staticmethod
     async def get_classifications(
@@ -135,7 +249,22 @@ class DBService:
         end_time: Optional[datetime] = None
     ) -> List[Classification]:
         """Get classifications with optional filtering"""
-        query = select(Classification).order_by(desc(Classification.timestamp))
+        query = DBService.classifications_query(
+            (Classification,),
+            start_time=start_time,
+            end_time=end_time
+        ).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+        
+    @staticmethod
+    def classifications_query(
+        entities: Tuple,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ):
+        """Build the filtered classifications query for ORM objects or plain columns"""
+        query = select(*entities).order_by(desc(Classification.timestamp))
         
         # Apply filters if provided
         if start_time:
@@ -144,9 +273,87 @@ class DBService:
         if end_time:
             query = query.where(Classification.timestamp <= end_time)
             
-        query = query.offset(skip).limit(limit)
+        return query
+        
+    @staticmethod
+    @single_flight.coalesce
+    async def get_classification_rows(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List[Tuple]:
+        """Get classifications as plain row tuples in CLASSIFICATION_FIELDS order, skipping the ORM"""
+        query = DBService.classifications_query(
+            tuple(getattr(Classification, field) for field in CLASSIFICATION_FIELDS),
+            start_time=start_time,
+            end_time=end_time
+        ).offset(skip).limit(limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        return result.all()
+        
+    @staticmethod
+    @single_flight.coalesce
+    async def get_classification_totals_by_second(
+        db: AsyncSession,
+        start_time: datetime
+    ) -> List[Any]:
+        """Get classification counts summed per second since start_time, oldest first"""
+        second = func.date_trunc('second', Classification.timestamp).label("second")
+        query = (
+            select(
+                second,
+                func.sum(Classification.normal_count),
+                func.sum(Classification.anomaly_count),
+                func.sum(Classification.unidentified_count)
+            )
+            .where(Classification.timestamp >= start_time)
+            .group_by(second)
+            .order_by(second)
+        )
+        result = await db.execute(query)
+        return result.fetchall()
+        
+    @staticmethod
+    @single_flight.coalesce
+    async def get_classification_summary(
+        db: AsyncSession,
+        hours: int = 24
+    ) -> Dict[str, Any]:
+        """Get total and percentage counts of classifications over the past hours"""
+        end_time = datetime.now()
+        start_time = end_time - timedelta(hours=hours)
+        
+        query = (
+            select(
+                func.coalesce(func.sum(Classification.normal_count), 0),
+                func.coalesce(func.sum(Classification.anomaly_count), 0),
+                func.coalesce(func.sum(Classification.unidentified_count), 0)
+            )
+            .where(Classification.timestamp >= start_time)
+            .where(Classification.timestamp <= end_time)
+        )
+        result = await db.execute(query)
+        normal_count, anomaly_count, unidentified_count = (int(value) for value in result.one())
+        
+        total_events = normal_count + anomaly_count + unidentified_count
+        
+        # Calculate percentages
+        normal_percent = (normal_count / total_events * 100) if total_events > 0 else 0
+        anomaly_percent = (anomaly_count / total_events * 100) if total_events > 0 else 0
+        unidentified_percent = (unidentified_count / total_events * 100) if total_events > 0 else 0
+        
+        return {
+            "total_events": total_events,
+            "normal_count": normal_count,
+            "anomaly_count": anomaly_count,
+            "unidentified_count": unidentified_count,
+            "normal_percent": round(normal_percent, 2),
+            "anomaly_percent": round(anomaly_percent, 2),
+            "unidentified_percent": round(unidentified_percent, 2),
+            "time_period_hours": hours
+        }
         
     @staticmethod
     async def get_anomaly_params(
@@ -158,7 +365,26 @@ class DBService:
         end_time: Optional[datetime] = None
     ) -> List[AnomalyParam]:
         """Get anomaly parameters with optional filtering"""
-        query = select(AnomalyParam).order_by(desc(AnomalyParam.timestamp))
+        query = DBService.anomaly_params_query(
+            (AnomalyParam,),
+            classification_type=classification_type,
+            start_time=start_time,
+            end_time=end_time
+        ).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return result.scalars().all()
+        
+    @staticmethod
+    def anomaly_params_query(
+        entities: Tuple,
+        classification_type: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        newest_first: bool = True
+    ):
+        """Build the filtered anomaly parameters query for ORM objects or plain columns"""
+        order = desc(AnomalyParam.timestamp) if newest_first else AnomalyParam.timestamp
+        query = select(*entities).order_by(order)
         
         # Apply filters if provided
         if classification_type:
@@ -170,19 +396,183 @@ class DBService:
         if end_time:
             query = query.where(AnomalyParam.timestamp <= end_time)
             
-        query = query.offset(skip).limit(limit)
+        return query
+        
+    @staticmethod
+    @single_flight.coalesce
+    async def get_anomaly_param_rows(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        classification_type: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List[Tuple]:
+        """Get anomaly parameters as plain row tuples in ANOMALY_PARAM_FIELDS order, skipping the ORM"""
+        query = DBService.anomaly_params_query(
+            tuple(getattr(AnomalyParam, field) for field in ANOMALY_PARAM_FIELDS),
+            classification_type=classification_type,
+            start_time=start_time,
+            end_time=end_time
+        ).offset(skip).limit(limit)
         result = await db.execute(query)
-        return result.scalars().all()
+        return result.all()
         
     @staticmethod
+    @single_flight.coalesce
+    async def get_spike_alert_rows(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        series: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List[Tuple]:
+        """Get spike alerts, newest first, as plain row tuples in SPIKE_ALERT_FIELDS order"""
+        query = select(*(getattr(SpikeAlert, field) for field in SPIKE_ALERT_FIELDS)).order_by(desc(SpikeAlert.timestamp))
+        
+        if series:
+            query = query.where(SpikeAlert.series == series)
+            
+        if start_time:
+            query = query.where(SpikeAlert.timestamp >= start_time)
+            
+        if end_time:
+            query = query.where(SpikeAlert.timestamp <= end_time)
+            
+        result = await db.execute(query.offset(skip).limit(limit))
+        return result.all()
+        
+    @staticmethod
+    def settled_before() -> datetime:
+        """
+        Ingest time before which every row has committed
+
+        Writers (Kafka callbacks, block scoring) insert concurrently, so a row
+        can commit after a row with a higher id. An `id > cursor` range scan
+        would then skip it for good; the /changes cursor therefore only moves
+        over rows at least CHANGES_SETTLE_SECONDS old, assuming no insert stays
+        uncommitted that long.
+        """
+        return datetime.utcnow() - timedelta(seconds=config.CHANGES_SETTLE_SECONDS)
+
+    @staticmethod
+    @single_flight.coalesce
+    async def get_rows_after_id(
+        db: AsyncSession,
+        model: Any,
+        fields: Tuple[str, ...],
+        after_id: int,
+        limit: int = 500
+    ) -> List[Tuple]:
+        """
+        Get settled rows of a table inserted after the given id, oldest first, as
+        row tuples in `fields` order (a range scan on the (id, timestamp) primary
+        key of each chunk). Stops at the first row that hasn't settled yet
+        """
+        query = (
+            select(
+                *(getattr(model, field) for field in fields),
+                (model.timestamp <= DBService.settled_before()).label("settled")
+            )
+            .where(model.id > after_id)
+            .order_by(model.id)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        rows = []
+        for row in result.all():
+            if not row[-1]:
+                break
+            rows.append(row[:-1])
+        return rows
+        
+    @staticmethod
+    async def get_latest_ids(db: AsyncSession) -> Dict[str, int]:
+        """Get the highest settled id of each streamed table in one round trip (0 for an empty table)"""
+        settled_before = DBService.settled_before()
+        query = select(*(
+            select(func.coalesce(func.max(model.id), 0))
+            .where(model.timestamp <= settled_before)
+            .scalar_subquery()
+            for model in (LogEntry, Classification, AnomalyParam)
+        ))
+        result = await db.execute(query)
+        logs_id, classifications_id, anomalies_id = result.one()
+        return {
+            "logs": int(logs_id),
+            "classifications": int(classifications_id),
+            "anomalies": int(anomalies_id)
+        }
+        
+    @staticmethod
+    @single_flight.coalesce
+    async def get_table_high_water_marks(db: AsyncSession) -> Dict[str, Any]:
+        """
+        Get the highest id and latest timestamp of each table, keyed by table name
+        (block_stats has no id; its latest last_seen moves with every flush)
+        """
+        models = (LogEntry, Classification, AnomalyParam)
+        columns = []
+        for model in models:
+            columns.append(select(func.max(model.id)).scalar_subquery())
+            columns.append(select(func.max(model.timestamp)).scalar_subquery())
+        columns.append(select(func.max(BlockStats.last_seen)).scalar_subquery())
+        result = await db.execute(select(*columns))
+        row = result.one()
+        marks = {
+            model.__tablename__: (row[index * 2] or 0, row[index * 2 + 1])
+            for index, model in enumerate(models)
+        }
+        marks[BlockStats.__tablename__] = (row[-1] or 0, row[-1])
+        return marks
+        
+    @staticmethod
+    @single_flight.coalesce
+    async def get_classification_buckets(
+        db: AsyncSession,
+        interval_minutes: int,
+        start_time: datetime,
+        end_time: datetime
+    ) -> List[Any]:
+        """
+        Get classification counts per time_bucket for rows in [start_time, end_time),
+        as (bucket_time, normal_count, anomaly_count, unidentified_count) rows
+        """
+        query = text(f"""
+            SELECT 
+                time_bucket('{interval_minutes} minutes'::interval, timestamp) as bucket_time,
+                COALESCE(SUM(normal_count), 0) as normal_count,
+                COALESCE(SUM(anomaly_count), 0) as anomaly_count,
+                COALESCE(SUM(unidentified_count), 0) as unidentified_count
+            FROM 
+                classifications
+            WHERE 
+                timestamp >= :start_time AND timestamp < :end_time
+            GROUP BY 
+                bucket_time
+            ORDER BY 
+                bucket_time ASC
+        """)
+        
+        result = await db.execute(
+            query,
+            {"start_time": start_time, "end_time": end_time}
+        )
+        return result.fetchall()
+        
+    @staticmethod
+    @single_flight.coalesce
     async def get_time_series_data(
         db: AsyncSession,
         interval_minutes: int = 5,
-        hours: int = 24
+        hours: int = 24,
+        fill_gaps: bool = False
     ) -> List[TimeSeriesData]:
         """
         Get time series data aggregated by intervals
         Default: data for the past 24 hours in 5-minute intervals
+        With fill_gaps, empty intervals are returned as zero counts
         """
         # Calculate start time
         end_time = datetime.now()
@@ -190,10 +580,15 @@ class DBService:
         
         # Use TimescaleDB time_bucket function if available
         try:
-            # TimescaleDB specific query
+            # TimescaleDB specific query; time_bucket_gapfill emits a row for every interval in range
+            bucket_function = (
+                f"time_bucket_gapfill('{interval_minutes} minutes'::interval, timestamp, :start_time, :end_time)"
+                if fill_gaps else
+                f"time_bucket('{interval_minutes} minutes'::interval, timestamp)"
+            )
             query = text(f"""
                 SELECT 
-                    time_bucket('{interval_minutes} minutes'::interval, timestamp) as bucket_time,
+                    {bucket_function} as bucket_time,
                     COALESCE(SUM(normal_count), 0) as normal_count,
                     COALESCE(SUM(anomaly_count), 0) as anomaly_count,
                     COALESCE(SUM(unidentified_count), 0) as unidentified_count
@@ -225,6 +620,8 @@ class DBService:
             
         except Exception as e:
             logger.warning(f"TimescaleDB time_bucket failed, falling back to standard SQL: {str(e)}")
+            # The failed statement aborted the transaction
+            await db.rollback()
             
             # Fall back to standard SQL for non-TimescaleDB databases
             # This is less efficient but works with any PostgreSQL database
@@ -251,14 +648,155 @@ class DBService:
                 query, 
                 {"interval_minutes": interval_minutes, "start_time": start_time, "end_time": end_time}
             )
-            rows = result.fetchall()
+            counts = {row[0]: (row[1], row[2], row[3]) for row in result.fetchall()}
+            
+            if fill_gaps:
+                # Zero rows for the empty intervals, like time_bucket_gapfill
+                interval = timedelta(minutes=interval_minutes)
+                bucket = GAPFILL_ORIGIN + ((start_time - GAPFILL_ORIGIN) // interval) * interval
+                while bucket <= end_time:
+                    counts.setdefault(bucket, (0, 0, 0))
+                    bucket += interval
+            buckets = sorted(counts)
             
             # Convert to TimeSeriesData objects
             return [
                 TimeSeriesData(
-                    timestamp=row[0],
-                    normal_count=row[1],
-                    anomaly_count=row[2],
-                    unidentified_count=row[3]
-                ) for row in rows
-            ]
\ No newline at end of file
+                    timestamp=bucket,
+                    normal_count=counts[bucket][0],
+                    anomaly_count=counts[bucket][1],
+                    unidentified_count=counts[bucket][2]
+                ) for bucket in buckets
+            ]
+    @staticmethod
+    def log_volume_query(
+        group_by: Tuple[str, ...],
+        interval_minutes: Optional[int] = None,
+        log_level: Optional[str] = None,
+        components: Optional[List[str]] = None,
+        from_view: bool = True
+    ):
+        """
+        Build a log count query grouped by `group_by` columns (log_level and/or
+        hdfs_component) and, with `interval_minutes`, by time bucket
+
+        Reads the log_volume_1m continuous aggregate, or log_entries itself
+        with from_view=False. Binds :start_time and :end_time.
+        """
+        if from_view:
+            source, time_column, count = LOG_VOLUME_VIEW, "bucket", "CAST(SUM(log_count) AS BIGINT)"
+        else:
+            source, time_column, count = "log_entries", "timestamp", "COUNT(*)"
+
+        # Levels and components are stored as lookup table ids
+        group_columns = [LABEL_ID_COLUMNS[column] for column in group_by]
+        columns = [f"{LABEL_ID_COLUMNS[column]} AS {column}" for column in group_by]
+        conditions = [f"{column} IS NOT NULL" for column in group_columns]
+        if from_view:
+            # Include the minute bucket the window starts in
+            conditions.append(f"{time_column} >= time_bucket('1 minute', CAST(:start_time AS TIMESTAMP))")
+        else:
+            conditions.append(f"{time_column} >= :start_time")
+        conditions.append(f"{time_column} <= :end_time")
+        binds = []
+        if log_level:
+            conditions.append("log_level_id = :log_level")
+            binds.append(bindparam("log_level", type_=LogEntry.log_level.type))
+        if components:
+            conditions.append("hdfs_component_id IN :components")
+            binds.append(bindparam("components", type_=LogEntry.hdfs_component.type, expanding=True))
+        if interval_minutes:
+            columns.insert(0, f"time_bucket('{interval_minutes} minutes'::interval, {time_column}) AS bucket_time")
+            group_columns.insert(0, "bucket_time")
+
+        order = "bucket_time ASC" if interval_minutes else "log_count DESC"
+        return text(f"""
+            SELECT 
+                {", ".join(columns + [f"{count} AS log_count"])}
+            FROM 
+                {source}
+            WHERE 
+                {" AND ".join(conditions)}
+            GROUP BY 
+                {", ".join(group_columns)}
+            ORDER BY 
+                {order}
+        """).bindparams(*binds).columns(
+            # Decoded back to names like the ORM columns
+            **{column: getattr(LogEntry, column).type for column in group_by}
+        )
+
+    @staticmethod
+    @single_flight.coalesce
+    async def get_log_volume(
+        db: AsyncSession,
+        interval_minutes: int = 5,
+        hours: int = 24,
+        group_by: Tuple[str, ...] = ("log_level",),
+        log_level: Optional[str] = None,
+        hdfs_component: Optional[str] = None
+    ) -> List[LogVolumeData]:
+        """
+        Get log counts per interval, split by level and/or HDFS component,
+        from the log_volume_1m continuous aggregate
+        """
+        end_time = datetime.now()
+        start_time = end_time - timedelta(hours=hours)
+        components = [hdfs_component] if hdfs_component else None
+        params = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "log_level": log_level,
+            "components": components
+        }
+
+        try:
+            result = await db.execute(
+                DBService.log_volume_query(group_by, interval_minutes, log_level, components),
+                params
+            )
+        except Exception as e:
+            logger.warning(f"{LOG_VOLUME_VIEW} unavailable, counting log_entries instead: {str(e)}")
+            await db.rollback()
+            result = await db.execute(
+                DBService.log_volume_query(group_by, interval_minutes, log_level, components, from_view=False),
+                params
+            )
+
+        return [
+            LogVolumeData(timestamp=row.bucket_time, log_count=row.log_count, **{
+                column: getattr(row, column) for column in group_by
+            })
+            for row in result.fetchall()
+        ]
+
+    @staticmethod
+    @single_flight.coalesce
+    async def get_log_template_counts(
+        db: AsyncSession,
+        hours: int = 24,
+        limit: int = 100
+    ) -> List[LogTemplateCount]:
+        """Get the most frequent log templates of the past `hours` with their log counts"""
+        start_time = datetime.now() - timedelta(hours=hours)
+        counts = (
+            select(
+                LogEntry.template_id,
+                func.count().label("log_count"),
+                func.max(LogEntry.timestamp).label("last_seen")
+            )
+            .where(LogEntry.timestamp >= start_time, LogEntry.template_id.isnot(None))
+            .group_by(LogEntry.template_id)
+            .subquery()
+        )
+        query = (
+            select(LogTemplate.id, LogTemplate.template, counts.c.log_count, counts.c.last_seen)
+            .join(counts, counts.c.template_id == LogTemplate.id)
+            .order_by(desc(counts.c.log_count))
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [
+            LogTemplateCount(template_id=row[0], template=row[1], log_count=row[2], last_seen=row[3])
+            for row in result.all()
+        ]
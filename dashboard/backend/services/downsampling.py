@@ -0,0 +1,62 @@
+from typing import List, Sequence
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Pick at most `threshold` indices of one series with Largest-Triangle-Three-Buckets"""
+    length = len(xs)
+    if threshold >= length or threshold < 3:
+        return list(range(length))
+
+    selected = [0]
+    # First and last points are always kept; the rest is split into equal buckets
+    bucket_size = (length - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third triangle corner
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+        next_count = next_end - end
+        next_x = sum(xs[end:next_end]) / next_count
+        next_y = sum(ys[end:next_end]) / next_count
+
+        best_index = start
+        best_area = -1.0
+        for index in range(start, end):
+            area = abs(
+                (xs[previous] - next_x) * (ys[index] - ys[previous])
+                - (xs[previous] - xs[index]) * (next_y - ys[previous])
+            )
+            if area > best_area:
+                best_area = area
+                best_index = index
+
+        selected.append(best_index)
+        previous = best_index
+
+    selected.append(length - 1)
+    return selected
+
+
+def downsample_indices(xs: Sequence[float], series: Sequence[Sequence[float]], max_points: int) -> List[int]:
+    """
+    Pick at most `max_points` indices of several series sharing the x axis
+
+    Each series runs LTTB on an equal share of the budget and the picks are
+    merged, so a spike in a small series (anomalies) isn't drowned out by the
+    shape of a large one (normal). A budget too small for three points per
+    series falls back to one pass over the series' sum.
+    """
+    if max_points >= len(xs):
+        return list(range(len(xs)))
+
+    share = max_points // len(series)
+    if share < 3:
+        combined = [sum(values) for values in zip(*series)]
+        return lttb_indices(xs, combined, max_points)[:max_points]
+
+    selected = set()
+    for ys in series:
+        selected.update(lttb_indices(xs, ys, share))
+    return sorted(selected)[:max_points]
@@ -0,0 +1,87 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+
+import config
+from database import AsyncSessionLocal
+from models import LogEntry, AnomalyParam
+from services.db_service import DBService
+from services.serialization import LOG_ENTRY_FIELDS, dumps
+
+logger = logging.getLogger(__name__)
+
+
+async def stream_log_rows(
+    columns: Sequence[str] = LOG_ENTRY_FIELDS,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    log_level: Optional[str] = None,
+    hdfs_component: Optional[str] = None,
+    block_id: Optional[str] = None,
+    by_event_time: bool = False,
+    template_id: Optional[int] = None,
+    chunk_rows: int = config.EXPORT_CHUNK_ROWS
+) -> AsyncIterator[List[Tuple]]:
+    """
+    Yield matching log entries oldest first, `chunk_rows` row tuples at a time,
+    from a server-side cursor so memory stays flat however many rows match
+
+    Closing the generator (e.g. when the client disconnects) closes the
+    cursor and its session.
+    """
+    query = DBService.log_entries_query(
+        tuple(getattr(LogEntry, column) for column in columns),
+        log_level=log_level,
+        start_time=start_time,
+        end_time=end_time,
+        hdfs_component=hdfs_component,
+        block_id=block_id,
+        newest_first=False,
+        by_event_time=by_event_time,
+        template_id=template_id
+    )
+    async for rows in stream_query_rows(query, chunk_rows):
+        yield rows
+
+
+async def stream_anomaly_param_rows(
+    columns: Sequence[str],
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    classification_type: Optional[str] = None,
+    chunk_rows: int = config.EXPORT_CHUNK_ROWS
+) -> AsyncIterator[List[Tuple]]:
+    """Yield matching anomaly params oldest first, like stream_log_rows"""
+    query = DBService.anomaly_params_query(
+        tuple(getattr(AnomalyParam, column) for column in columns),
+        classification_type=classification_type,
+        start_time=start_time,
+        end_time=end_time,
+        newest_first=False
+    )
+    async for rows in stream_query_rows(query, chunk_rows):
+        yield rows
+
+
+async def stream_query_rows(query, chunk_rows: int) -> AsyncIterator[List[Tuple]]:
+    async_session = AsyncSessionLocal()
+    try:
+        result = await async_session.stream(query.execution_options(yield_per=chunk_rows))
+        async for rows in result.partitions(chunk_rows):
+            yield rows
+    finally:
+        await async_session.close()
+
+
+def ndjson_chunk(rows: Sequence[Tuple], columns: Sequence[str]) -> bytes:
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def csv_chunk(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import asyncpg
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+PG_NOTIFY_MAX_PAYLOAD = 7999
+
+Dispatcher = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class MemoryFanout:
+    """Deliver events to the stream clients of this process only (single worker)"""
+
+    def __init__(self):
+        self.dispatch: Optional[Dispatcher] = None
+
+    async def start(self, dispatch: Dispatcher):
+        self.dispatch = dispatch
+
+    async def publish(self, channel: str, payload: Dict[str, Any]):
+        if self.dispatch:
+            await self.dispatch(channel, payload)
+
+    async def stop(self):
+        self.dispatch = None
+
+
+class PostgresFanout:
+    """
+    Relay events between worker processes with Postgres LISTEN/NOTIFY
+
+    The ingesting process publishes every event with pg_notify, and each
+    worker (including the publisher) receives it on its own listening
+    connection and hands it to its local stream clients.
+    """
+
+    def __init__(self, dsn: str = config.DB_URL, pg_channel: str = config.FANOUT_PG_CHANNEL):
+        self.dsn = dsn
+        self.pg_channel = pg_channel
+        self.dispatch: Optional[Dispatcher] = None
+        self.listen_conn = None
+        self.publish_conn = None
+        self.publish_lock = asyncio.Lock()
+        self.inbox = asyncio.Queue()
+        self.running = False
+        self.tasks = []
+
+    async def start(self, dispatch: Dispatcher):
+        if self.running:
+            return
+
+        self.dispatch = dispatch
+        self.running = True
+        await self._connect_listener()
+        self.tasks = [
+            asyncio.create_task(self._dispatch_events()),
+            asyncio.create_task(self._watch_listener()),
+        ]
+        logger.info(f"Listening for fan-out events on Postgres channel '{self.pg_channel}'")
+
+    async def _connect_listener(self):
+        self.listen_conn = await asyncpg.connect(self.dsn)
+        await self.listen_conn.add_listener(self.pg_channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        # Queue instead of dispatching directly so events keep their order
+        self.inbox.put_nowait(payload)
+
+    async def _dispatch_events(self):
+        while self.running:
+            payload = await self.inbox.get()
+            try:
+                message = json.loads(payload)
+                await self.dispatch(message["c"], message["d"])
+            except Exception as e:
+                logger.error(f"Error dispatching fan-out event: {str(e)}")
+
+    async def _watch_listener(self):
+        """Reconnect the listening connection if Postgres drops it"""
+        while self.running:
+            await asyncio.sleep(5)
+            if self.listen_conn is not None and not self.listen_conn.is_closed():
+                continue
+            try:
+                logger.warning("Fan-out listener connection lost, reconnecting")
+                await self._connect_listener()
+            except Exception as e:
+                logger.error(f"Failed to reconnect fan-out listener: {str(e)}")
+
+    async def publish(self, channel: str, payload: Dict[str, Any]):
+        message = json.dumps({"c": channel, "d": payload}, default=str)
+        if len(message.encode("utf-8")) > PG_NOTIFY_MAX_PAYLOAD:
+            logger.error(f"Dropping {channel} event: payload exceeds the NOTIFY size limit")
+            return
+
+        async with self.publish_lock:
+            try:
+                if self.publish_conn is None or self.publish_conn.is_closed():
+                    self.publish_conn = await asyncpg.connect(self.dsn)
+                await self.publish_conn.execute("SELECT pg_notify($1, $2)", self.pg_channel, message)
+            except Exception as e:
+                logger.error(f"Error publishing {channel} event: {str(e)}")
+
+    async def stop(self):
+        self.running = False
+
+        for task in self.tasks:
+            task.cancel()
+        for task in self.tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.tasks = []
+
+        for conn in (self.listen_conn, self.publish_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self.listen_conn = None
+        self.publish_conn = None
+
+
+def create_fanout_backend():
+    """Create the fan-out backend selected by FANOUT_BACKEND"""
+    if config.FANOUT_BACKEND == "postgres":
+        return PostgresFanout()
+    if config.FANOUT_BACKEND != "memory":
+        logger.warning(f"Unknown FANOUT_BACKEND '{config.FANOUT_BACKEND}', using in-process fan-out")
+    return MemoryFanout()
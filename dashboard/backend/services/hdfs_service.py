@@ -3,9 +3,16 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 
-from sqlalchemy import text
+from sqlalchemy import text, select, desc, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import config
+from models import BlockStats, LogEntry
+from services.db_service import DBService, LOG_VOLUME_VIEW
+from services.labels import log_levels, hdfs_components
+from services.serialization import LOG_ENTRY_FIELDS
+from services.singleflight import single_flight
+
 logger = logging.getLogger(__name__)
 
 class HDFSLogService:
@@ -49,6 +56,46 @@ class HDFSLogService:
         return None, None, None, None, None
     
     @staticmethod
+    @single_flight.coalesce
+    async def get_block_lifecycle(
+        db: AsyncSession,
+        block_id: str,
+        limit: Optional[int] = None
+    ) -> List[Tuple]:
+        """
+        Get every log entry of a block oldest first, as row tuples in
+        LOG_ENTRY_FIELDS order
+
+        The block's first_seen/last_seen in block_stats bound the scan to the
+        hypertable chunks that can hold it; the last BLOCK_LOOKUP_TAIL_SECONDS
+        are always included for rows the rollup hasn't caught up with yet.
+        A block without a block_stats row is looked up on the block_id index
+        across every chunk.
+        """
+        result = await db.execute(
+            select(BlockStats.first_seen, BlockStats.last_seen)
+            .where(BlockStats.block_id == block_id)
+        )
+        seen = result.first()
+        
+        query = (
+            select(*(getattr(LogEntry, field) for field in LOG_ENTRY_FIELDS))
+            .where(LogEntry.block_id == block_id)
+            .order_by(LogEntry.timestamp, LogEntry.id)
+        )
+        if seen:
+            tail_start = datetime.now() - timedelta(seconds=config.BLOCK_LOOKUP_TAIL_SECONDS)
+            query = query.where(or_(
+                LogEntry.timestamp.between(seen[0], seen[1]),
+                LogEntry.timestamp >= tail_start
+            ))
+        if limit:
+            query = query.limit(limit)
+        result = await db.execute(query)
+        return result.all()
+    
+    @staticmethod
+    @single_flight.coalesce
     async def get_hdfs_block_stats(
         db: AsyncSession,
         limit: int = 100,
@@ -57,7 +104,8 @@ class HDFSLogService:
         end_time: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """
-        Get statistics about HDFS blocks from logs
+        Get statistics about the HDFS blocks active in the time range, read from
+        the block_stats rollup (counts cover each block's whole lifetime)
         """
         # Calculate time range if not provided
         if not end_time:
@@ -65,34 +113,23 @@ class HDFSLogService:
         if not start_time:
             start_time = end_time - timedelta(hours=24)
         
-        # Query for block statistics
-        query = text("""
-            SELECT 
-                block_id,
-                COUNT(*) as log_count,
-                MIN(timestamp) as first_seen,
-                MAX(timestamp) as last_seen,
-                array_agg(DISTINCT log_level) as log_levels,
-                array_agg(DISTINCT hdfs_component) as components
-            FROM 
-                log_entries
-            WHERE 
-                block_id IS NOT NULL
-                AND timestamp BETWEEN :start_time AND :end_time
-            GROUP BY 
-                block_id
-            HAVING 
-                COUNT(*) >= :min_logs
-            ORDER BY 
-                log_count DESC
-            LIMIT :limit
-        """)
-        
-        result = await db.execute(
-            query, 
-            {"start_time": start_time, "end_time": end_time, "min_logs": min_logs, "limit": limit}
+        query = (
+            select(
+                BlockStats.block_id,
+                BlockStats.log_count,
+                BlockStats.first_seen,
+                BlockStats.last_seen,
+                BlockStats.level_bits,
+                BlockStats.component_bits
+            )
+            .where(BlockStats.last_seen >= start_time)
+            .where(BlockStats.first_seen <= end_time)
+            .where(BlockStats.log_count >= min_logs)
+            .order_by(desc(BlockStats.log_count))
+            .limit(limit)
         )
-        rows = result.fetchall()
+        result = await db.execute(query)
+        rows = result.all()
         
         # Convert to dictionary format and ensure we always return a list
         blocks = [
@@ -101,14 +138,15 @@ class HDFSLogService:
                 "log_count": row[1],
                 "first_seen": row[2],
                 "last_seen": row[3],
-                "log_levels": row[4] if row[4] else [],
-                "components": row[5] if row[5] else []
+                "log_levels": await log_levels.decode_bits(db, row[4]),
+                "components": await hdfs_components.decode_bits(db, row[5])
             } for row in rows
         ]
         
         return blocks
     
     @staticmethod
+    @single_flight.coalesce
     async def get_component_activity(
         db: AsyncSession, 
         hours: int = 24,
@@ -119,34 +157,21 @@ class HDFSLogService:
         """
         end_time = datetime.now()
         start_time = end_time - timedelta(hours=hours)
+        params = {"start_time": start_time, "end_time": end_time, "components": components}
         
-        query = text("""
-            SELECT 
-                hdfs_component,
-                COUNT(*) as log_count
-            FROM 
-                log_entries
-            WHERE 
-                hdfs_component IS NOT NULL
-                AND timestamp BETWEEN :start_time AND :end_time
-                AND (:components_filter::boolean = FALSE OR hdfs_component = ANY(:components))
-            GROUP BY 
-                hdfs_component
-            ORDER BY 
-                log_count DESC
-        """)
-        
-        components_filter = components is not None and len(components) > 0
-        
-        result = await db.execute(
-            query, 
-            {
-                "start_time": start_time, 
-                "end_time": end_time,
-                "components_filter": components_filter,
-                "components": components or []
-            }
-        )
+        # Per-minute counts from the log_volume_1m continuous aggregate
+        try:
+            result = await db.execute(
+                DBService.log_volume_query(("hdfs_component",), components=components),
+                params
+            )
+        except Exception as e:
+            logger.warning(f"{LOG_VOLUME_VIEW} unavailable, counting log_entries instead: {str(e)}")
+            await db.rollback()
+            result = await db.execute(
+                DBService.log_volume_query(("hdfs_component",), components=components, from_view=False),
+                params
+            )
         rows = result.fetchall()
         
         # Convert to dictionary
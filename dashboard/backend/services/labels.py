@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models import LogLevel, HdfsComponent, LABEL_REGISTRIES
+
+logger = logging.getLogger(__name__)
+
+# Bitsets are BIGINT columns, so only the first 64 ids get a bit
+MAX_BITS = 64
+# Id that no lookup row has; unknown names in filters encode to it and match nothing
+UNKNOWN_ID = 0
+# Least time between background reloads triggered by cache misses
+RELOAD_INTERVAL_SECONDS = 1.0
+
+
+class LabelRegistry:
+    """
+    Name <-> small integer id of a lookup table (log levels, HDFS components),
+    cached in memory; unknown names are inserted on first use
+
+    Ids are assigned by the database, so every worker agrees on them. The
+    LabelId columns of log_entries encode and decode through this cache,
+    which never does I/O: new labels reach the other workers through the
+    fan-out, and a miss only schedules a background reload.
+    """
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.ids: Dict[str, int] = {}
+        self.names: Dict[int, str] = {}
+        self.lock = asyncio.Lock()
+        self.reloaded_at = 0.0
+        self.reload_task = None
+        # Awaited with the table name and (id, name) rows of newly registered labels
+        self.registration_listeners: List[Callable[[str, List[List[Any]]], Awaitable[None]]] = []
+        # Lets the LabelId column type find this registry
+        LABEL_REGISTRIES[model.__tablename__] = self
+
+    def remember(self, rows: Iterable):
+        for label_id, name in rows:
+            self.ids[name] = label_id
+            self.names[label_id] = name
+
+    async def load(self, db: AsyncSession):
+        result = await db.execute(select(self.model.id, self.model.name))
+        self.remember(result.all())
+
+    async def _reload(self):
+        async_session = AsyncSessionLocal()
+        try:
+            await self.load(async_session)
+        except Exception as e:
+            logger.error(f"Error reloading {self.model.__tablename__}: {str(e)}")
+        finally:
+            await async_session.close()
+            self.reload_task = None
+
+    def _schedule_reload(self):
+        """Reload the table in the background after a cache miss, at most every RELOAD_INTERVAL_SECONDS"""
+        if self.reload_task is not None or time.monotonic() - self.reloaded_at < RELOAD_INTERVAL_SECONDS:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        logger.info(f"Reloading {self.model.__tablename__} after a cache miss")
+        self.reloaded_at = time.monotonic()
+        self.reload_task = loop.create_task(self._reload())
+
+    def encode(self, name: str) -> int:
+        label_id = self.ids.get(name)
+        if label_id is None:
+            self._schedule_reload()
+            return UNKNOWN_ID
+        return label_id
+
+    def decode(self, label_id: int) -> Optional[str]:
+        """Name of an id, None until a label registered by another worker reaches this one"""
+        name = self.names.get(label_id)
+        if name is None:
+            self._schedule_reload()
+        return name
+
+    async def get_ids(self, db: AsyncSession, names: Iterable[Optional[str]]) -> Dict[str, int]:
+        """Get the ids of the given names, registering the ones never seen before"""
+        wanted = {name for name in names if name is not None}
+        missing = wanted - self.ids.keys()
+        if missing:
+            async with self.lock:
+                missing = wanted - self.ids.keys()
+                if missing:
+                    await db.execute(
+                        insert(self.model)
+                        .values([{"name": name} for name in sorted(missing)])
+                        .on_conflict_do_nothing(index_elements=["name"])
+                    )
+                    await db.commit()
+                    result = await db.execute(
+                        select(self.model.id, self.model.name).where(self.model.name.in_(missing))
+                    )
+                    rows = [list(row) for row in result.all()]
+                    self.remember(rows)
+                    for listener in self.registration_listeners:
+                        try:
+                            await listener(self.model.__tablename__, rows)
+                        except Exception as e:
+                            logger.error(f"Error announcing new {self.model.__tablename__}: {str(e)}")
+        return {name: self.ids[name] for name in wanted}
+
+    async def get_names(self, db: AsyncSession, label_ids: Iterable[int]) -> List[str]:
+        label_ids = list(label_ids)
+        if any(label_id not in self.names for label_id in label_ids):
+            # Registered by another worker since we last looked
+            await self.load(db)
+        return [self.names[label_id] for label_id in label_ids if label_id in self.names]
+
+    @staticmethod
+    def bit(label_id: int) -> int:
+        if label_id > MAX_BITS:
+            logger.warning(f"Label id {label_id} has no bit in the {MAX_BITS}-bit bitsets")
+            return 0
+        bit = 1 << (label_id - 1)
+        # Stored in a signed BIGINT
+        return bit - (1 << 64) if bit >= 1 << 63 else bit
+
+    @staticmethod
+    def ids_from_bits(bits: int) -> List[int]:
+        bits &= (1 << 64) - 1
+        return [index + 1 for index in range(MAX_BITS) if bits >> index & 1]
+
+    async def decode_bits(self, db: AsyncSession, bits: int) -> List[str]:
+        return await self.get_names(db, self.ids_from_bits(bits))
+
+
+# Shared registries of the lookup tables
+log_levels = LabelRegistry(LogLevel)
+hdfs_components = LabelRegistry(HdfsComponent)
+
+
+async def apply_label_event(payload: Dict[str, Any]):
+    """Add the labels another worker registered (the fan-out "labels" payload) to this worker's cache"""
+    registry = LABEL_REGISTRIES.get(payload["table"])
+    if registry:
+        registry.remember(payload["labels"])
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+import asyncpg
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionLeader:
+    """
+    Elect a single ingestion owner among worker processes with a Postgres
+    session-level advisory lock
+
+    The worker holding the lock runs ingestion. Postgres releases the lock
+    as soon as the holder's connection goes away, so a standby worker picks
+    it up on its next attempt. The holder pings its connection every
+    heartbeat and stops ingesting as soon as the ping fails; ownership can
+    therefore overlap for at most one heartbeat interval.
+    """
+
+    def __init__(
+        self,
+        on_acquire: Callable[[], Awaitable[None]],
+        on_release: Callable[[], Awaitable[None]],
+        dsn: str = config.DB_URL,
+        lock_key: int = config.INGESTION_LOCK_KEY,
+        retry_seconds: float = config.INGESTION_LOCK_RETRY_SECONDS,
+    ):
+        self.on_acquire = on_acquire
+        self.on_release = on_release
+        self.dsn = dsn
+        self.lock_key = lock_key
+        self.retry_seconds = retry_seconds
+        self.is_leader = False
+        self.running = False
+        self.task = None
+        self.conn = None
+
+    async def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self.running:
+            try:
+                self.conn = await asyncpg.connect(self.dsn)
+                while self.running:
+                    if await self.conn.fetchval("SELECT pg_try_advisory_lock($1)", self.lock_key):
+                        logger.info("Acquired ingestion lock, this worker now owns ingestion")
+                        self.is_leader = True
+                        await self.on_acquire()
+                        while self.running:
+                            await asyncio.sleep(self.retry_seconds)
+                            # Raises if the connection, and with it the lock, is gone
+                            await self.conn.fetchval("SELECT 1")
+                    else:
+                        await asyncio.sleep(self.retry_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion lock connection failed: {str(e)}")
+                await self._release()
+                await self._close()
+                await asyncio.sleep(self.retry_seconds)
+
+    async def _release(self):
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        logger.info("Lost ingestion lock, stopping ingestion on this worker")
+        try:
+            await self.on_release()
+        except Exception as e:
+            logger.error(f"Error stopping ingestion: {str(e)}")
+
+    async def _close(self):
+        if self.conn is not None and not self.conn.is_closed():
+            try:
+                await self.conn.close()
+            except Exception:
+                self.conn.terminate()
+        self.conn = None
+
+    async def stop(self):
+        """Stop ingestion if this worker owns it and give up the lock"""
+        self.running = False
+
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+
+        await self._release()
+        # Closing the session releases the advisory lock
+        await self._close()
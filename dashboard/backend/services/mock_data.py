@@ -14,6 +14,10 @@ logger = logging.getLogger(__name__)
 LOG_LEVELS = ["INFO", "WARNING", "ERROR", "CRITICAL"]
 LOG_LEVEL_WEIGHTS = [0.7, 0.15, 0.1, 0.05]
 
+# HDFS block IDs are Java longs: 10-19 digits, at most 2^63 - 1
+MIN_BLOCK_ID = 1000000000
+MAX_BLOCK_ID = 2 ** 63 - 1
+
 # HDFS Components
 HDFS_COMPONENTS = [
     "dfs.DataNode$PacketResponder",
@@ -92,6 +96,8 @@ class MockDataGenerator:
     async def _generate_data(self):
         """Generate mock data at regular intervals"""
         try:
+            loop = asyncio.get_running_loop()
+            next_run = loop.time()
             while self.running:
                 # Generate log entries
                 await self._generate_log_entries()
@@ -99,8 +105,10 @@ class MockDataGenerator:
                 # Generate classification data
                 await self._generate_classification_data()
                 
-                # Wait before generating more data
-                await asyncio.sleep(config.MOCK_DATA_INTERVAL_SECONDS)
+                # Wait until the next interval starts so the rate doesn't
+                # drop by however long saving the data took
+                next_run = max(next_run + config.MOCK_DATA_INTERVAL_SECONDS, loop.time())
+                await asyncio.sleep(next_run - loop.time())
                 
         except asyncio.CancelledError:
             logger.info("Mock data generation cancelled")
@@ -109,8 +117,8 @@ class MockDataGenerator:
             
     async def _generate_log_entries(self):
         """Generate mock HDFS log entries"""
-        # Generate 1-3 log entries per interval
-        num_logs = random.randint(1, 3)
+        # Generate a fixed number of log entries per interval, or 1-3 by default
+        num_logs = config.MOCK_LOGS_PER_INTERVAL or random.randint(1, 3)
         
         for _ in range(num_logs):
             # Choose log level based on weights
@@ -119,10 +127,10 @@ class MockDataGenerator:
             # Select a message template for the chosen level
             message_template = random.choice(HDFS_LOG_MESSAGES[log_level])
             
-            # Generate a random block ID - format blk_[10-19 digits]
-            block_id = f"blk_{random.randint(1000000000, 9999999999999999999)}"
+            # Generate a random block ID - format blk_[10-19 digits], within BIGINT range
+            block_id = f"blk_{random.randint(MIN_BLOCK_ID, MAX_BLOCK_ID)}"
             if random.random() < 0.3:  # 30% chance for negative block ID
-                block_id = f"blk_{-random.randint(1000000000, 9999999999999999999)}"
+                block_id = f"blk_{-random.randint(MIN_BLOCK_ID, MAX_BLOCK_ID)}"
             
             # Generate random IP addresses (format: 10.x.y.z)
             src_ip = f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(0, 255)}"
@@ -214,9 +222,9 @@ class MockDataGenerator:
             for _ in range(num_params):
             # Generate a random parameter value (e.g., high CPU, network spike, etc.)
                 # We'll use HDFS block ID in abnormal scenarios
-                block_id = f"blk_{random.randint(1000000000, 9999999999999999999)}"
+                block_id = f"blk_{random.randint(MIN_BLOCK_ID, MAX_BLOCK_ID)}"
                 if random.random() < 0.3:  # 30% chance for negative block ID
-                    block_id = f"blk_{-random.randint(1000000000, 9999999999999999999)}"
+                    block_id = f"blk_{-random.randint(MIN_BLOCK_ID, MAX_BLOCK_ID)}"
                 
                 param_values = [
                     f"Corrupted block: {block_id}",
@@ -243,9 +251,9 @@ class MockDataGenerator:
             
             for _ in range(num_params):
                 # Generate a random parameter value
-                block_id = f"blk_{random.randint(1000000000, 9999999999999999999)}"
+                block_id = f"blk_{random.randint(MIN_BLOCK_ID, MAX_BLOCK_ID)}"
                 if random.random() < 0.3:  # 30% chance for negative block ID
-                    block_id = f"blk_{-random.randint(1000000000, 9999999999999999999)}"
+                    block_id = f"blk_{-random.randint(MIN_BLOCK_ID, MAX_BLOCK_ID)}"
                 
                 param_values = [
                     f"Unknown block status: {block_id}",
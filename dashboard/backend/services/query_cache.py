@@ -0,0 +1,163 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Set, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_value(value: Any) -> Any:
+    """Turn a query parameter into a hashable value that ignores list order"""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(normalize_value(item) for item in value))
+    return value
+
+
+class QueryCache:
+    """
+    TTL + LRU cache for endpoint results, keyed by endpoint name and
+    normalized query parameters
+
+    Entries are tagged with the tables they were computed from, and the
+    ingest path invalidates a tag whenever it writes new rows to that table,
+    at most once per QUERY_CACHE_INVALIDATE_INTERVAL_SECONDS so entries
+    survive a steady ingest rate. Only endpoints listed in
+    QUERY_CACHE_ENDPOINTS are cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = config.QUERY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = config.QUERY_CACHE_TTL_SECONDS,
+        enabled_endpoints: Iterable[str] = config.QUERY_CACHE_ENDPOINTS,
+        invalidate_interval_seconds: float = config.QUERY_CACHE_INVALIDATE_INTERVAL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.invalidate_interval_seconds = invalidate_interval_seconds
+        # Tag -> monotonic time of its last invalidation, and tags written to since
+        self.invalidated_at: Dict[str, float] = {}
+        self.pending_invalidations: Set[str] = set()
+        self.enabled_endpoints = set(enabled_endpoints)
+        # key -> (expires_at, tags, value)
+        self.entries: "OrderedDict[Tuple, Tuple[float, Tuple[str, ...], Any]]" = OrderedDict()
+        self.metrics: Dict[str, Dict[str, int]] = {}
+        # Bumped on every invalidation so results computed across a write aren't stored
+        self.generations: Dict[str, int] = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    def is_enabled(self, endpoint: str) -> bool:
+        return endpoint in self.enabled_endpoints
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> Tuple:
+        return (endpoint,) + tuple(sorted((name, normalize_value(value)) for name, value in params.items()))
+
+    def _count(self, endpoint: str, outcome: str):
+        counters = self.metrics.setdefault(endpoint, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Tuple[bool, Any]:
+        self._apply_pending_invalidations()
+        key = self.make_key(endpoint, params)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self._count(endpoint, "misses")
+            return False, None
+
+        self.entries.move_to_end(key)
+        self._count(endpoint, "hits")
+        return True, entry[2]
+
+    def set(self, endpoint: str, params: Dict[str, Any], value: Any, tags: Iterable[str] = ()):
+        key = self.make_key(endpoint, params)
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, tuple(tags), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, tag: str):
+        """Drop every entry computed from the given table"""
+        self.invalidated_at[tag] = time.monotonic()
+        self.pending_invalidations.discard(tag)
+        self.generations[tag] = self.generations.get(tag, 0) + 1
+        stale = [key for key, (_, tags, _) in self.entries.items() if tag in tags]
+        for key in stale:
+            del self.entries[key]
+        self.invalidations += len(stale)
+
+    def note_write(self, tag: str):
+        """
+        Invalidate a table written to, unless it was invalidated less than
+        invalidate_interval_seconds ago; then the first read after the
+        interval does it
+        """
+        last = self.invalidated_at.get(tag)
+        if last is None or time.monotonic() - last >= self.invalidate_interval_seconds:
+            self.invalidate(tag)
+        else:
+            self.pending_invalidations.add(tag)
+
+    def _apply_pending_invalidations(self):
+        if not self.pending_invalidations:
+            return
+        now = time.monotonic()
+        for tag in list(self.pending_invalidations):
+            if now - self.invalidated_at.get(tag, 0.0) >= self.invalidate_interval_seconds:
+                self.invalidate(tag)
+
+    def clear(self):
+        self.entries.clear()
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]],
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Return the cached result for these parameters, computing and storing it on a miss"""
+        if not self.is_enabled(endpoint):
+            return await compute()
+
+        found, value = self.get(endpoint, params)
+        if found:
+            return value
+
+        tags = tuple(tags)
+        generations = [self.generations.get(tag, 0) for tag in tags]
+        value = await compute()
+        # Skip storing if new rows arrived while the query was running
+        if generations == [self.generations.get(tag, 0) for tag in tags]:
+            self.set(endpoint, params, value, tags)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint, counters in self.metrics.items():
+            total = counters["hits"] + counters["misses"]
+            endpoints[endpoint] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / total, 4) if total else 0,
+            }
+        return {
+            "enabled_endpoints": sorted(self.enabled_endpoints),
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "invalidate_interval_seconds": self.invalidate_interval_seconds,
+            "pending_invalidations": sorted(self.pending_invalidations),
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "endpoints": endpoints,
+        }
+
+
+# Shared cache used by the route handlers
+query_cache = QueryCache()
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+import config
+from models import ClassificationCreate, AnomalyParamCreate
+from services.scoring_models import score_batch, ANOMALY, NORMAL, UNIDENTIFIED
+
+logger = logging.getLogger(__name__)
+
+# Batches whose latencies are kept for the metrics
+RECENT_BATCHES = 100
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"mean": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    return {
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max": ordered[-1],
+    }
+
+
+class BatchScorer:
+    """
+    Score block sessions as they complete (are evicted from the block session
+    store) with a pluggable model in a process pool, and emit the results as
+    classifications and anomaly params through the same callbacks as the
+    Kafka consumer
+
+    Runs on the ingesting process only, so each block is scored once.
+    """
+
+    def __init__(
+        self,
+        model: str = config.SCORING_MODEL,
+        batch_size: int = config.SCORING_BATCH_SIZE,
+        batch_seconds: float = config.SCORING_BATCH_SECONDS,
+        workers: int = config.SCORING_WORKERS,
+        max_params: int = config.SCORING_MAX_PARAMS_PER_BATCH,
+    ):
+        self.model = model
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.workers = workers
+        self.max_params = max_params
+        # Completed-session chunks from the block session store, oldest first
+        self.pending: List[Dict[str, Any]] = []
+        self.pending_blocks = 0
+        self.pending_since = None
+        self.classification_callbacks: List[Callable] = []
+        self.anomaly_param_callbacks: List[Callable] = []
+        self.wakeup = None
+        self.pool = None
+        self.running = False
+        self.task = None
+        self.recent = deque(maxlen=RECENT_BATCHES)
+        self.batches = 0
+        self.blocks_scored = 0
+        self.label_counts = {"normal": 0, "anomaly": 0, "unidentified": 0}
+        self.errors = 0
+
+    def register_classification_consumer(self, callback: Callable):
+        """Register a callback for the classification of each batch"""
+        self.classification_callbacks.append(callback)
+
+    def register_anomaly_param_consumer(self, callback: Callable):
+        """Register a callback for each anomalous or unidentified block"""
+        self.anomaly_param_callbacks.append(callback)
+
+    def submit(self, completed: Dict[str, Any]):
+        """Queue completed sessions (a BlockSessionStore.matrix() dict) for scoring"""
+        if not self.running or not completed["block_ids"]:
+            return
+        if not self.pending:
+            self.pending_since = time.monotonic()
+        self.pending.append(completed)
+        self.pending_blocks += len(completed["block_ids"])
+        if self.pending_blocks >= self.batch_size and self.wakeup:
+            self.wakeup.set()
+
+    @staticmethod
+    def assemble(chunks: List[Dict[str, Any]]):
+        """Stack session chunks into one matrix whose column j counts template id j + 1"""
+        block_ids = [block_id for chunk in chunks for block_id in chunk["block_ids"]]
+        width = max((max(chunk["template_ids"]) for chunk in chunks if chunk["template_ids"]), default=0)
+        counts = np.zeros((len(block_ids), width), dtype=np.uint32)
+        offset = 0
+        for chunk in chunks:
+            rows = len(chunk["block_ids"])
+            if chunk["template_ids"]:
+                columns = np.asarray(chunk["template_ids"]) - 1
+                counts[offset:offset + rows, columns] = chunk["counts"]
+            offset += rows
+        return block_ids, counts
+
+    async def flush(self):
+        if not self.pending:
+            return
+        chunks, self.pending = self.pending, []
+        queued_seconds = time.monotonic() - self.pending_since
+        self.pending_blocks = 0
+
+        started = time.perf_counter()
+        block_ids, counts = self.assemble(chunks)
+        try:
+            labels = await asyncio.get_running_loop().run_in_executor(self.pool, score_batch, self.model, counts)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error scoring {len(block_ids)} block sessions with {self.model}: {str(e)}")
+            return
+        scored = time.perf_counter()
+
+        normal_count = int(np.count_nonzero(labels == NORMAL))
+        anomaly_count = int(np.count_nonzero(labels == ANOMALY))
+        unidentified_count = len(labels) - normal_count - anomaly_count
+        classification = ClassificationCreate(
+            normal_count=normal_count,
+            anomaly_count=anomaly_count,
+            unidentified_count=unidentified_count
+        )
+        for callback in self.classification_callbacks:
+            await callback(classification)
+
+        flagged = [
+            (block_id, "anomaly" if label == ANOMALY else "unidentified")
+            for block_id, label in zip(block_ids, labels.tolist())
+            if label in (ANOMALY, UNIDENTIFIED)
+        ]
+        # Anomalies first, so the cap drops unidentified blocks before them
+        flagged.sort(key=lambda item: item[1] != "anomaly")
+        for block_id, classification_type in flagged[:self.max_params]:
+            param = AnomalyParamCreate(param_value=block_id, classification_type=classification_type)
+            for callback in self.anomaly_param_callbacks:
+                await callback(param)
+        finished = time.perf_counter()
+
+        self.batches += 1
+        self.blocks_scored += len(block_ids)
+        self.label_counts["normal"] += normal_count
+        self.label_counts["anomaly"] += anomaly_count
+        self.label_counts["unidentified"] += unidentified_count
+        self.recent.append({
+            "blocks": len(block_ids),
+            "templates": counts.shape[1],
+            "queued_ms": round(queued_seconds * 1000, 2),
+            "score_ms": round((scored - started) * 1000, 2),
+            "emit_ms": round((finished - scored) * 1000, 2),
+            "total_ms": round((finished - started) * 1000, 2),
+        })
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "model": self.model,
+            "workers": self.workers,
+            "pending_blocks": self.pending_blocks,
+            "batches": self.batches,
+            "blocks_scored": self.blocks_scored,
+            "labels": dict(self.label_counts),
+            "errors": self.errors,
+            "score_ms": latency_summary([batch["score_ms"] for batch in self.recent]),
+            "total_ms": latency_summary([batch["total_ms"] for batch in self.recent]),
+            "last_batch": self.recent[-1] if self.recent else None
+        }
+
+    async def start(self):
+        if self.running:
+            return
+
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.wakeup = asyncio.Event()
+        self.running = True
+        self.task = asyncio.create_task(self._score_periodically())
+        logger.info(f"Scoring completed block sessions with {self.model} in {self.workers} processes")
+
+    async def _score_periodically(self):
+        while self.running:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.batch_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error emitting block scores: {str(e)}")
+
+    async def stop(self):
+        self.running = False
+
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+        # Score what was already queued before the pool goes away
+        await self.flush()
+        if self.pool:
+            self.pool.shutdown(wait=False)
+        self.pool = None
+
+
+# Shared scorer fed by the block session store's evictions
+batch_scorer = BatchScorer()
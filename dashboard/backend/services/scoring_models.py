@@ -0,0 +1,112 @@
+"""
+Block anomaly models run by the batch scorer's process pool
+
+A model gets a block x template count matrix (column j counts template id
+j + 1) and returns one label per row: 1 anomaly, 0 normal, -1 unidentified.
+"""
+
+import importlib
+import logging
+from functools import partial
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger(__name__)
+
+NORMAL, ANOMALY, UNIDENTIFIED = 0, 1, -1
+
+# Eigenvalues (and squared prediction errors) below this share of the largest
+# eigenvalue are floating-point noise, e.g. from templates with exact linear
+# relations or blocks with equal log counts
+RELATIVE_TOLERANCE = 1e-10
+
+# Models loaded in this (pool) process, by SCORING_MODEL value
+_models: Dict[str, Callable[[np.ndarray], Any]] = {}
+
+
+def pca_baseline(
+    counts: np.ndarray,
+    min_blocks: int = 10,
+    variance: float = 0.95,
+    threshold_z: float = 3.09
+) -> np.ndarray:
+    """
+    PCA residual detector (Xu et al., SOSP 2009) fitted on the batch itself
+
+    Blocks whose centered counts have a squared prediction error outside the
+    principal subspace (the components explaining `variance`) above the
+    Q-statistic threshold at `threshold_z` are anomalies: they break the
+    correlations between templates that most blocks follow. Eigenvalues that
+    are numerical noise are dropped first, so exact invariants (all blocks
+    obeying them) leave an empty residual instead of a noise threshold.
+    Blocks without templated logs, and every block of a batch smaller than
+    `min_blocks`, are unidentified.
+    """
+    labels = np.full(len(counts), NORMAL, dtype=np.int8)
+    empty = counts.sum(axis=1) == 0
+    labels[empty] = UNIDENTIFIED
+    if len(counts) - empty.sum() < min_blocks:
+        labels[:] = UNIDENTIFIED
+        return labels
+
+    matrix = counts[~empty].astype(np.float64)
+    blocks = len(matrix)
+    matrix -= matrix.mean(axis=0)
+
+    _, singular_values, components = np.linalg.svd(matrix, full_matrices=False)
+    eigenvalues = singular_values ** 2 / max(blocks - 1, 1)
+    if eigenvalues[0] == 0:
+        return labels
+    tolerance = eigenvalues[0] * RELATIVE_TOLERANCE
+    eigenvalues = eigenvalues[eigenvalues > tolerance]
+    total = eigenvalues.sum()
+    k = int(np.searchsorted(np.cumsum(eigenvalues) / total, variance) + 1)
+    residual_eigenvalues = eigenvalues[k:]
+    if len(residual_eigenvalues) == 0:
+        # The principal subspace explains every block
+        return labels
+    theta1, theta2, theta3 = (np.sum(residual_eigenvalues ** power) for power in (1, 2, 3))
+
+    principal = components[:k]
+    residual = matrix - matrix @ principal.T @ principal
+    spe = np.einsum("ij,ij->i", residual, residual)
+    h0 = 1 - 2 * theta1 * theta3 / (3 * theta2 ** 2)
+    threshold = theta1 * (
+        threshold_z * np.sqrt(2 * theta2 * h0 ** 2) / theta1
+        + 1
+        + theta2 * h0 * (h0 - 1) / theta1 ** 2
+    ) ** (1 / h0)
+    labels[np.flatnonzero(~empty)[spe > max(threshold, tolerance)]] = ANOMALY
+    return labels
+
+
+def load_model(name: str) -> Callable[[np.ndarray], Any]:
+    """
+    "pca" for the built-in baseline, or "package.module:attribute" naming a
+    function of the count matrix or an object with a predict method
+    (scikit-learn style)
+    """
+    if name == "pca":
+        return partial(
+            pca_baseline,
+            min_blocks=config.SCORING_PCA_MIN_BLOCKS,
+            variance=config.SCORING_PCA_VARIANCE,
+            threshold_z=config.SCORING_PCA_THRESHOLD_Z
+        )
+    module_name, _, attribute = name.partition(":")
+    model = getattr(importlib.import_module(module_name), attribute)
+    return model.predict if hasattr(model, "predict") else model
+
+
+def score_batch(model_name: str, counts: np.ndarray) -> np.ndarray:
+    """Label each row of a count matrix; runs in a pool process"""
+    model = _models.get(model_name)
+    if model is None:
+        model = _models[model_name] = load_model(model_name)
+    labels = np.asarray(model(counts)).astype(np.int8).ravel()
+    if len(labels) != len(counts):
+        raise ValueError(f"Model {model_name} returned {len(labels)} labels for {len(counts)} blocks")
+    return labels
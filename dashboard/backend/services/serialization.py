@@ -0,0 +1,61 @@
+import json
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Sequence
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+if orjson is None:
+    logger.info("orjson not installed, fast read endpoints will use the standard json encoder")
+
+# Column order of the plain-row read paths, matching the key order of the
+# LogEntryResponse, ClassificationResponse, AnomalyParamResponse and SpikeAlertResponse models
+LOG_ENTRY_FIELDS = (
+    "message", "log_level", "hdfs_date", "hdfs_time", "thread_id",
+    "hdfs_component", "block_id", "id", "timestamp", "event_time", "template_id",
+)
+CLASSIFICATION_FIELDS = ("normal_count", "anomaly_count", "unidentified_count", "id", "timestamp")
+ANOMALY_PARAM_FIELDS = ("param_value", "classification_type", "id", "timestamp")
+SPIKE_ALERT_FIELDS = ("series", "value", "expected", "z_score", "event_count", "id", "timestamp")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON bytes, datetimes as ISO 8601 like the response models"""
+    if orjson is not None:
+        # orjson writes datetimes the same way as datetime.isoformat()
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def dump_rows(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> bytes:
+    """Encode row tuples as a JSON array of objects keyed by fields"""
+    return dumps([dict(zip(fields, row)) for row in rows])
+
+
+def epoch_millis(moment: datetime) -> int:
+    # Naive timestamps are stored in UTC
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def time_series_columns(points: Iterable[Any]) -> Dict[str, List[int]]:
+    """Turn TimeSeriesData points into parallel arrays with epoch-millisecond timestamps"""
+    columns = {"timestamps": [], "normal_count": [], "anomaly_count": [], "unidentified_count": []}
+    for point in points:
+        columns["timestamps"].append(epoch_millis(point.timestamp))
+        columns["normal_count"].append(point.normal_count)
+        columns["anomaly_count"].append(point.anomaly_count)
+        columns["unidentified_count"].append(point.unidentified_count)
+    return columns
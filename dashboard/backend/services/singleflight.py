@@ -0,0 +1,174 @@
+import asyncio
+import functools
+import inspect
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import config
+from database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_argument(value: Any) -> Hashable:
+    """
+    Make a query argument hashable, rounding datetimes so that identical
+    requests computing "now - N hours" a few milliseconds apart share a key
+    """
+    if isinstance(value, datetime):
+        resolution = config.SINGLE_FLIGHT_TIME_RESOLUTION_SECONDS
+        if resolution > 0:
+            timestamp = value.timestamp()
+            return (value.tzinfo is not None, timestamp - timestamp % resolution)
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return tuple(normalize_argument(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize_argument(item)) for key, item in value.items()))
+    return value
+
+
+class Flight:
+    """One shared call: the task computing it and the callers waiting on it"""
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent identical calls
+
+    The first caller starts the call; callers arriving with the same key
+    while it runs wait for that call and get the same result (or exception)
+    instead of issuing their own query.
+    """
+
+    def __init__(self, enabled: bool = config.SINGLE_FLIGHT_ENABLED, session_factory: Callable = AsyncSessionLocal):
+        self.enabled = enabled
+        self.session_factory = session_factory
+        self.in_flight: Dict[Hashable, Flight] = {}
+        self.metrics: Dict[str, Dict[str, int]] = {}
+
+    def _start(self, key: Hashable, flight: Optional[Flight], coroutine: Awaitable[Any]) -> Flight:
+        task = asyncio.ensure_future(coroutine)
+        if flight is None:
+            flight = self.in_flight[key] = Flight(task)
+        else:
+            flight.task = task
+
+        def finished(done: asyncio.Future):
+            # A task replaced by a hand-over no longer owns the entry
+            if self.in_flight.get(key) is flight and flight.task is done:
+                del self.in_flight[key]
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(finished)
+        return flight
+
+    async def do(
+        self,
+        name: str,
+        key: Hashable,
+        call: Callable[[Any], Awaitable[Any]],
+        session: Any
+    ) -> Any:
+        """
+        Run call(session) for the first caller with this key, on that caller's
+        session. If that caller is cancelled while others still wait, the call
+        is restarted on a session of its own and handed over to them.
+        """
+        counters = self.metrics.setdefault(name, {"calls": 0, "executions": 0, "coalesced": 0})
+        counters["calls"] += 1
+
+        flight = self.in_flight.get(key)
+        owner = flight is None
+        if owner:
+            counters["executions"] += 1
+            flight = self._start(key, None, call(session))
+        else:
+            counters["coalesced"] += 1
+        flight.waiters += 1
+
+        try:
+            while True:
+                task = flight.task
+                try:
+                    # Shield so one caller going away doesn't cancel the query for the others
+                    return await asyncio.shield(task)
+                except asyncio.CancelledError:
+                    if not owner and task.cancelled() and flight.task is not task:
+                        # The owner went away and the call was restarted
+                        continue
+                    raise
+        except asyncio.CancelledError:
+            if owner and not flight.task.done():
+                task = flight.task
+                if flight.waiters > 1:
+                    counters["executions"] += 1
+                    self._start(key, flight, self._call_on_own_session(call))
+                # Its session is about to be closed
+                task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _call_on_own_session(self, call: Callable[[Any], Awaitable[Any]]) -> Any:
+        session = self.session_factory()
+        try:
+            return await call(session)
+        finally:
+            await session.close()
+
+    def coalesce(self, func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """
+        Decorate an async query method whose first argument is the database
+        session; calls are keyed by the method and its remaining arguments
+
+        The shared call runs on the first caller's session, so the other
+        callers get results read through a session that isn't theirs: only
+        decorate methods returning plain rows or dicts, never ORM objects.
+        """
+        signature = inspect.signature(func)
+        session_parameter = next(iter(signature.parameters))
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__qualname__,) + tuple(
+                (name, normalize_argument(value))
+                for name, value in bound.arguments.items()
+                if name != session_parameter
+            )
+
+            def call(session):
+                return func(**{**bound.arguments, session_parameter: session})
+
+            return await self.do(func.__qualname__, key, call, bound.arguments[session_parameter])
+
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        methods = {}
+        for name, counters in self.metrics.items():
+            methods[name] = {
+                **counters,
+                "coalesce_rate": round(counters["coalesced"] / counters["calls"], 4) if counters["calls"] else 0,
+            }
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self.in_flight),
+            "methods": methods,
+        }
+
+
+# Shared instance used by the query services
+single_flight = SingleFlight()
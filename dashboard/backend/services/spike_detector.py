@@ -0,0 +1,170 @@
+import logging
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import config
+from models import SpikeAlertCreate
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class EwmaStats:
+    """Exponentially weighted mean and variance of a stream, in O(1) state"""
+    __slots__ = ("mean", "variance", "samples")
+
+    def __init__(self):
+        self.mean = 0.0
+        self.variance = 0.0
+        self.samples = 0
+
+    def update(self, value: float, alpha: float):
+        if self.samples == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = alpha * diff
+            self.mean += increment
+            self.variance = (1 - alpha) * (self.variance + diff * increment)
+        self.samples += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"mean": round(self.mean, 6), "std": round(math.sqrt(self.variance), 6), "samples": self.samples}
+
+
+class SeriesDetector:
+    """
+    z-score of one rate series against its EWMA baseline, and against the
+    baseline of its time-of-day slot once that slot is warmed up
+    """
+
+    def __init__(self, name: str, season_slots: int):
+        self.name = name
+        self.overall = EwmaStats()
+        self.slots = [EwmaStats() for _ in range(season_slots)]
+        self.in_spike = False
+        self.last_value: Optional[float] = None
+        self.last_z: Optional[float] = None
+        self.alerts = 0
+
+    def slot(self, at: datetime) -> Optional[EwmaStats]:
+        if not self.slots:
+            return None
+        # Naive timestamps are UTC
+        seconds = at.replace(tzinfo=timezone.utc).timestamp() % SECONDS_PER_DAY
+        return self.slots[int(seconds * len(self.slots) // SECONDS_PER_DAY)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "in_spike": self.in_spike,
+            "last_value": None if self.last_value is None else round(self.last_value, 6),
+            "last_z_score": None if self.last_z is None else round(self.last_z, 3),
+            "alerts": self.alerts,
+            "baseline": self.overall.as_dict(),
+            "seasonal_baselines": [slot.as_dict() for slot in self.slots],
+        }
+
+
+class SpikeDetector:
+    """
+    Flag bursts in the anomaly and unidentified rates of incoming
+    classifications as they arrive, without reading history
+
+    Each classification is scored against the state before it, then folded
+    in. A series alerts once when its z-score crosses SPIKE_Z_THRESHOLD and
+    not again until it drops back below. Runs on the ingesting process only.
+    """
+
+    SERIES = ("anomaly_rate", "unidentified_rate")
+
+    def __init__(
+        self,
+        alpha: float = config.SPIKE_EWMA_ALPHA,
+        z_threshold: float = config.SPIKE_Z_THRESHOLD,
+        warmup_samples: int = config.SPIKE_WARMUP_SAMPLES,
+        min_events: int = config.SPIKE_MIN_EVENTS,
+        min_std: float = config.SPIKE_MIN_STD,
+        season_slots: int = config.SPIKE_SEASON_SLOTS,
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup_samples = warmup_samples
+        self.min_events = min_events
+        self.min_std = min_std
+        self.season_slots = season_slots
+        self.series = {name: SeriesDetector(name, season_slots) for name in self.SERIES}
+        self.classifications = 0
+        self.skipped = 0
+        self.updated_at: Optional[datetime] = None
+
+    def _score(self, series: SeriesDetector, value: float, at: datetime):
+        """z-score and expected value of `value`, None while the series warms up"""
+        baseline = series.overall
+        slot = series.slot(at)
+        if slot is not None and slot.samples >= self.warmup_samples:
+            baseline = slot
+        if baseline.samples < self.warmup_samples:
+            return None, baseline.mean
+        std = max(math.sqrt(baseline.variance), self.min_std)
+        return (value - baseline.mean) / std, baseline.mean
+
+    def update(self, classification) -> List[SpikeAlertCreate]:
+        """Fold in a saved classification; returns the alerts it raises"""
+        total = classification.normal_count + classification.anomaly_count + classification.unidentified_count
+        self.classifications += 1
+        if total < self.min_events:
+            # Rates of a handful of events are mostly noise
+            self.skipped += 1
+            return []
+
+        at = classification.timestamp or datetime.utcnow()
+        values = {
+            "anomaly_rate": classification.anomaly_count / total,
+            "unidentified_rate": classification.unidentified_count / total,
+        }
+        alerts = []
+        for name, value in values.items():
+            series = self.series[name]
+            z_score, expected = self._score(series, value, at)
+            spiking = z_score is not None and z_score >= self.z_threshold
+            if spiking and not series.in_spike:
+                series.alerts += 1
+                alerts.append(SpikeAlertCreate(
+                    series=name,
+                    value=value,
+                    expected=expected,
+                    z_score=z_score,
+                    event_count=total
+                ))
+            series.in_spike = spiking
+            series.last_value = value
+            series.last_z = z_score
+
+            series.overall.update(value, self.alpha)
+            slot = series.slot(at)
+            if slot is not None:
+                slot.update(value, self.alpha)
+
+        self.updated_at = at
+        return alerts
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "classifications": self.classifications,
+            "skipped": self.skipped,
+            "config": {
+                "alpha": self.alpha,
+                "z_threshold": self.z_threshold,
+                "warmup_samples": self.warmup_samples,
+                "min_events": self.min_events,
+                "season_slots": self.season_slots,
+            },
+            "series": {name: series.as_dict() for name, series in self.series.items()},
+        }
+
+
+# Shared detector fed by the classification callback
+spike_detector = SpikeDetector()
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Rolling windows kept in memory, in seconds
+WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+
+
+class RollingWindow:
+    """Normal/anomaly/unidentified totals over the last `seconds` seconds, in per-second buckets"""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        # Each bucket is [epoch_second, normal, anomaly, unidentified]
+        self.buckets = deque()
+        self.totals = [0, 0, 0]
+
+    def add(self, second: int, normal: int, anomaly: int, unidentified: int):
+        if not self.buckets or self.buckets[-1][0] < second:
+            bucket = [second, 0, 0, 0]
+            self.buckets.append(bucket)
+        else:
+            # Late second: fold it into its bucket so buckets stay in order for expire()
+            index = len(self.buckets) - 1
+            while index >= 0 and self.buckets[index][0] > second:
+                index -= 1
+            if index >= 0 and self.buckets[index][0] == second:
+                bucket = self.buckets[index]
+            else:
+                bucket = [second, 0, 0, 0]
+                self.buckets.insert(index + 1, bucket)
+        bucket[1] += normal
+        bucket[2] += anomaly
+        bucket[3] += unidentified
+        self.totals[0] += normal
+        self.totals[1] += anomaly
+        self.totals[2] += unidentified
+
+    def expire(self, now_second: int):
+        cutoff = now_second - self.seconds
+        while self.buckets and self.buckets[0][0] <= cutoff:
+            _, normal, anomaly, unidentified = self.buckets.popleft()
+            self.totals[0] -= normal
+            self.totals[1] -= anomaly
+            self.totals[2] -= unidentified
+
+    def clear(self):
+        self.buckets.clear()
+        self.totals = [0, 0, 0]
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "normal_count": self.totals[0],
+            "anomaly_count": self.totals[1],
+            "unidentified_count": self.totals[2],
+        }
+
+
+class RollingStatsAggregator:
+    """
+    Aggregate classifications into rolling windows and publish one combined
+    snapshot per interval, so the statistics stream's broadcast cost depends
+    on the interval rather than on the ingest rate
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[Dict[str, Any]], Awaitable[None]],
+        interval_seconds: float = config.STATS_STREAM_INTERVAL_SECONDS,
+    ):
+        self.publish = publish
+        self.interval_seconds = interval_seconds
+        self.windows = {name: RollingWindow(seconds) for name, seconds in WINDOWS.items()}
+        self.sequence = 0
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+        self.running = False
+        self.task = None
+
+    def add(self, normal_count: int, anomaly_count: int, unidentified_count: int, at: Optional[float] = None):
+        """Record one classification; `at` defaults to now (epoch seconds)"""
+        second = int(at if at is not None else time.time())
+        for window in self.windows.values():
+            window.add(second, normal_count, anomaly_count, unidentified_count)
+
+    def reset(self):
+        """Empty every window, e.g. before seeding them again from the database"""
+        for window in self.windows.values():
+            window.clear()
+        self.last_snapshot = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        now_second = int(time.time())
+        for window in self.windows.values():
+            window.expire(now_second)
+
+        windows = {name: window.as_dict() for name, window in self.windows.items()}
+        return {
+            # Top-level counts are the shortest window so existing clients keep working
+            **windows["1m"],
+            "windows": windows,
+            "interval_seconds": self.interval_seconds,
+        }
+
+    async def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.task = asyncio.create_task(self._emit_snapshots())
+
+    async def _emit_snapshots(self):
+        while self.running:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                snapshot = self.snapshot()
+                # Nothing was added or expired since the last snapshot
+                if snapshot == self.last_snapshot:
+                    continue
+                self.last_snapshot = snapshot
+                self.sequence += 1
+                await self.publish({
+                    "id": self.sequence,
+                    "timestamp": datetime.now().isoformat(),
+                    **snapshot,
+                })
+            except Exception as e:
+                logger.error(f"Error publishing statistics snapshot: {str(e)}")
+
+    async def stop(self):
+        self.running = False
+
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from models import LogTemplate
+
+logger = logging.getLogger(__name__)
+
+# Template token standing for a parameter
+WILDCARD = "<*>"
+
+
+def has_digits(token: str) -> bool:
+    return any(character.isdigit() for character in token)
+
+
+class TemplateCluster:
+    __slots__ = ("template_id", "tokens")
+
+    def __init__(self, template_id: int, tokens: List[str]):
+        self.template_id = template_id
+        self.tokens = tokens
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+
+class PrefixNode:
+    __slots__ = ("children", "clusters")
+
+    def __init__(self):
+        self.children: Dict[str, "PrefixNode"] = {}
+        self.clusters: List[TemplateCluster] = []
+
+
+class TemplateMiner:
+    """
+    Online Drain log template miner: each message goes down a fixed-depth
+    prefix tree (token count, then its first tokens) to a handful of
+    candidate templates, joins the most similar one if it is similar enough,
+    otherwise starts a new template
+
+    Tokens with digits (block IDs, IPs, sizes, thread numbers) are parameters
+    from the start; other tokens become parameters when a template absorbs a
+    message that differs there. Templates are kept in log_templates, which
+    assigns their ids. Runs on the ingesting process only.
+    """
+
+    def __init__(
+        self,
+        depth: int = config.TEMPLATE_MINER_DEPTH,
+        similarity: float = config.TEMPLATE_MINER_SIMILARITY,
+        max_children: int = config.TEMPLATE_MINER_MAX_CHILDREN,
+    ):
+        # The token count level and the leaf count towards the depth, like in Drain
+        self.prefix_tokens = max(depth - 2, 0)
+        self.similarity = similarity
+        self.max_children = max_children
+        self.root: Dict[int, PrefixNode] = {}
+        self.clusters: Dict[int, TemplateCluster] = {}
+        self.lock = asyncio.Lock()
+        self.loaded = False
+        self.lines_mined = 0
+        self.templates_created = 0
+        self.templates_updated = 0
+
+    @staticmethod
+    def tokenize(content: str) -> List[str]:
+        return content.split()
+
+    @staticmethod
+    def params(template_tokens: List[str], tokens: List[str]) -> List[str]:
+        """The message tokens at the template's wildcards"""
+        return [token for template_token, token in zip(template_tokens, tokens) if template_token == WILDCARD]
+
+    def _add_cluster(self, cluster: TemplateCluster):
+        node = self.root.setdefault(len(cluster.tokens), PrefixNode())
+        for token in cluster.tokens[:self.prefix_tokens]:
+            if token not in node.children:
+                if has_digits(token) or len(node.children) >= self.max_children - 1:
+                    # The last child slot is kept for the wildcard branch
+                    token = WILDCARD
+                if token not in node.children:
+                    node.children[token] = PrefixNode()
+            node = node.children[token]
+        node.clusters.append(cluster)
+        self.clusters[cluster.template_id] = cluster
+
+    def _match(self, tokens: List[str]) -> Optional[TemplateCluster]:
+        node = self.root.get(len(tokens))
+        if node is None:
+            return None
+        for token in tokens[:self.prefix_tokens]:
+            node = node.children.get(token) or node.children.get(WILDCARD)
+            if node is None:
+                return None
+
+        best, best_score = None, (-1.0, -1)
+        for cluster in node.clusters:
+            same = wildcards = 0
+            for template_token, token in zip(cluster.tokens, tokens):
+                if template_token == WILDCARD:
+                    wildcards += 1
+                elif template_token == token:
+                    same += 1
+            # Ties go to the template with more parameters
+            score = (same / len(tokens), wildcards)
+            if score > best_score:
+                best, best_score = cluster, score
+        return best if best_score[0] >= self.similarity else None
+
+    async def load(self, db: AsyncSession):
+        result = await db.execute(select(LogTemplate.id, LogTemplate.template).order_by(LogTemplate.id))
+        for template_id, template in result.all():
+            if template_id not in self.clusters:
+                self._add_cluster(TemplateCluster(template_id, self.tokenize(template)))
+        self.loaded = True
+        logger.info(f"Loaded {len(self.clusters)} log templates")
+
+    async def reload(self, db: AsyncSession):
+        """
+        Rebuild the tree from log_templates, e.g. when this worker takes over
+        ingestion and another one has created or widened templates meanwhile
+        """
+        async with self.lock:
+            self.root = {}
+            self.clusters = {}
+            # mine() loads lazily if this fails
+            self.loaded = False
+            await self.load(db)
+
+    async def mine(self, db: AsyncSession, content: str) -> Tuple[Optional[int], List[str]]:
+        """Get the template id and parameters of a message, creating or widening its template"""
+        tokens = self.tokenize(content)
+        if not tokens:
+            return None, []
+
+        async with self.lock:
+            if not self.loaded:
+                await self.load(db)
+
+            cluster = self._match(tokens)
+            if cluster is None:
+                template_tokens = [WILDCARD if has_digits(token) else token for token in tokens]
+                result = await db.execute(
+                    insert(LogTemplate)
+                    .values(template=" ".join(template_tokens))
+                    .returning(LogTemplate.id)
+                )
+                cluster = TemplateCluster(result.scalar_one(), template_tokens)
+                await db.commit()
+                self._add_cluster(cluster)
+                self.templates_created += 1
+            else:
+                merged = [
+                    template_token if template_token == token else WILDCARD
+                    for template_token, token in zip(cluster.tokens, tokens)
+                ]
+                if merged != cluster.tokens:
+                    await db.execute(
+                        update(LogTemplate)
+                        .where(LogTemplate.id == cluster.template_id)
+                        .values(template=" ".join(merged), updated_at=datetime.utcnow())
+                    )
+                    await db.commit()
+                    cluster.tokens = merged
+                    self.templates_updated += 1
+
+            self.lines_mined += 1
+            return cluster.template_id, self.params(cluster.tokens, tokens)
+
+    def stats(self):
+        return {
+            "loaded": self.loaded,
+            "templates": len(self.clusters),
+            "lines_mined": self.lines_mined,
+            "templates_created": self.templates_created,
+            "templates_updated": self.templates_updated
+        }
+
+
+# Shared miner used by the ingestion callbacks
+template_miner = TemplateMiner()
@@ -0,0 +1,165 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import config
+from models import TimeSeriesData
+from services.db_service import DBService
+
+logger = logging.getLogger(__name__)
+
+# Default origin of TimescaleDB's time_bucket, so buckets line up with the database's
+BUCKET_ORIGIN = datetime(2000, 1, 3, tzinfo=timezone.utc)
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """UTC without tzinfo, like the models' DateTime columns, so asyncpg binds it to either column type"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def floor_to_bucket(moment: datetime, interval: timedelta) -> datetime:
+    return BUCKET_ORIGIN + ((moment - BUCKET_ORIGIN) // interval) * interval
+
+
+class IntervalBuckets:
+    """
+    Closed buckets of one interval size
+
+    Every bucket in [covered_from, covered_to) is known: non-empty ones are in
+    `buckets`, missing ones were empty. Buckets never change once closed.
+    """
+
+    def __init__(self, interval_minutes: int):
+        self.interval = timedelta(minutes=interval_minutes)
+        self.buckets: Dict[datetime, Tuple[int, int, int]] = {}
+        self.covered_from: Optional[datetime] = None
+        self.covered_to: Optional[datetime] = None
+
+    def prune(self, oldest: datetime):
+        """Forget buckets that start before `oldest`"""
+        if self.covered_from is None or self.covered_from >= oldest:
+            return
+        for bucket in [bucket for bucket in self.buckets if bucket < oldest]:
+            del self.buckets[bucket]
+        self.covered_from = oldest
+        if self.covered_to < oldest:
+            self.covered_from = self.covered_to = None
+
+
+class TimeSeriesBucketCache:
+    """
+    Serve /api/statistics/time-series from cached closed buckets, querying the
+    database only for buckets that are missing or still open
+    """
+
+    def __init__(
+        self,
+        retention_hours: int = config.TIME_SERIES_CACHE_RETENTION_HOURS,
+        close_grace_seconds: float = config.TIME_SERIES_CACHE_CLOSE_GRACE_SECONDS,
+    ):
+        self.retention = timedelta(hours=retention_hours)
+        # Rows are committed slightly after their timestamp, so a bucket only
+        # counts as closed once this much time has passed since its end
+        self.close_grace = timedelta(seconds=close_grace_seconds)
+        self.intervals: Dict[int, IntervalBuckets] = {}
+        self.db_queries = 0
+        self.buckets_fetched = 0
+        self.buckets_served_from_cache = 0
+
+    async def _fetch(
+        self,
+        db: AsyncSession,
+        interval_minutes: int,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Dict[datetime, Tuple[int, int, int]]:
+        rows = await DBService.get_classification_buckets(db, interval_minutes, naive_utc(start_time), naive_utc(end_time))
+        self.db_queries += 1
+        self.buckets_fetched += len(rows)
+        buckets = {}
+        for row in rows:
+            # A timestamp without time zone column comes back naive, in UTC
+            bucket = row[0] if row[0].tzinfo else row[0].replace(tzinfo=timezone.utc)
+            buckets[bucket] = (int(row[1]), int(row[2]), int(row[3]))
+        return buckets
+
+    async def get_time_series(
+        self,
+        db: AsyncSession,
+        interval_minutes: int = 5,
+        hours: int = 24,
+        fill_gaps: bool = False
+    ) -> List[TimeSeriesData]:
+        """
+        Get the bucketed counts of the last `hours`; with fill_gaps, empty buckets
+        up to the open one are returned as zeros (like time_bucket_gapfill)
+        """
+        series = self.intervals.setdefault(interval_minutes, IntervalBuckets(interval_minutes))
+        interval = series.interval
+
+        now = datetime.now(timezone.utc)
+        first_bucket = floor_to_bucket(now - timedelta(hours=hours), interval)
+        closed_until = floor_to_bucket(now - self.close_grace, interval)
+        series.prune(floor_to_bucket(now - self.retention, interval))
+
+        fetched: Dict[datetime, Tuple[int, int, int]] = {}
+        if series.covered_from is None:
+            fetched.update(await self._fetch(db, interval_minutes, first_bucket, now + interval))
+        else:
+            if first_bucket < series.covered_from:
+                fetched.update(await self._fetch(db, interval_minutes, first_bucket, series.covered_from))
+            # The newest closed buckets plus the open one
+            fetched.update(await self._fetch(db, interval_minutes, series.covered_to, now + interval))
+
+        # Keep newly closed buckets; the open ones are recomputed on every call
+        for bucket, counts in fetched.items():
+            if bucket < closed_until:
+                series.buckets[bucket] = counts
+        fetch_start = first_bucket if series.covered_from is None else min(first_bucket, series.covered_from)
+        series.covered_from = fetch_start
+        series.covered_to = max(closed_until, series.covered_to or closed_until)
+
+        buckets = set(series.buckets) | set(fetched)
+        if fill_gaps:
+            open_bucket = floor_to_bucket(now, interval)
+            buckets.update(first_bucket + interval * index for index in range((open_bucket - first_bucket) // interval + 1))
+
+        result = []
+        for bucket in sorted(buckets):
+            if bucket < first_bucket:
+                continue
+            if bucket in fetched:
+                counts = fetched[bucket]
+            elif bucket in series.buckets:
+                counts = series.buckets[bucket]
+                self.buckets_served_from_cache += 1
+            else:
+                counts = (0, 0, 0)
+            result.append(TimeSeriesData(
+                timestamp=bucket,
+                normal_count=counts[0],
+                anomaly_count=counts[1],
+                unidentified_count=counts[2]
+            ))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "db_queries": self.db_queries,
+            "buckets_fetched": self.buckets_fetched,
+            "buckets_served_from_cache": self.buckets_served_from_cache,
+            "intervals": {
+                interval_minutes: {
+                    "closed_buckets": len(series.buckets),
+                    "covered_from": series.covered_from.isoformat() if series.covered_from else None,
+                    "covered_to": series.covered_to.isoformat() if series.covered_to else None,
+                }
+                for interval_minutes, series in self.intervals.items()
+            },
+        }
+
+
+# Shared cache used by the statistics routes
+time_series_cache = TimeSeriesBucketCache()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from services import block_stats
+from services.block_stats import BlockStatsWriter
+
+
+class FailingSession:
+    """Session whose every statement fails, like a lost database connection"""
+
+    async def execute(self, *args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    async def commit(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def log(block_id: str, minute: int, level: str, component: str):
+    return SimpleNamespace(
+        block_id=block_id, timestamp=datetime(2024, 1, 1, 12, minute),
+        log_level=level, hdfs_component=component
+    )
+
+
+def test_failed_flush_keeps_pending_blocks(monkeypatch):
+    monkeypatch.setattr(block_stats, "AsyncSessionLocal", FailingSession)
+    writer = BlockStatsWriter(max_pending=1000)
+
+    async def scenario():
+        await writer.add(log("blk_1", 10, "INFO", "dfs.DataNode"))
+        await writer.add(log("blk_1", 20, "WARN", "dfs.DataNode"))
+        await writer.add(log("blk_2", 15, "INFO", "dfs.FSNamesystem"))
+        await writer.flush()
+        # Folded into the totals of the failed flush
+        await writer.add(log("blk_1", 5, "ERROR", "dfs.DataNode$PacketResponder"))
+        await writer.add(log("blk_1", 30, "INFO", "dfs.DataNode"))
+        await writer.flush()
+
+    asyncio.run(scenario())
+
+    assert writer.rows_upserted == 0
+    assert set(writer.pending) == {"blk_1", "blk_2"}
+    block = writer.pending["blk_1"]
+    assert block.log_count == 4
+    assert block.first_seen == datetime(2024, 1, 1, 12, 5)
+    assert block.last_seen == datetime(2024, 1, 1, 12, 30)
+    assert block.levels == {"INFO", "WARN", "ERROR"}
+    assert block.components == {"dfs.DataNode", "dfs.DataNode$PacketResponder"}
+    assert writer.pending["blk_2"].log_count == 1
+
+
+def test_failed_flush_merges_with_logs_added_meanwhile(monkeypatch):
+    writer = BlockStatsWriter(max_pending=1000)
+
+    class SlowFailingSession(FailingSession):
+        async def execute(self, *args, **kwargs):
+            # A log of the same block arrives while the flush is in flight
+            await writer.add(log("blk_1", 40, "FATAL", "dfs.DataBlockScanner"))
+            await super().execute(*args, **kwargs)
+
+    monkeypatch.setattr(block_stats, "AsyncSessionLocal", SlowFailingSession)
+
+    async def scenario():
+        await writer.add(log("blk_1", 10, "INFO", "dfs.DataNode"))
+        await writer.flush()
+
+    asyncio.run(scenario())
+
+    block = writer.pending["blk_1"]
+    assert block.log_count == 2
+    assert block.first_seen == datetime(2024, 1, 1, 12, 10)
+    assert block.last_seen == datetime(2024, 1, 1, 12, 40)
+    assert block.levels == {"INFO", "FATAL"}
+    assert block.components == {"dfs.DataNode", "dfs.DataBlockScanner"}
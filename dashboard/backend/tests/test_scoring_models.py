@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from services.scoring_models import pca_baseline, ANOMALY, NORMAL, UNIDENTIFIED
+
+
+def invariant_blocks(seed: int, blocks: int = 400) -> np.ndarray:
+    """Blocks following HDFS-like invariants: col1 == 2 * col0 and col4 == col2 + col3"""
+    rng = np.random.default_rng(seed)
+    col0 = rng.integers(1, 6, blocks)
+    col2 = rng.integers(1, 4, blocks)
+    col3 = rng.integers(0, 3, blocks)
+    return np.stack([col0, 2 * col0, col2, col3, col2 + col3], axis=1).astype(np.uint32)
+
+
+def equal_length_blocks(seed: int, blocks: int = 300, templates: int = 8, logs: int = 10) -> np.ndarray:
+    """Blocks of exactly `logs` logs spread uniformly over the templates"""
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((blocks, templates), dtype=np.uint32)
+    for row in counts:
+        np.add.at(row, rng.integers(0, templates, logs), 1)
+    return counts
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_exact_invariants_are_not_anomalies(seed):
+    assert not np.any(pca_baseline(invariant_blocks(seed)) == ANOMALY)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_equal_log_counts_are_not_anomalies(seed):
+    assert not np.any(pca_baseline(equal_length_blocks(seed)) == ANOMALY)
+
+
+def test_blocks_breaking_an_invariant_are_anomalies():
+    counts = invariant_blocks(0).astype(np.int64)
+    counts[:4, 1] += 7
+    counts[:4, 4] = 0
+    labels = pca_baseline(counts.astype(np.uint32))
+    assert np.flatnonzero(labels == ANOMALY).tolist() == [0, 1, 2, 3]
+
+
+def test_small_batches_and_empty_blocks_are_unidentified():
+    counts = invariant_blocks(0, blocks=20)
+    counts[0] = 0
+    labels = pca_baseline(counts)
+    assert labels[0] == UNIDENTIFIED
+    assert np.all(labels[1:] == NORMAL)
+    assert np.all(pca_baseline(counts[:5]) == UNIDENTIFIED)
@@ -84,6 +84,9 @@ const ChartControlsWrapper = styled(Paper)(({ theme }) => ({
   minHeight: 'auto',
 }));
 
+// Upper bound on points requested from the server for one chart
+const MAX_CHART_POINTS = 500;
+
 const TimeSeriesChart = () => {
   const TIME_OPTIONS = [
     { label: '5M', hours: 1, interval: 1 }, // Use minimum 1 hour for backend compatibility but set interval to 1 min
@@ -117,15 +120,26 @@ const TimeSeriesChart = () => {
       const hours = selectedOption ? selectedOption.hours : 1;
       const interval = selectedOption ? selectedOption.interval : 5;
       
-      // Call the API
-      const data = await fetchTimeSeriesData({ hours, interval });
+      // Call the API; columnar data carries epoch-millisecond timestamps in parallel arrays,
+      // max_points keeps empty intervals as zeros and caps how many points the chart draws
+      const data = await fetchTimeSeriesData({
+        hours,
+        interval_minutes: interval,
+        format: 'columnar',
+        max_points: MAX_CHART_POINTS
+      });
       
       // Process the data for the chart
-      const processedData = data.map(item => ({
-        ...item,
-        timestamp: new Date(item.timestamp),
-        formattedTime: format(new Date(item.timestamp), 'HH:mm')
-      }));
+      const processedData = data.timestamps.map((millis, index) => {
+        const timestamp = new Date(millis);
+        return {
+          timestamp,
+          formattedTime: format(timestamp, 'HH:mm'),
+          normal_count: data.normal_count[index],
+          anomaly_count: data.anomaly_count[index],
+          unidentified_count: data.unidentified_count[index]
+        };
+      });
       
       setTimeSeriesData(processedData);
       setLastUpdate(new Date());
@@ -61,7 +61,7 @@ export const fetchAnomalyParams = async (params) => {
 
 /**
  * Fetch time series data for charting
- * @param {Object} params - Query parameters (e.g. hours, interval_minutes)
+ * @param {Object} params - Query parameters (e.g. hours, interval_minutes, format: 'columnar')
  * @returns {Promise} API response
  */
 export const fetchTimeSeriesData = async (params) => {
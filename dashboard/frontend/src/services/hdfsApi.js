@@ -32,8 +32,8 @@ export const fetchComponentActivity = async (params = {}) => {
   }
 };
 
-// Fetch logs for a specific block ID
-export const fetchBlockLogs = async (blockId, limit = 100) => {
+// Fetch the lifecycle (all logs, oldest first) of a specific block ID
+export const fetchBlockLogs = async (blockId, limit = null) => {
   try {
     const response = await api.get(`/hdfs/logs/${blockId}`, {
       params: { limit }
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Measure block lifecycle lookups on /api/hdfs/logs/{block_id}.
+
+Block IDs are sampled from /api/hdfs/blocks over the requested look-back
+window (older windows exercise the time bounds taken from block_stats, since
+the naive lookup had to probe every hypertable chunk). Each block is then
+looked up sequentially and the latency, status and number of log entries
+returned are recorded.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import aiohttp
+
+# Default API base URL
+DEFAULT_BASE_URL = "http://localhost:8000/api"
+
+
+def percentile(sorted_values, pct: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def sample_block_ids(session: aiohttp.ClientSession, base_url: str, hours: int, blocks: int) -> List[str]:
+    params = {"hours": hours, "limit": blocks}
+    async with session.get(f"{base_url}/hdfs/blocks", params=params) as response:
+        response.raise_for_status()
+        return [block["block_id"] for block in await response.json()]
+
+
+async def run_lookups(session: aiohttp.ClientSession, base_url: str, block_ids: List[str], repeat: int) -> Dict:
+    latencies: List[float] = []
+    log_counts: List[int] = []
+    errors = 0
+    for _ in range(repeat):
+        for block_id in block_ids:
+            started = time.perf_counter()
+            try:
+                async with session.get(f"{base_url}/hdfs/logs/{block_id}") as response:
+                    body = await response.json()
+                    latencies.append(time.perf_counter() - started)
+                    if response.status == 200:
+                        log_counts.append(len(body))
+                    else:
+                        errors += 1
+            except Exception as e:
+                print(f"Request error: {str(e)}")
+                errors += 1
+
+    latencies.sort()
+    return {
+        "lookups": len(latencies),
+        "errors": errors,
+        "mean_logs_per_block": round(sum(log_counts) / len(log_counts), 1) if log_counts else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+            "p50": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "p95": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+            "p99": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        },
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Benchmark HDFS block lifecycle lookups')
+    parser.add_argument('--url', type=str, default=DEFAULT_BASE_URL,
+                        help=f'Base URL for API (default: {DEFAULT_BASE_URL})')
+    parser.add_argument('--hours', type=int, default=24 * 30,
+                        help='Look-back window to sample blocks from (default: 720)')
+    parser.add_argument('--blocks', type=int, default=100, help='Blocks to sample (default: 100)')
+    parser.add_argument('--repeat', type=int, default=5, help='Lookups per block (default: 5)')
+    parser.add_argument('--output-dir', type=str, default='reports',
+                        help='Directory where results will be saved (default: reports)')
+    args = parser.parse_args()
+
+    async with aiohttp.ClientSession() as session:
+        block_ids = await sample_block_ids(session, args.url, args.hours, args.blocks)
+        print(f"Looking up {len(block_ids)} blocks x {args.repeat}")
+        lookups = await run_lookups(session, args.url, block_ids, args.repeat)
+
+    results = {
+        "benchmark": "block_lookup",
+        "started_at": datetime.now().isoformat(),
+        "base_url": args.url,
+        "hours": args.hours,
+        "blocks": len(block_ids),
+        "repeat": args.repeat,
+        **lookups,
+    }
+    print(json.dumps(results, indent=2))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{args.output_dir}/block_lookup_benchmark_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {filename}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nBenchmark interrupted")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Measure what conditional requests and compression save for the dashboard's
+polling pattern.
+
+Each simulated dashboard polls the same REST endpoints the frontend refreshes
+on a timer. The baseline phase sends plain requests (no validators, identity
+encoding); the conditional phase replays the previous ETag in If-None-Match
+and accepts brotli/gzip, like a browser does. Bytes on the wire (compressed
+body size), 304 counts and request latency are recorded per phase.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List
+
+import aiohttp
+
+# Default API base URL
+DEFAULT_BASE_URL = "http://localhost:8000/api"
+
+# Requests the dashboard repeats on every refresh
+POLLED_ENDPOINTS = [
+    ("/logs/", {"limit": 100}),
+    ("/anomalies/", {"classification_type": "anomaly", "limit": 20}),
+    ("/anomalies/", {"classification_type": "unidentified", "limit": 20}),
+    ("/statistics/summary", {}),
+    ("/statistics/time-series", {"hours": 1, "interval_minutes": 5}),
+    ("/statistics/time-series", {"hours": 168, "interval_minutes": 60}),
+]
+
+
+class PhaseCounters:
+    def __init__(self):
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.body_bytes = 0
+        self.latencies: List[float] = []
+
+
+def percentile(sorted_values, pct: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_dashboard(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    conditional: bool,
+    rounds: int,
+    poll_interval: float,
+    counters: PhaseCounters
+):
+    etags: Dict[str, str] = {}
+    for _ in range(rounds):
+        for path, params in POLLED_ENDPOINTS:
+            key = f"{path}?{sorted(params.items())}"
+            headers = {"Accept-Encoding": "br, gzip" if conditional else "identity"}
+            if conditional and key in etags:
+                headers["If-None-Match"] = etags[key]
+
+            started = time.perf_counter()
+            try:
+                async with session.get(f"{base_url}{path}", params=params, headers=headers) as response:
+                    # Not decompressed, so this is what went over the wire
+                    body = await response.read()
+                    counters.latencies.append(time.perf_counter() - started)
+                    counters.requests += 1
+                    counters.body_bytes += len(body)
+                    if response.status == 304:
+                        counters.not_modified += 1
+                    elif response.status != 200:
+                        counters.errors += 1
+                    if conditional and "ETag" in response.headers:
+                        etags[key] = response.headers["ETag"]
+            except Exception as e:
+                print(f"Request error: {str(e)}")
+                counters.errors += 1
+        await asyncio.sleep(poll_interval)
+
+
+async def run_phase(name: str, base_url: str, dashboards: int, rounds: int, poll_interval: float) -> Dict:
+    print(f"Running {name} phase: {dashboards} dashboards x {rounds} rounds")
+    counters = PhaseCounters()
+    start = time.time()
+    async with aiohttp.ClientSession(auto_decompress=False) as session:
+        await asyncio.gather(*[
+            run_dashboard(session, base_url, name == "conditional", rounds, poll_interval, counters)
+            for _ in range(dashboards)
+        ])
+    elapsed = time.time() - start
+
+    latencies = sorted(counters.latencies)
+    result = {
+        "dashboards": dashboards,
+        "rounds": rounds,
+        "duration_seconds": round(elapsed, 2),
+        "requests": counters.requests,
+        "not_modified": counters.not_modified,
+        "errors": counters.errors,
+        "body_bytes": counters.body_bytes,
+        "bytes_per_request": round(counters.body_bytes / counters.requests, 1) if counters.requests else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+            "p50": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "p95": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+            "p99": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        },
+    }
+    print(json.dumps(result, indent=2))
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Benchmark conditional requests and compression for dashboard polling')
+    parser.add_argument('--url', type=str, default=DEFAULT_BASE_URL,
+                        help=f'Base URL for API (default: {DEFAULT_BASE_URL})')
+    parser.add_argument('--dashboards', type=int, default=20, help='Simulated dashboards per phase (default: 20)')
+    parser.add_argument('--rounds', type=int, default=30, help='Polling rounds per dashboard (default: 30)')
+    parser.add_argument('--poll-interval', type=float, default=1.0,
+                        help='Seconds between polling rounds (default: 1.0)')
+    parser.add_argument('--output-dir', type=str, default='reports',
+                        help='Directory where results will be saved (default: reports)')
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "http_polling",
+        "started_at": datetime.now().isoformat(),
+        "base_url": args.url,
+        "endpoints": [{"path": path, "params": params} for path, params in POLLED_ENDPOINTS],
+        "phases": {},
+    }
+    for phase in ("baseline", "conditional"):
+        results["phases"][phase] = await run_phase(phase, args.url, args.dashboards, args.rounds, args.poll_interval)
+
+    baseline, conditional = results["phases"]["baseline"], results["phases"]["conditional"]
+    if baseline["body_bytes"]:
+        results["bytes_saved_ratio"] = round(1 - conditional["body_bytes"] / baseline["body_bytes"], 4)
+    if baseline["latency_ms"]["mean"] and conditional["latency_ms"]["mean"]:
+        results["mean_latency_ratio"] = round(conditional["latency_ms"]["mean"] / baseline["latency_ms"]["mean"], 3)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{args.output_dir}/http_polling_benchmark_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {filename}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nBenchmark interrupted")
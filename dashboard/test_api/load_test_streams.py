@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Load harness for the real-time streams.
+
+Opens thousands of concurrent SSE or WebSocket subscribers to the logs
+stream from one machine while the backend's mock generator ingests at a
+fixed rate, then reports delivery latency percentiles, dropped events and
+server RSS/CPU as a JSON results file.
+
+With --spawn-server the harness starts its own backend (uvicorn) with the
+mock generator configured for --ingest-rate; otherwise it attaches to a
+running backend and samples --server-pid if given. Latency is measured
+against the event timestamps set by the backend, so run the harness on the
+same machine (or with synchronised clocks).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import signal
+import subprocess
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import msgpack
+
+from process_stats import read_process_tree_stats
+
+# Default API base URL
+DEFAULT_BASE_URL = "http://localhost:8000/api"
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+# Events first seen this close to the end of the run are not counted as
+# dropped by subscribers that haven't received them yet
+DELIVERY_GRACE_SECONDS = 5
+
+
+class Subscriber:
+    def __init__(self):
+        self.connected = False
+        self.error = None
+        self.received_ids = set()
+        self.latencies_ms = array('d')
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.subscribers: List[Subscriber] = [Subscriber() for _ in range(args.subscribers)]
+        # Event id -> time it was first received by any subscriber
+        self.first_seen: Dict[int, float] = {}
+        self.measure_start = None
+        self.measure_end = None
+        self.server_samples = []
+        self.server_process = None
+        self.server_pid = args.server_pid
+
+    # Server management
+    def spawn_server(self):
+        interval = max(1.0 / self.args.ingest_rate, 1.0)
+        logs_per_interval = max(1, round(self.args.ingest_rate * interval))
+        env = dict(
+            os.environ,
+            MOCK_DATA_ENABLED="True",
+            MOCK_DATA_INTERVAL_SECONDS=str(interval),
+            MOCK_LOGS_PER_INTERVAL=str(logs_per_interval),
+        )
+        if self.args.workers > 1:
+            # Workers only see each other's events through the Postgres fan-out
+            env.setdefault("FANOUT_BACKEND", "postgres")
+        port = self.args.url.split("://", 1)[1].split("/", 1)[0].rsplit(":", 1)[-1]
+        command = [sys.executable, "-m", "uvicorn", "app:app", "--host", "0.0.0.0",
+                   "--port", port, "--workers", str(self.args.workers), "--log-level", "warning"]
+        print(f"Starting backend: {' '.join(command)} "
+              f"({logs_per_interval} logs every {interval:g}s)")
+        self.server_process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+        self.server_pid = self.server_process.pid
+
+    def stop_server(self):
+        if self.server_process and self.server_process.poll() is None:
+            self.server_process.send_signal(signal.SIGINT)
+            try:
+                self.server_process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.server_process.kill()
+
+    async def wait_for_server(self, session: aiohttp.ClientSession):
+        health_url = self.args.url.rsplit("/api", 1)[0] + "/health"
+        for _ in range(60):
+            try:
+                async with session.get(health_url) as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(1)
+        raise RuntimeError(f"Backend did not become healthy at {health_url}")
+
+    async def sample_server(self):
+        while True:
+            stats = read_process_tree_stats(self.server_pid)
+            if stats:
+                self.server_samples.append((time.time(), stats))
+            await asyncio.sleep(1)
+
+    # Event handling
+    def record_event(self, subscriber: Subscriber, data: dict):
+        now = time.time()
+        if self.measure_start is None or now < self.measure_start:
+            return
+        event_id = data.get("id")
+        if event_id is None:
+            return
+
+        subscriber.received_ids.add(event_id)
+        self.first_seen.setdefault(event_id, now)
+
+        # Event timestamps are UTC; naive values come from datetime.utcnow
+        event_time = datetime.fromisoformat(data["timestamp"])
+        if event_time.tzinfo is None:
+            event_time = event_time.replace(tzinfo=timezone.utc)
+        subscriber.latencies_ms.append((now - event_time.timestamp()) * 1000)
+
+    async def run_sse_subscriber(self, session: aiohttp.ClientSession, subscriber: Subscriber):
+        url = f"{self.args.url}/{self.args.stream}/stream"
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    subscriber.error = f"HTTP {response.status}"
+                    return
+                subscriber.connected = True
+                buffer = b""
+                async for chunk in response.content.iter_any():
+                    # sse-starlette separates lines with CRLF by default
+                    buffer += chunk.replace(b"\r\n", b"\n")
+                    while b"\n\n" in buffer:
+                        event, buffer = buffer.split(b"\n\n", 1)
+                        event_type, payload = None, None
+                        for line in event.split(b"\n"):
+                            if line.startswith(b"event:"):
+                                event_type = line[6:].strip()
+                            elif line.startswith(b"data:"):
+                                payload = line[5:].strip()
+                        if payload and event_type not in (None, b"ping"):
+                            self.record_event(subscriber, json.loads(payload))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            subscriber.error = str(e)
+
+    async def run_ws_subscriber(self, session: aiohttp.ClientSession, subscriber: Subscriber):
+        url = f"{self.args.url}/stream/ws?channels={self.args.stream}"
+        url = url.replace("http://", "ws://").replace("https://", "wss://")
+        try:
+            async with session.ws_connect(url, heartbeat=None) as ws:
+                subscriber.connected = True
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.BINARY:
+                        break
+                    channel, data = msgpack.unpackb(msg.data, raw=False)
+                    if channel == self.args.stream:
+                        self.record_event(subscriber, data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            subscriber.error = str(e)
+
+    async def run(self) -> Dict:
+        raise_fd_limit()
+        if self.args.spawn_server:
+            self.spawn_server()
+
+        connector = aiohttp.TCPConnector(limit=0, force_close=False)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30)
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                await self.wait_for_server(session)
+                sampler = asyncio.create_task(self.sample_server())
+                run_subscriber = self.run_ws_subscriber if self.args.transport == "ws" else self.run_sse_subscriber
+
+                print(f"Opening {len(self.subscribers)} {self.args.transport} subscribers to '{self.args.stream}'")
+                tasks = []
+                for i, subscriber in enumerate(self.subscribers):
+                    tasks.append(asyncio.create_task(run_subscriber(session, subscriber)))
+                    # Ramp up in batches so the accept queue isn't flooded
+                    if (i + 1) % self.args.ramp_batch == 0:
+                        await asyncio.sleep(0.1)
+
+                await asyncio.sleep(self.args.warmup)
+                connected = sum(1 for s in self.subscribers if s.connected)
+                print(f"{connected} subscribers connected, measuring for {self.args.duration}s")
+
+                baseline = read_process_tree_stats(self.server_pid)
+                self.measure_start = time.time()
+                await asyncio.sleep(self.args.duration)
+                self.measure_end = time.time()
+                final = read_process_tree_stats(self.server_pid)
+
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                sampler.cancel()
+        finally:
+            self.stop_server()
+
+        return self.build_results(baseline, final)
+
+    def build_results(self, baseline: Optional[Dict], final: Optional[Dict]) -> Dict:
+        duration = self.measure_end - self.measure_start
+        cutoff = self.measure_end - DELIVERY_GRACE_SECONDS
+        expected_ids = {event_id for event_id, seen in self.first_seen.items() if seen <= cutoff}
+
+        connected = [s for s in self.subscribers if s.connected]
+        dropped = sum(len(expected_ids - s.received_ids) for s in connected)
+        expected_deliveries = len(expected_ids) * len(connected)
+
+        latencies = sorted(value for s in connected for value in s.latencies_ms)
+
+        errors: Dict[str, int] = {}
+        for s in self.subscribers:
+            if s.error:
+                errors[s.error] = errors.get(s.error, 0) + 1
+
+        window = [stats for sampled_at, stats in self.server_samples
+                  if self.measure_start <= sampled_at <= self.measure_end]
+        server = None
+        if baseline and final:
+            cpu_seconds = final["cpu_seconds"] - baseline["cpu_seconds"]
+            server = {
+                "pid": self.server_pid,
+                "cpu_seconds": round(cpu_seconds, 3),
+                "cpu_percent": round(cpu_seconds / duration * 100, 1),
+                "rss_bytes_start": baseline["rss_bytes"],
+                "rss_bytes_end": final["rss_bytes"],
+                "rss_bytes_peak": max([stats["rss_bytes"] for stats in window] + [final["rss_bytes"]]),
+            }
+
+        return {
+            "benchmark": "stream_load",
+            "started_at": datetime.fromtimestamp(self.measure_start).isoformat(),
+            "config": {
+                "base_url": self.args.url,
+                "transport": self.args.transport,
+                "stream": self.args.stream,
+                "subscribers": self.args.subscribers,
+                "target_ingest_rate": self.args.ingest_rate if self.args.spawn_server else None,
+                "workers": self.args.workers if self.args.spawn_server else None,
+                "duration_seconds": self.args.duration,
+            },
+            "subscribers": {
+                "connected": len(connected),
+                "failed": len(self.subscribers) - len(connected),
+                "errors": errors,
+            },
+            "events": {
+                "unique": len(self.first_seen),
+                "observed_ingest_rate": round(len(self.first_seen) / duration, 2),
+                "expected_deliveries": expected_deliveries,
+                "dropped": dropped,
+                "drop_rate": round(dropped / expected_deliveries, 6) if expected_deliveries else None,
+            },
+            "latency_ms": {
+                "samples": len(latencies),
+                "min": round(latencies[0], 2) if latencies else None,
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "p999": percentile(latencies, 99.9),
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+            "server": server,
+        }
+
+
+def percentile(sorted_values, pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 2)
+
+
+def raise_fd_limit():
+    """Each subscriber holds a socket, so lift the soft open-file limit to the hard limit"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Load test the SSE and WebSocket streams')
+    parser.add_argument('--url', type=str, default=DEFAULT_BASE_URL,
+                        help=f'Base URL for API (default: {DEFAULT_BASE_URL})')
+    parser.add_argument('--transport', choices=['sse', 'ws'], default='sse', help='Subscriber transport (default: sse)')
+    parser.add_argument('--stream', choices=['logs', 'anomalies'], default='logs',
+                        help='Stream to subscribe to (default: logs)')
+    parser.add_argument('--subscribers', type=int, default=1000, help='Concurrent subscribers (default: 1000)')
+    parser.add_argument('--duration', type=int, default=60, help='Measurement window in seconds (default: 60)')
+    parser.add_argument('--warmup', type=int, default=10, help='Seconds to wait after connecting (default: 10)')
+    parser.add_argument('--ramp-batch', type=int, default=200, help='Subscribers opened per 100ms (default: 200)')
+    parser.add_argument('--spawn-server', action='store_true', help='Start a local backend with the mock generator')
+    parser.add_argument('--ingest-rate', type=float, default=10, help='Log entries per second for --spawn-server (default: 10)')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn workers for --spawn-server (default: 1)')
+    parser.add_argument('--server-pid', type=int, default=None,
+                        help='PID of an already running local backend to sample RSS/CPU from')
+    parser.add_argument('--output-dir', type=str, default='reports',
+                        help='Directory where results will be saved (default: reports)')
+    args = parser.parse_args()
+
+    results = await LoadTest(args).run()
+    print(json.dumps(results, indent=2))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{args.output_dir}/stream_load_{args.transport}_{args.subscribers}_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Load test results saved to {filename}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nLoad test interrupted")
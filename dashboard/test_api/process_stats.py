@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Helpers for sampling CPU time and memory of a local server process via /proc"""
+
+import os
+from typing import Dict, List, Optional
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def read_process_stats(pid: Optional[int]) -> Optional[Dict[str, float]]:
+    """
+    Return the cumulative CPU seconds (user + system) and current RSS in bytes
+    of a process, or None when the process can't be inspected (e.g. the
+    server runs in another container or host)
+    """
+    if not pid:
+        return None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # The command name may contain spaces, so split after the closing paren
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    # Index 0 here is field 3 (state) in proc(5), so utime and stime are fields 14 and 15
+    utime = int(fields[11])
+    stime = int(fields[12])
+    return {
+        "cpu_seconds": (utime + stime) / CLOCK_TICKS,
+        "rss_bytes": rss_pages * PAGE_SIZE,
+    }
+
+
+def cpu_seconds_between(before: Optional[Dict[str, float]], after: Optional[Dict[str, float]]) -> Optional[float]:
+    if not before or not after:
+        return None
+    return round(after["cpu_seconds"] - before["cpu_seconds"], 3)
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process, e.g. the workers of a uvicorn master"""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return children
+
+
+def read_process_tree_stats(pid: Optional[int]) -> Optional[Dict[str, float]]:
+    """Sum CPU seconds and RSS over a process and its direct children"""
+    total = read_process_stats(pid)
+    if not total:
+        return None
+    for child in child_pids(pid):
+        stats = read_process_stats(child)
+        if stats:
+            total["cpu_seconds"] += stats["cpu_seconds"]
+            total["rss_bytes"] += stats["rss_bytes"]
+    return total
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Compare the two read paths of /api/logs/ at 100, 1,000 and 10,000 rows.
+
+- orm_pydantic: load LogEntry ORM objects, validate each into a
+  LogEntryResponse, run jsonable_encoder and json.dumps (what FastAPI does
+  for a route returning ORM objects with response_model)
+- core_fast_json: load plain Core row tuples and encode them directly with
+  services.serialization.dump_rows (orjson when installed)
+
+Rows are inserted into a scratch SQLite database by default so the
+benchmark runs anywhere; pass --database-url to time against a real
+database that already contains at least the largest row count.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import ARRAY, create_engine, desc, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from models import LogEntry, LogEntryResponse, LogLevel, HdfsComponent
+from services.labels import log_levels, hdfs_components
+from services.serialization import LOG_ENTRY_FIELDS, dump_rows, orjson
+
+ROW_COUNTS = [100, 1000, 10000]
+
+
+@compiles(ARRAY, "sqlite")
+def compile_array_for_sqlite(type_, compiler, **kw):
+    # log_entries.template_params is a PostgreSQL array; the scratch rows leave it empty
+    return "TEXT"
+
+
+def load_labels(engine):
+    """Fill the level/component caches the LabelId columns encode and decode with"""
+    with Session(engine) as session:
+        for registry in (log_levels, hdfs_components):
+            registry.remember(session.execute(select(registry.model.id, registry.model.name)).all())
+
+
+def seed_rows(engine, count: int):
+    for model in (LogLevel, HdfsComponent, LogEntry):
+        model.__table__.create(engine, checkfirst=True)
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        # Level and component are stored as lookup table ids
+        for model, name in ((LogLevel, "INFO"), (HdfsComponent, "dfs.DataNode$PacketResponder")):
+            if not session.execute(select(model).where(model.name == name)).first():
+                session.add(model(id=1, name=name))
+        session.commit()
+    load_labels(engine)
+    with Session(engine) as session:
+        session.add_all([
+            LogEntry(
+                timestamp=now - timedelta(milliseconds=index),
+                message=f"081109 203615 {148 + index % 50} INFO dfs.DataNode$PacketResponder: "
+                        f"PacketResponder 1 for block blk_{38865049064139660 + index} terminating",
+                log_level="INFO",
+                hdfs_date="081109",
+                hdfs_time="203615",
+                thread_id=148 + index % 50,
+                hdfs_component="dfs.DataNode$PacketResponder",
+                block_id=f"blk_{38865049064139660 + index}",
+            )
+            for index in range(count)
+        ])
+        session.commit()
+
+
+def orm_pydantic(engine, limit: int) -> bytes:
+    with Session(engine) as session:
+        logs = session.execute(
+            select(LogEntry).order_by(desc(LogEntry.timestamp)).limit(limit)
+        ).scalars().all()
+        models = [LogEntryResponse.from_orm(log) for log in logs]
+    return json.dumps(jsonable_encoder(models), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def core_fast_json(engine, limit: int) -> bytes:
+    columns = tuple(getattr(LogEntry, field) for field in LOG_ENTRY_FIELDS)
+    with Session(engine) as session:
+        rows = session.execute(
+            select(*columns).order_by(desc(LogEntry.timestamp)).limit(limit)
+        ).all()
+    return dump_rows(rows, LOG_ENTRY_FIELDS)
+
+
+def time_path(path, engine, limit: int, repeat: int):
+    # One warm-up run so statement compilation isn't counted
+    body = path(engine, limit)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        path(engine, limit)
+        timings.append(time.perf_counter() - started)
+    return body, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ORM/Pydantic and Core/fast JSON read paths')
+    parser.add_argument('--database-url', type=str, default=None,
+                        help='Database with existing log entries (default: scratch SQLite file)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per row count (default: 20)')
+    parser.add_argument('--output-dir', type=str, default='reports',
+                        help='Directory where results will be saved (default: reports)')
+    args = parser.parse_args()
+
+    scratch_path = None
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        load_labels(engine)
+    else:
+        scratch_path = os.path.join(args.output_dir, "serialization_benchmark.sqlite")
+        os.makedirs(args.output_dir, exist_ok=True)
+        if os.path.exists(scratch_path):
+            os.remove(scratch_path)
+        engine = create_engine(f"sqlite:///{scratch_path}")
+        seed_rows(engine, max(ROW_COUNTS))
+
+    results = {
+        "benchmark": "log_serialization",
+        "started_at": datetime.now().isoformat(),
+        "database": engine.url.render_as_string(hide_password=True),
+        "json_encoder": "orjson" if orjson is not None else "json",
+        "row_counts": {},
+    }
+    try:
+        for limit in ROW_COUNTS:
+            orm_body, orm_timings = time_path(orm_pydantic, engine, limit, args.repeat)
+            core_body, core_timings = time_path(core_fast_json, engine, limit, args.repeat)
+            orm_ms = statistics.median(orm_timings) * 1000
+            core_ms = statistics.median(core_timings) * 1000
+            results["row_counts"][limit] = {
+                "rows": len(json.loads(core_body)),
+                "same_payload": json.loads(orm_body) == json.loads(core_body),
+                "orm_pydantic_ms": round(orm_ms, 3),
+                "core_fast_json_ms": round(core_ms, 3),
+                "speedup": round(orm_ms / core_ms, 2) if core_ms else None,
+                "bytes": len(core_body),
+            }
+            print(f"{limit:>6} rows: orm_pydantic {orm_ms:8.2f} ms  core_fast_json {core_ms:8.2f} ms  "
+                  f"speedup x{orm_ms / core_ms:.2f}")
+    finally:
+        engine.dispose()
+        if scratch_path and os.path.exists(scratch_path):
+            os.remove(scratch_path)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{args.output_dir}/serialization_benchmark_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Measure what the compact log_entries layout saves on disk.
+
+Two scratch tables are filled with the same synthetic HDFS log rows:
+
+- text: block_id, log_level and hdfs_component as strings (the old layout)
+- compact: block_id as BIGINT, log_level and hdfs_component as SMALLINT ids
+  into lookup tables (the current layout)
+
+Both get the indexes log_entries has, then heap size, per-index size and
+average row width (pg_column_size) are compared. The tables live in a
+scratch schema that is dropped afterwards. With --live, the current
+log_entries hypertable sizes are reported too.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict
+
+import psycopg2
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+SCHEMA = "storage_benchmark"
+
+SETUP_SQL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+
+CREATE TABLE {SCHEMA}.log_levels (id SMALLINT PRIMARY KEY, name VARCHAR(20) NOT NULL UNIQUE);
+CREATE TABLE {SCHEMA}.hdfs_components (id SMALLINT PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE);
+INSERT INTO {SCHEMA}.log_levels
+SELECT ordinality, name FROM unnest(ARRAY['INFO', 'WARNING', 'ERROR', 'CRITICAL']) WITH ORDINALITY AS t(name);
+INSERT INTO {SCHEMA}.hdfs_components
+SELECT ordinality, name FROM unnest(ARRAY[
+    'dfs.DataNode$PacketResponder', 'dfs.FSNamesystem', 'dfs.DataNode$DataXceiver',
+    'dfs.DataBlockScanner', 'namenode.NameNode', 'dfs.DataNode'
+]) WITH ORDINALITY AS t(name);
+
+CREATE TABLE {SCHEMA}.text_layout (
+  id SERIAL,
+  timestamp TIMESTAMPTZ NOT NULL,
+  message TEXT NOT NULL,
+  log_level TEXT NOT NULL,
+  hdfs_date CHAR(6),
+  hdfs_time CHAR(6),
+  thread_id INTEGER,
+  hdfs_component TEXT,
+  block_id TEXT,
+  PRIMARY KEY (id, timestamp)
+);
+
+CREATE TABLE {SCHEMA}.compact_layout (
+  id SERIAL,
+  timestamp TIMESTAMPTZ NOT NULL,
+  message TEXT NOT NULL,
+  log_level_id SMALLINT NOT NULL REFERENCES {SCHEMA}.log_levels (id),
+  hdfs_date CHAR(6),
+  hdfs_time CHAR(6),
+  thread_id INTEGER,
+  hdfs_component_id SMALLINT REFERENCES {SCHEMA}.hdfs_components (id),
+  block_id BIGINT,
+  PRIMARY KEY (id, timestamp)
+);
+"""
+
+# Synthetic rows shaped like the mock generator's: 19-digit signed block IDs,
+# level and component drawn from the lookup tables
+FILL_SQL = f"""
+INSERT INTO {SCHEMA}.text_layout
+    (timestamp, message, log_level, hdfs_date, hdfs_time, thread_id, hdfs_component, block_id)
+SELECT
+    now() - g.n * INTERVAL '10 milliseconds',
+    '081109 203615 ' || mod(g.n, 500) || ' ' || l.name || ' ' || c.name
+        || ': PacketResponder 1 for block blk_' || g.block || ' terminating',
+    l.name, '081109', '203615', mod(g.n, 500), c.name, 'blk_' || g.block
+FROM (
+    SELECT n, ((random() * 2 - 1) * 9.2e18)::bigint AS block
+    FROM generate_series(1, %(rows)s) AS n
+) g
+JOIN {SCHEMA}.log_levels l ON l.id = 1 + mod(g.n, 4)
+JOIN {SCHEMA}.hdfs_components c ON c.id = 1 + mod(g.n, 6);
+
+INSERT INTO {SCHEMA}.compact_layout
+    (id, timestamp, message, log_level_id, hdfs_date, hdfs_time, thread_id, hdfs_component_id, block_id)
+SELECT
+    t.id, t.timestamp, t.message, l.id, t.hdfs_date, t.hdfs_time, t.thread_id, c.id,
+    substring(t.block_id FROM 5)::bigint
+FROM {SCHEMA}.text_layout t
+JOIN {SCHEMA}.log_levels l ON l.name = t.log_level
+LEFT JOIN {SCHEMA}.hdfs_components c ON c.name = t.hdfs_component;
+
+CREATE INDEX text_level_idx ON {SCHEMA}.text_layout (log_level, timestamp DESC);
+CREATE INDEX text_component_idx ON {SCHEMA}.text_layout (hdfs_component, timestamp DESC);
+CREATE INDEX text_block_idx ON {SCHEMA}.text_layout (block_id, timestamp DESC);
+CREATE INDEX compact_level_idx ON {SCHEMA}.compact_layout (log_level_id, timestamp DESC);
+CREATE INDEX compact_component_idx ON {SCHEMA}.compact_layout (hdfs_component_id, timestamp DESC);
+CREATE INDEX compact_block_idx ON {SCHEMA}.compact_layout (block_id, timestamp DESC);
+
+VACUUM ANALYZE {SCHEMA}.text_layout;
+VACUUM ANALYZE {SCHEMA}.compact_layout;
+"""
+
+
+def table_sizes(cur, table: str) -> Dict:
+    qualified = f"{SCHEMA}.{table}"
+    cur.execute(f"""
+        SELECT pg_relation_size(%(t)s), pg_indexes_size(%(t)s), pg_total_relation_size(%(t)s),
+               (SELECT avg(pg_column_size(r.*)) FROM {qualified} r)
+    """, {"t": qualified})
+    heap, indexes, total, row_width = cur.fetchone()
+    cur.execute("""
+        SELECT indexrelid::regclass::text, pg_relation_size(indexrelid)
+        FROM pg_index WHERE indrelid = %(t)s::regclass ORDER BY 1
+    """, {"t": qualified})
+    return {
+        "heap_bytes": heap,
+        "index_bytes": indexes,
+        "total_bytes": total,
+        "avg_row_bytes": round(float(row_width), 1),
+        "indexes": {name.split(".")[-1]: size for name, size in cur.fetchall()},
+    }
+
+
+def live_sizes(cur) -> Dict:
+    cur.execute("SELECT table_bytes, index_bytes, total_bytes FROM hypertable_detailed_size('log_entries')")
+    table_bytes, index_bytes, total_bytes = cur.fetchone()
+    cur.execute("SELECT count(*) FROM log_entries")
+    rows = cur.fetchone()[0]
+    return {
+        "rows": rows,
+        "table_bytes": table_bytes,
+        "index_bytes": index_bytes,
+        "total_bytes": total_bytes,
+        "bytes_per_row": round(total_bytes / rows, 1) if rows else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare log_entries storage for the text and compact layouts')
+    parser.add_argument('--rows', type=int, default=1000000, help='Synthetic rows per table (default: 1000000)')
+    parser.add_argument('--live', action='store_true', help='Also report the sizes of the live log_entries table')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch schema for inspection')
+    parser.add_argument('--output-dir', type=str, default='reports',
+                        help='Directory where results will be saved (default: reports)')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(
+        dbname=config.DB_NAME,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        host=config.DB_HOST,
+        port=config.DB_PORT
+    )
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    print(f"Filling both layouts with {args.rows} rows...")
+    cur.execute(SETUP_SQL)
+    for statement in FILL_SQL.split(";"):
+        if statement.strip():
+            cur.execute(statement, {"rows": args.rows})
+
+    results = {
+        "benchmark": "storage_layout",
+        "started_at": datetime.now().isoformat(),
+        "rows": args.rows,
+        "text": table_sizes(cur, "text_layout"),
+        "compact": table_sizes(cur, "compact_layout"),
+    }
+    text_layout, compact = results["text"], results["compact"]
+    results["savings"] = {
+        key: round(1 - compact[key] / text_layout[key], 4)
+        for key in ("heap_bytes", "index_bytes", "total_bytes", "avg_row_bytes")
+    }
+    results["index_savings"] = {
+        kind: round(1 - compact["indexes"][f"compact_{kind}_idx"] / text_layout["indexes"][f"text_{kind}_idx"], 4)
+        for kind in ("level", "component", "block")
+    }
+    if args.live:
+        results["live_log_entries"] = live_sizes(cur)
+
+    if not args.keep:
+        cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    conn.close()
+
+    print(json.dumps(results, indent=2))
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{args.output_dir}/storage_layout_benchmark_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
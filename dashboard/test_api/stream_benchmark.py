@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Compare the SSE endpoints with the multiplexed WebSocket endpoint.
+
+Each phase opens the same number of simulated dashboards against a running
+backend: the SSE phase opens one connection per stream (logs, statistics,
+anomalies), the WebSocket phase opens a single socket subscribed to all three
+channels. Bytes received and event counts are recorded per phase, and if the
+server runs on this machine (--server-pid) its CPU time is sampled too.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import aiohttp
+import msgpack
+
+from process_stats import read_process_stats, cpu_seconds_between
+
+# Default API base URL
+DEFAULT_BASE_URL = "http://localhost:8000/api"
+
+SSE_ENDPOINTS = ["/logs/stream", "/statistics/stream", "/anomalies/stream"]
+WS_CHANNELS = ["logs", "statistics", "anomalies"]
+
+
+def websocket_frame_overhead(payload_length: int) -> int:
+    """Bytes a server-to-client WebSocket frame header adds (unmasked)"""
+    if payload_length < 126:
+        return 2
+    if payload_length < 65536:
+        return 4
+    return 10
+
+
+class PhaseCounters:
+    def __init__(self):
+        self.bytes_received = 0
+        self.events = 0
+        self.pings = 0
+        self.connections = 0
+        self.errors = 0
+
+
+async def run_sse_client(session: aiohttp.ClientSession, url: str, counters: PhaseCounters, deadline: float):
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                counters.errors += 1
+                return
+            counters.connections += 1
+            buffer = b""
+            while time.time() < deadline:
+                try:
+                    chunk = await asyncio.wait_for(response.content.readany(), timeout=max(0.1, deadline - time.time()))
+                except asyncio.TimeoutError:
+                    break
+                if not chunk:
+                    break
+                counters.bytes_received += len(chunk)
+                # sse-starlette separates lines with CRLF by default
+                buffer += chunk.replace(b"\r\n", b"\n")
+                while b"\n\n" in buffer:
+                    event, buffer = buffer.split(b"\n\n", 1)
+                    # Skip comment-only keepalives that sse-starlette sends on its own
+                    lines = [line for line in event.splitlines() if line and not line.startswith(b":")]
+                    if not lines:
+                        counters.pings += 1
+                    elif any(line.replace(b" ", b"") == b"event:ping" for line in lines):
+                        counters.pings += 1
+                    else:
+                        counters.events += 1
+    except Exception as e:
+        print(f"SSE client error: {str(e)}")
+        counters.errors += 1
+
+
+async def run_ws_client(session: aiohttp.ClientSession, url: str, counters: PhaseCounters, deadline: float):
+    try:
+        async with session.ws_connect(f"{url}?channels={','.join(WS_CHANNELS)}") as ws:
+            counters.connections += 1
+            while time.time() < deadline:
+                try:
+                    msg = await ws.receive(timeout=max(0.1, deadline - time.time()))
+                except asyncio.TimeoutError:
+                    break
+                if msg.type != aiohttp.WSMsgType.BINARY:
+                    break
+                counters.bytes_received += len(msg.data) + websocket_frame_overhead(len(msg.data))
+                channel, _ = msgpack.unpackb(msg.data, raw=False)
+                if channel == "ping":
+                    counters.pings += 1
+                elif channel in WS_CHANNELS:
+                    counters.events += 1
+    except Exception as e:
+        print(f"WebSocket client error: {str(e)}")
+        counters.errors += 1
+
+
+async def run_phase(name: str, base_url: str, clients: int, duration: int, server_pid: Optional[int]) -> Dict:
+    counters = PhaseCounters()
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None)
+
+    print(f"Running {name} phase: {clients} dashboards for {duration}s")
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        stats_before = read_process_stats(server_pid)
+        start = time.time()
+        deadline = start + duration
+
+        tasks = []
+        for _ in range(clients):
+            if name == "sse":
+                for endpoint in SSE_ENDPOINTS:
+                    tasks.append(run_sse_client(session, f"{base_url}{endpoint}", counters, deadline))
+            else:
+                ws_url = f"{base_url}/stream/ws".replace("http://", "ws://").replace("https://", "wss://")
+                tasks.append(run_ws_client(session, ws_url, counters, deadline))
+        await asyncio.gather(*tasks)
+
+        elapsed = time.time() - start
+        stats_after = read_process_stats(server_pid)
+
+    server_cpu = cpu_seconds_between(stats_before, stats_after)
+    result = {
+        "dashboards": clients,
+        "connections": counters.connections,
+        "errors": counters.errors,
+        "duration_seconds": round(elapsed, 2),
+        "events": counters.events,
+        "pings": counters.pings,
+        "bytes_received": counters.bytes_received,
+        "bytes_per_event": round(counters.bytes_received / counters.events, 1) if counters.events else None,
+        "server_cpu_seconds": server_cpu,
+        "server_cpu_ms_per_event": round(server_cpu * 1000 / counters.events, 3) if server_cpu is not None and counters.events else None,
+    }
+    print(json.dumps(result, indent=2))
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Compare SSE and WebSocket streaming cost')
+    parser.add_argument('--url', type=str, default=DEFAULT_BASE_URL,
+                        help=f'Base URL for API (default: {DEFAULT_BASE_URL})')
+    parser.add_argument('--clients', type=int, default=50, help='Simulated dashboards per phase (default: 50)')
+    parser.add_argument('--duration', type=int, default=60, help='Seconds per phase (default: 60)')
+    parser.add_argument('--server-pid', type=int, default=None,
+                        help='PID of a local backend process to sample CPU time from')
+    parser.add_argument('--output-dir', type=str, default='reports',
+                        help='Directory where results will be saved (default: reports)')
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "stream_transport",
+        "started_at": datetime.now().isoformat(),
+        "base_url": args.url,
+        "phases": {},
+    }
+    results["phases"]["sse"] = await run_phase("sse", args.url, args.clients, args.duration, args.server_pid)
+    results["phases"]["websocket"] = await run_phase("websocket", args.url, args.clients, args.duration, args.server_pid)
+
+    sse, ws = results["phases"]["sse"], results["phases"]["websocket"]
+    if sse["bytes_per_event"] and ws["bytes_per_event"]:
+        results["websocket_bytes_per_event_ratio"] = round(ws["bytes_per_event"] / sse["bytes_per_event"], 3)
+    if sse["server_cpu_ms_per_event"] and ws["server_cpu_ms_per_event"]:
+        results["websocket_cpu_per_event_ratio"] = round(ws["server_cpu_ms_per_event"] / sse["server_cpu_ms_per_event"], 3)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{args.output_dir}/stream_benchmark_{timestamp}.json"
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {filename}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nBenchmark interrupted")
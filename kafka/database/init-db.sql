@@ -1,22 +1,47 @@
 -- Initialize the TimescaleDB extension
 CREATE EXTENSION IF NOT EXISTS timescaledb CASCADE;
 
+-- Lookup tables giving log levels and HDFS components small ids; log_entries
+-- stores the ids and they are the bit positions in block_stats
+CREATE TABLE log_levels (
+  id SMALLSERIAL PRIMARY KEY,
+  name VARCHAR(20) NOT NULL UNIQUE
+);
+
+CREATE TABLE hdfs_components (
+  id SMALLSERIAL PRIMARY KEY,
+  name VARCHAR(255) NOT NULL UNIQUE
+);
+
+-- Log templates mined at ingestion, e.g. "PacketResponder <*> for block <*> terminating"
+CREATE TABLE log_templates (
+  id SERIAL PRIMARY KEY,
+  template TEXT NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
 -- Create the log_entries table for storing HDFS logs
 CREATE TABLE log_entries (
   id SERIAL,
   timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
   message TEXT NOT NULL,
-  log_level TEXT NOT NULL,
+  log_level_id SMALLINT NOT NULL REFERENCES log_levels (id),
   hdfs_date CHAR(6),           -- YYMMDD format
   hdfs_time CHAR(6),           -- HHMMSS format
   thread_id INTEGER,           -- Thread ID from HDFS log
-  hdfs_component TEXT,         -- HDFS component name
-  block_id TEXT,               -- HDFS block ID (if present)
-  PRIMARY KEY (id, timestamp)  -- Modified: timestamp is now part of the primary key
+  hdfs_component_id SMALLINT REFERENCES hdfs_components (id),
+  block_id BIGINT,             -- HDFS block ID without the blk_ prefix (if present)
+  event_time TIMESTAMPTZ NOT NULL DEFAULT NOW(),  -- HDFS event time (ingest time if the message has none)
+  template_id INTEGER REFERENCES log_templates (id),
+  template_params TEXT[],      -- Message values at the template's <*> wildcards
+  PRIMARY KEY (id, timestamp, event_time)  -- Both partitioning columns must be in the primary key
 );
 
--- Convert log_entries to a hypertable
+-- Convert log_entries to a hypertable partitioned on ingest time and on event time,
+-- so ranges on either skip the chunks outside them
 SELECT create_hypertable('log_entries', 'timestamp');
+SELECT add_dimension('log_entries', 'event_time', chunk_time_interval => INTERVAL '7 days');
 
 -- Create the classifications table for counts of normal, anomaly, and unidentified items
 CREATE TABLE classifications (
@@ -43,14 +68,63 @@ CREATE TABLE anomaly_params (
 -- Convert anomaly_params to a hypertable
 SELECT create_hypertable('anomaly_params', 'timestamp');
 
+-- Spikes in the anomaly / unidentified rates flagged by the backend's streaming detector
+CREATE TABLE spike_alerts (
+  id SERIAL,
+  timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  series VARCHAR(32) NOT NULL,    -- "anomaly_rate" or "unidentified_rate"
+  value DOUBLE PRECISION NOT NULL,
+  expected DOUBLE PRECISION NOT NULL,
+  z_score DOUBLE PRECISION NOT NULL,
+  event_count INTEGER NOT NULL,
+  PRIMARY KEY (id, timestamp)
+);
+
+-- Convert spike_alerts to a hypertable
+SELECT create_hypertable('spike_alerts', 'timestamp');
+
+-- Per-block rollup upserted by the ingesting process
+CREATE TABLE block_stats (
+  block_id BIGINT PRIMARY KEY,
+  log_count BIGINT NOT NULL DEFAULT 0,
+  first_seen TIMESTAMPTZ NOT NULL,
+  last_seen TIMESTAMPTZ NOT NULL,
+  level_bits BIGINT NOT NULL DEFAULT 0,      -- bit (id - 1) set for each log_levels id seen
+  component_bits BIGINT NOT NULL DEFAULT 0   -- bit (id - 1) set for each hdfs_components id seen
+);
+
 -- Create indexes for better query performance
-CREATE INDEX ON log_entries (log_level, timestamp DESC);
-CREATE INDEX ON log_entries (hdfs_component, timestamp DESC);
+CREATE INDEX ON log_entries (log_level_id, timestamp DESC);
+CREATE INDEX ON log_entries (hdfs_component_id, timestamp DESC);
 CREATE INDEX ON log_entries (block_id, timestamp DESC);
+CREATE INDEX ON log_entries (event_time DESC);
+CREATE INDEX ON log_entries (template_id, timestamp DESC);
 CREATE INDEX ON classifications (timestamp DESC);
 CREATE INDEX ON anomaly_params (classification_type, timestamp DESC);
+CREATE INDEX ON spike_alerts (series, timestamp DESC);
+CREATE INDEX ON block_stats (last_seen DESC);
+CREATE INDEX ON block_stats (log_count DESC);
+
+-- Log counts per minute, level and HDFS component for the volume and component endpoints
+CREATE MATERIALIZED VIEW log_volume_1m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+  time_bucket('1 minute', timestamp) AS bucket,
+  log_level_id,
+  hdfs_component_id,
+  COUNT(*) AS log_count
+FROM log_entries
+GROUP BY bucket, log_level_id, hdfs_component_id
+WITH NO DATA;
+
+-- Materialize closed minutes; newer ones are aggregated from log_entries at query time
+SELECT add_continuous_aggregate_policy('log_volume_1m',
+  start_offset => INTERVAL '1 hour',
+  end_offset => INTERVAL '1 minute',
+  schedule_interval => INTERVAL '1 minute');
 
 -- Add comment to explain the purpose of these tables
 COMMENT ON TABLE log_entries IS 'Stores log messages from Kafka for real-time observation';
 COMMENT ON TABLE classifications IS 'Tracks counts of normal, anomaly, and unidentified items over time';
-COMMENT ON TABLE anomaly_params IS 'Lists parameter values classified as anomaly or unidentified';
\ No newline at end of file
+COMMENT ON TABLE anomaly_params IS 'Lists parameter values classified as anomaly or unidentified';
+COMMENT ON TABLE block_stats IS 'Per-block log counts, lifetime and label bitsets, maintained incrementally';
\ No newline at end of file